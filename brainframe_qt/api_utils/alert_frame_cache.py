@@ -0,0 +1,342 @@
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from requests.exceptions import RequestException
+from PyQt5.QtCore import QObject, QStandardPaths, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+
+try:
+    # new location for sip
+    # https://www.riverbankcomputing.com/static/Docs/PyQt5/incompatibilities.html#pyqt-v5-11
+    from PyQt5 import sip
+except ImportError:
+    import sip
+
+from brainframe.api import bf_errors
+
+from brainframe_qt.api_utils import api
+
+FrameCallback = Callable[[Optional[QPixmap]], None]
+_Requester = Tuple[QObject, FrameCallback]
+
+
+class AlertFrameCache(QObject):
+    """Client-side cache of the frames saved for alerts.
+
+    Frames are kept at two tiers:
+
+    - in memory, as pixmaps ready to be displayed. The least recently used are
+      dropped once they take up more than MAX_MEMORY_BYTES
+    - on disk, as JPEGs named after the alert ID, in a directory per server.
+      The least recently used are deleted once they take up more than
+      MAX_DISK_BYTES
+
+    Frames that are in neither are downloaded from the server, a few at a time
+    on background threads. Concurrent requests for the same frame share a
+    single download. Meant to be used from the GUI thread only, as pixmaps
+    can't be made anywhere else.
+    """
+
+    _server_url_changed = pyqtSignal(str)
+    """Used to switch servers on the GUI thread"""
+
+    _frame_read = pyqtSignal(int, int, object, object)
+    """Emitted from a worker thread when a frame has been read. Sends the alert
+    ID, the generation it was read for, the result of _read_frame and the
+    exception raised, if any"""
+
+    MAX_MEMORY_BYTES = 256 * 1024 ** 2
+    """Bytes of decoded pixmaps kept in memory"""
+
+    MAX_DISK_BYTES = 1024 ** 3
+    """Bytes of JPEGs kept on disk, across all servers"""
+
+    JPEG_QUALITY = 90
+
+    PRUNE_INTERVAL = 50
+    """Frames written to disk between checks of the disk usage"""
+
+    MAX_WORKERS = 4
+    """Frames read or downloaded at the same time"""
+
+    def __init__(self):
+        super().__init__()
+
+        self._memory_cache: "OrderedDict[int, QPixmap]" = OrderedDict()
+        """Least recently used first"""
+        self._memory_bytes = 0
+        self._frameless_alert_ids = set()
+        """Alerts the server has no frame for"""
+
+        self._generation = 0
+        """Incremented when the cache is cleared, so frames read before then
+        are neither stored nor shared with new requests"""
+        self._pending: Dict[Tuple[int, int], List[_Requester]] = {}
+        """{(generation, alert_id): [(parent, callback)]} for frames being
+        read or downloaded"""
+        self._prefetching: Set[Tuple[int, int]] = set()
+        """Keys of _pending that are only being prefetched"""
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.MAX_WORKERS,
+            thread_name_prefix="AlertFrameCache")
+
+        cache_location = QStandardPaths.writableLocation(
+            QStandardPaths.GenericCacheLocation)
+        self._cache_root = Path(cache_location) / "brainframe" / "alert_frames"
+        self._cache_dir: Optional[Path] = None
+        """Where frames from the current server are stored"""
+
+        self._disk_lock = Lock()
+        """Held while pruning the disk cache"""
+        self._writes_since_prune = 0
+
+        self.memory_hits = 0
+        """Frames that were requested and found in memory"""
+        self.disk_hits = 0
+        """Frames that were requested and found on disk"""
+        self.misses = 0
+        """Frames that were requested and had to be downloaded"""
+        self.prefetches = 0
+        """Frames that were loaded into memory ahead of being requested"""
+
+        self._server_url_changed.connect(self._handle_server_url_change)
+        self._frame_read.connect(self._handle_frame_read)
+
+    def set_server_url(self, server_url: str) -> None:
+        """Store frames of a different server from now on. Alert IDs are only
+        unique to a server. Can be called from any thread"""
+        self._server_url_changed.emit(server_url)
+
+    def _handle_server_url_change(self, server_url: str) -> None:
+        self.clear()
+
+        server_hash = hashlib.sha1(server_url.encode()).hexdigest()[:16]
+        self._cache_dir = self._cache_root / server_hash
+
+    def clear(self) -> None:
+        """Forget the frames in memory. Frames on disk are kept"""
+        self._memory_cache.clear()
+        self._memory_bytes = 0
+        self._frameless_alert_ids.clear()
+
+        # Requesters of frames that are in flight still get them, but the
+        # frames won't be cached
+        self._generation += 1
+
+    def get_frame(self, parent: QObject, alert_id: int,
+                  on_loaded: FrameCallback) -> None:
+        """Get the frame of an alert, or None if the alert has no frame.
+
+        on_loaded is called right away if the frame is in memory, and later
+        from the GUI thread otherwise. It isn't called if parent has been
+        deleted by then.
+        """
+        pixmap = self._memory_cache.get(alert_id)
+        if pixmap is not None:
+            self.memory_hits += 1
+            self._memory_cache.move_to_end(alert_id)
+            on_loaded(pixmap)
+            return
+
+        if alert_id in self._frameless_alert_ids:
+            self.memory_hits += 1
+            on_loaded(None)
+            return
+
+        self._load(alert_id, (parent, on_loaded))
+
+    def prefetch(self, alert_ids: Iterable[int]) -> None:
+        """Load the frames of alerts into memory in the background, so they're
+        ready when they're requested"""
+        for alert_id in alert_ids:
+            if alert_id in self._memory_cache \
+                    or alert_id in self._frameless_alert_ids:
+                continue
+
+            self._load(alert_id, None)
+
+    def _load(self, alert_id: int, requester: Optional[_Requester]) -> None:
+        key = (self._generation, alert_id)
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = []
+
+            if requester is None:
+                self._prefetching.add(key)
+
+            self._executor.submit(self._read_frame_in_background,
+                                  alert_id, self._cache_dir, self._generation)
+
+        if requester is not None:
+            pending.append(requester)
+            # A requested frame doesn't count as prefetched
+            self._prefetching.discard(key)
+
+    def _read_frame_in_background(self, alert_id: int,
+                                  cache_dir: Optional[Path],
+                                  generation: int) -> None:
+        try:
+            result = self._read_frame(alert_id, cache_dir)
+        except Exception as exc:
+            self._frame_read.emit(alert_id, generation, None, exc)
+        else:
+            self._frame_read.emit(alert_id, generation, result, None)
+
+    def _handle_frame_read(self, alert_id: int, generation: int,
+                           result: Optional[Tuple[Optional[QImage], bool]],
+                           exc: Optional[Exception]) -> None:
+        key = (generation, alert_id)
+        requesters = self._pending.pop(key, [])
+        prefetched = key in self._prefetching
+        self._prefetching.discard(key)
+
+        if exc is not None:
+            if not isinstance(exc, (RequestException,
+                                    bf_errors.BaseAPIError)):
+                raise exc
+
+            logging.warning(f"While fetching the frame of alert {alert_id}: "
+                            f"{exc}")
+            pixmap = None
+        else:
+            image, from_disk = result
+
+            if prefetched:
+                self.prefetches += 1
+            elif from_disk:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+
+            pixmap = QPixmap.fromImage(image) if image is not None else None
+
+            # Frames read before the cache was cleared might be of another
+            # server
+            if generation == self._generation:
+                self._store(alert_id, pixmap)
+
+        for parent, on_loaded in requesters:
+            if not sip.isdeleted(parent):
+                on_loaded(pixmap)
+
+    def _store(self, alert_id: int, pixmap: Optional[QPixmap]) -> None:
+        if pixmap is None:
+            self._frameless_alert_ids.add(alert_id)
+            return
+
+        pixmap_bytes = self._pixmap_bytes(pixmap)
+        if pixmap_bytes > self.MAX_MEMORY_BYTES:
+            return
+
+        replaced = self._memory_cache.pop(alert_id, None)
+        if replaced is not None:
+            self._memory_bytes -= self._pixmap_bytes(replaced)
+
+        self._memory_cache[alert_id] = pixmap
+        self._memory_bytes += pixmap_bytes
+
+        while self._memory_bytes > self.MAX_MEMORY_BYTES:
+            _alert_id, evicted = self._memory_cache.popitem(last=False)
+            self._memory_bytes -= self._pixmap_bytes(evicted)
+
+    def _read_frame(self, alert_id: int, cache_dir: Optional[Path]) \
+            -> Tuple[Optional[QImage], bool]:
+        """[blocking API] Read a frame from disk, or download it and save it to
+        disk. Returns the frame and whether it came from disk"""
+        frame_path = cache_dir / f"{alert_id}.jpg" \
+            if cache_dir is not None else None
+
+        if frame_path is not None and frame_path.is_file():
+            image = QImage(str(frame_path))
+            if not image.isNull():
+                # Keep track of how recently it was used, for pruning
+                try:
+                    os.utime(frame_path)
+                except OSError:
+                    pass
+                return image, True
+
+        frame = api.get_alert_frame(alert_id)
+        if frame is None:
+            return None, False
+
+        image = self._ndarray_to_image(frame)
+
+        if frame_path is not None:
+            self._write_frame(frame_path, image)
+
+        return image, False
+
+    def _write_frame(self, frame_path: Path, image: QImage) -> None:
+        # Written under a temporary name first, so a half-written frame is
+        # never read
+        temp_path = frame_path.with_suffix(".tmp")
+
+        try:
+            frame_path.parent.mkdir(parents=True, exist_ok=True)
+            if not image.save(str(temp_path), "JPG", self.JPEG_QUALITY):
+                raise OSError(f"Unable to encode {temp_path}")
+            os.replace(temp_path, frame_path)
+        except OSError as exc:
+            logging.warning(f"While caching an alert frame to disk: {exc}")
+            return
+
+        with self._disk_lock:
+            self._writes_since_prune += 1
+            if self._writes_since_prune < self.PRUNE_INTERVAL:
+                return
+            self._writes_since_prune = 0
+
+            self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        """Delete the least recently used frames on disk until they fit in
+        MAX_DISK_BYTES. Must be called with the disk lock held"""
+        frames: List[Tuple[float, int, Path]] = []
+        try:
+            for frame_path in self._cache_root.glob("*/*.jpg"):
+                stat = frame_path.stat()
+                frames.append((stat.st_mtime, stat.st_size, frame_path))
+        except OSError as exc:
+            logging.warning(f"While pruning cached alert frames: {exc}")
+            return
+
+        disk_bytes = sum(size for _mtime, size, _path in frames)
+
+        # Oldest first
+        frames.sort()
+        for _mtime, size, frame_path in frames:
+            if disk_bytes <= self.MAX_DISK_BYTES:
+                break
+
+            try:
+                frame_path.unlink()
+            except OSError:
+                continue
+            disk_bytes -= size
+
+    @staticmethod
+    def _ndarray_to_image(frame: np.ndarray) -> QImage:
+        """Convert a BGR frame to an image that owns its pixels"""
+        height, width, channels = frame.shape
+        bytes_per_line = channels * width
+
+        # rgbSwapped makes a copy, so the image doesn't depend on the array
+        return QImage(frame.data, width, height, bytes_per_line,
+                      QImage.Format_RGB888).rgbSwapped()
+
+    @staticmethod
+    def _pixmap_bytes(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * pixmap.depth() // 8
+
+
+alert_frame_cache = AlertFrameCache()
@@ -7,6 +7,8 @@ from PyQt5.QtCore import pyqtSignal, QObject, QThread
 from brainframe.api import bf_errors, bf_codecs
 
 from brainframe_qt.api_utils import api
+from brainframe_qt.api_utils.alert_frame_cache import alert_frame_cache
+from brainframe_qt.api_utils.entity_cache import entity_cache
 from brainframe_qt.ui.resources.config import ServerSettings
 from brainframe_qt.util.secret import decrypt
 
@@ -104,6 +106,11 @@ class ConnectionManager(QThread):
         api.set_url(self._connection_configuration.server_url)
         api.set_credentials(self._connection_configuration.credentials)
 
+        # Anything cached might be from a different server
+        entity_cache.clear()
+        alert_frame_cache.set_server_url(
+            self._connection_configuration.server_url)
+
         self.connection_state = self.ConnectionState.UNCONNECTED
 
     def _communicate_with_server(self) -> None:
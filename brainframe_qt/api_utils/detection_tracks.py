@@ -1,5 +1,5 @@
-from collections import deque
-from typing import Deque, Iterator, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 import numpy as np
@@ -8,35 +8,103 @@ from brainframe.api.bf_codecs import Detection
 
 DET_TSTAMP_TUPLE = Tuple[Detection, float]
 
+DECOUPLED_CLOCK_SECONDS = 60
+"""If the video timestamp is further than this from a track's latest timestamp,
+the video is decoupled from the server clock (e.g., proxied stream), and
+interpolation is impossible"""
+
 
 class DetectionTrack:
+    """The history of a single tracked detection.
+
+    Timestamps and coordinates are kept in numpy arrays, oldest first, so the
+    detections on either side of a timestamp can be found with a binary search.
+    The arrays start small and grow as needed, up to twice max_size, at which
+    point the oldest half is discarded.
+
+    The arrays are append-only: existing entries are never modified, and
+    anything other than appending happens on newly allocated arrays. This lets
+    snapshots share them with the track without copying, even while the track
+    keeps being updated from another thread.
+    """
+
+    INITIAL_CAPACITY = 16
+
     def __init__(self, history=None, max_size=1000):
         self._max_size = max_size
-        self._history: Deque[DET_TSTAMP_TUPLE]
-        self._history = history if history else deque(maxlen=self._max_size)
+
+        self._start = 0
+        """Index of the oldest detection in the arrays"""
+        self._end = 0
+        """Index after the newest detection in the arrays"""
+
+        self._tstamps = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self._coords = np.empty((self.INITIAL_CAPACITY, 0, 2),
+                                dtype=np.float64)
+        """Coordinates of each detection, padded to the largest number of
+        points seen"""
+        self._point_counts = np.empty(self.INITIAL_CAPACITY, dtype=np.int32)
+        self._detections: List[Optional[Detection]] = \
+            [None] * self.INITIAL_CAPACITY
+
+        self._version = 0
+        """Incremented every time a detection is added"""
+        self._owns_storage = True
+        """False for snapshots, which share the arrays of their track"""
+
+        # History is newest first, as yielded by __iter__
+        for detection, tstamp in reversed(list(history or [])):
+            self.add_detection(detection, tstamp)
 
     def __len__(self):
-        return len(self._history)
+        return self._end - self._start
 
     def __iter__(self) -> Iterator[DET_TSTAMP_TUPLE]:
         """
         The 0th index in track should be the latest
 
         """
-        for item in self._history:
-            yield item
+        for index in range(self._end - 1, self._start - 1, -1):
+            yield self._detections[index], float(self._tstamps[index])
 
     def __repr__(self):
-        if len(self._history):
+        if len(self):
             return f"DetectionTrack(tstamp: {self.latest_tstamp}, " \
                    f"det:{self.latest_det})"
         else:
             return "DetectionTrack()"
 
     def add_detection(self, detection, tstamp):
-        """Pops the oldest (if len is > max size) and inserts the newest
-        to the beginning of the list."""
-        self._history.appendleft((detection, tstamp))
+        """Add a detection to the track, dropping the oldest one if the track
+        is longer than max size."""
+        coords = np.asarray(detection.coords, dtype=np.float64)
+
+        # Detections almost always arrive in order, but keep the arrays sorted
+        # in case they don't. Inserting modifies existing entries, and
+        # snapshots can't write into arrays they share, so both are done on
+        # new arrays
+        out_of_order = len(self) and tstamp < self.latest_tstamp
+        self._reserve(len(coords),
+                      reallocate=out_of_order or not self._owns_storage)
+        self._owns_storage = True
+
+        index = self._end
+        if out_of_order:
+            index = self._start + int(np.searchsorted(
+                self._tstamps[self._start:self._end], tstamp, side="right"))
+            self._shift_right(index)
+
+        self._tstamps[index] = tstamp
+        self._coords[index, :len(coords)] = coords
+        self._point_counts[index] = len(coords)
+        self._detections[index] = detection
+        self._end += 1
+        self._version += 1
+
+        # Dropped detections stay in the arrays, for snapshots, until the
+        # arrays are compacted
+        if len(self) > self._max_size:
+            self._start += 1
 
     def get_interpolated_detection(self, interp_to_tstamp) -> Detection:
         """
@@ -47,74 +115,239 @@ class DetectionTrack:
         :param interp_to_tstamp: The timestamp that we would like to estimate
         the position of the detection at.
         """
-        # If the video timestamp is decoupled from the server clock (e.g., proxied stream), 
-        # interpolation is impossible. Just return the latest detection.
-        if abs(self.latest_tstamp - interp_to_tstamp) > 60:
-            return self.latest_det
-
-        if len(self._history) == 1:
-            return self._history[0][0]
-
-        if interp_to_tstamp >= self.latest_tstamp:
-            return self.latest_det
-
-        recent: DET_TSTAMP_TUPLE = None
-        older: DET_TSTAMP_TUPLE = None
-        for det, tstamp in self:
-            if tstamp > interp_to_tstamp:
-                recent = det, tstamp
-            else:
-                older = det, tstamp
-                break
-
-        # If interp_to_tstamp is older than all detection nodes in the
-        # DetectionTrack, return the most closest DetectionTrack to the
-        # interp_to_tstamp
-        if older is None:
-            return recent[0]
-
-        ratio = 1 - (recent[1] - interp_to_tstamp) / (recent[1] - older[1])
+        bracket = self._bracket(interp_to_tstamp)
+        if isinstance(bracket, Detection):
+            return bracket
 
-        newer_coords = np.array(recent[0].coords)
-        older_coords = np.array(older[0].coords)
-        interp_coords = older_coords + (newer_coords - older_coords) * ratio
+        older, recent, ratio = bracket
+        point_count = self._point_counts[recent]
+        older_coords = self._coords[older, :point_count]
+        recent_coords = self._coords[recent, :point_count]
+        interp_coords = older_coords + (recent_coords - older_coords) * ratio
 
-        """
-        The following things should be true (For debugging):
-        assert recent[1] >= interp_to_tstamp >= older[1]
-        assert 0 <= ratio <= 1, ratio
-        assert recent[0] == self.latest_det
-        """
-
-        # Return a new Detection but the coordinates have been interpolated
-        return Detection(
-            coords=interp_coords.astype(np.int32).tolist(),
-            class_name=recent[0].class_name,
-            children=recent[0].children,
-            attributes=recent[0].attributes,
-            with_identity=recent[0].with_identity,
-            extra_data=recent[0].extra_data,
-            track_id=recent[0].track_id)
+        return self._interpolated_detection(
+            recent, interp_coords.astype(np.int32).tolist())
 
     @property
     def class_name(self) -> str:
         """Get the class name for this detection"""
-        return self._history[0][0].class_name
+        return self.latest_det.class_name
 
     @property
     def track_id(self) -> UUID:
         """Get the track_id for this detection"""
-        return self._history[0][0].track_id
+        return self.latest_det.track_id
 
     @property
     def latest_tstamp(self) -> float:
-        return self._history[0][1]
+        return float(self._tstamps[self._end - 1])
 
     @property
     def latest_det(self) -> Detection:
-        return self._history[0][0]
+        return self._detections[self._end - 1]
+
+    @property
+    def version(self) -> int:
+        """Changes whenever a detection is added. A track and its snapshots
+        have the same history if they have the same version"""
+        return self._version
 
     def copy(self) -> 'DetectionTrack':
-        return DetectionTrack(
-            max_size=self._max_size,
-            history=self._history.copy())
\ No newline at end of file
+        track = DetectionTrack(max_size=self._max_size)
+
+        track._start = 0
+        track._end = len(self)
+        track._tstamps = self._tstamps[self._start:self._end].copy()
+        track._coords = self._coords[self._start:self._end].copy()
+        track._point_counts = self._point_counts[self._start:self._end].copy()
+        track._detections = self._detections[self._start:self._end]
+        track._version = self._version
+
+        return track
+
+    def snapshot(self) -> 'DetectionTrack':
+        """Get a view of the track as it is now, without copying its history.
+
+        Detections added to the track afterwards don't show up in the snapshot.
+        The snapshot can itself be added to, in which case it copies the
+        history first.
+        """
+        track = DetectionTrack.__new__(DetectionTrack)
+
+        track._max_size = self._max_size
+        track._start = self._start
+        track._end = self._end
+        track._tstamps = self._tstamps
+        track._coords = self._coords
+        track._point_counts = self._point_counts
+        track._detections = self._detections
+        track._version = self._version
+        track._owns_storage = False
+
+        return track
+
+    def _bracket(self, tstamp: float):
+        """Find the detections on either side of a timestamp.
+
+        :return: A tuple of the indices of the older and more recent detections
+            and how far between them the timestamp is. If the detection can't
+            be interpolated, the closest Detection is returned instead
+        """
+        latest_tstamp = self._tstamps[self._end - 1]
+
+        # If the video timestamp is decoupled from the server clock (e.g., proxied stream),
+        # interpolation is impossible. Just return the latest detection.
+        if abs(latest_tstamp - tstamp) > DECOUPLED_CLOCK_SECONDS:
+            return self.latest_det
+
+        if len(self) == 1:
+            return self.latest_det
+
+        if tstamp >= latest_tstamp:
+            return self.latest_det
+
+        # Index of the oldest detection newer than tstamp. Frames are usually
+        # just behind the latest detection, so check there before searching
+        if tstamp >= self._tstamps[self._end - 2]:
+            recent = self._end - 1
+        else:
+            recent = self._start + int(self._tstamps[self._start:self._end]
+                                       .searchsorted(tstamp, side="right"))
+
+        # If tstamp is older than all detection nodes in the DetectionTrack,
+        # return the closest one
+        if recent == self._start:
+            return self._detections[recent]
+
+        older = recent - 1
+
+        # Polygons with differing numbers of points can't be interpolated
+        if self._point_counts[older] != self._point_counts[recent]:
+            return self._detections[recent]
+
+        recent_tstamp = self._tstamps[recent]
+        older_tstamp = self._tstamps[older]
+        ratio = 1 - (recent_tstamp - tstamp) / (recent_tstamp - older_tstamp)
+
+        return older, recent, ratio
+
+    def _interpolated_detection(self, recent: int,
+                                interp_coords: List[List[int]]) -> Detection:
+        recent_det = self._detections[recent]
+
+        # Return a new Detection but the coordinates have been interpolated
+        return Detection(
+            coords=interp_coords,
+            class_name=recent_det.class_name,
+            children=recent_det.children,
+            attributes=recent_det.attributes,
+            with_identity=recent_det.with_identity,
+            extra_data=recent_det.extra_data,
+            track_id=recent_det.track_id)
+
+    def _reserve(self, point_count: int, reallocate: bool = False) -> None:
+        """Make room for one more detection with the given number of points
+
+        :param reallocate: If True, always move the detections to new arrays
+        """
+        capacity = len(self._tstamps)
+        max_points = self._coords.shape[1]
+
+        if self._end < capacity and point_count <= max_points \
+                and not reallocate:
+            return
+
+        length = len(self)
+        if self._end == capacity and capacity >= 2 * self._max_size:
+            # At full size. Move the newest detections to the front instead of
+            # growing
+            new_capacity = capacity
+        elif self._end == capacity:
+            new_capacity = min(2 * capacity, 2 * self._max_size)
+        else:
+            new_capacity = capacity
+        new_max_points = max(max_points, point_count)
+
+        used = slice(self._start, self._end)
+
+        tstamps = np.empty(new_capacity, dtype=np.float64)
+        tstamps[:length] = self._tstamps[used]
+
+        coords = np.zeros((new_capacity, new_max_points, 2), dtype=np.float64)
+        coords[:length, :max_points] = self._coords[used]
+
+        point_counts = np.empty(new_capacity, dtype=np.int32)
+        point_counts[:length] = self._point_counts[used]
+
+        detections = self._detections[used] + [None] * (new_capacity - length)
+
+        self._tstamps = tstamps
+        self._coords = coords
+        self._point_counts = point_counts
+        self._detections = detections
+        self._start = 0
+        self._end = length
+
+    def _shift_right(self, index: int) -> None:
+        """Make room for a detection at index by moving newer ones back one"""
+        end = self._end
+        self._tstamps[index + 1:end + 1] = self._tstamps[index:end]
+        self._coords[index + 1:end + 1] = self._coords[index:end]
+        self._point_counts[index + 1:end + 1] = self._point_counts[index:end]
+        self._detections[index + 1:end + 1] = self._detections[index:end]
+
+
+def interpolate_tracks(tracks: Sequence[DetectionTrack],
+                       interp_to_tstamp: float) -> List[Detection]:
+    """Get the interpolated detection of every track at a timestamp.
+
+    Equivalent to calling get_interpolated_detection on each track, but the
+    coordinates of all tracks with the same number of points are interpolated
+    together in a single numpy operation.
+    """
+    detections: List[Optional[Detection]] = [None] * len(tracks)
+
+    # Tracks to interpolate, grouped by number of points
+    groups: Dict[int, _InterpolationGroup] = {}
+
+    for index, track in enumerate(tracks):
+        bracket = track._bracket(interp_to_tstamp)
+        if isinstance(bracket, Detection):
+            detections[index] = bracket
+            continue
+
+        older, recent, ratio = bracket
+        point_count = int(track._point_counts[recent])
+
+        group = groups.get(point_count)
+        if group is None:
+            group = groups[point_count] = _InterpolationGroup()
+
+        group.tracks.append((index, track, recent))
+        group.older_coords.append(track._coords[older, :point_count])
+        group.recent_coords.append(track._coords[recent, :point_count])
+        group.ratios.append(ratio)
+
+    for group in groups.values():
+        older_coords = np.stack(group.older_coords)
+        recent_coords = np.stack(group.recent_coords)
+        ratios = np.array(group.ratios)[:, np.newaxis, np.newaxis]
+
+        interp_coords = older_coords + (recent_coords - older_coords) * ratios
+        interp_coords = interp_coords.astype(np.int32).tolist()
+
+        for (index, track, recent), coords in zip(group.tracks, interp_coords):
+            detections[index] = track._interpolated_detection(recent, coords)
+
+    return detections
+
+
+@dataclass
+class _InterpolationGroup:
+    """Tracks with the same number of points, to be interpolated together"""
+
+    tracks: List[Tuple[int, DetectionTrack, int]] = field(default_factory=list)
+    """The index, track, and index of the more recent detection of each"""
+    older_coords: List[np.ndarray] = field(default_factory=list)
+    recent_coords: List[np.ndarray] = field(default_factory=list)
+    ratios: List[float] = field(default_factory=list)
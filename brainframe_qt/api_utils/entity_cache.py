@@ -0,0 +1,305 @@
+from collections import defaultdict
+from threading import Lock, RLock
+from typing import Callable, Dict, Hashable, List, Optional, Set, TypeVar
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from brainframe.api.bf_codecs import StreamConfiguration, Zone, ZoneAlarm
+
+from brainframe_qt.api_utils import api
+from brainframe_qt.api_utils.zss_pubsub import Subscription, ZSSDelta, \
+    zss_publisher
+
+T = TypeVar("T")
+
+
+class EntityCache(QObject):
+    """Client-side cache of the server's streams, zones and alarms.
+
+    Widgets read entities from here instead of polling the API. Entries are
+    fetched from the API the first time they're read, then kept up to date from
+    the ZoneStatus stream:
+
+    - Zones (and their alarms) of analyzed streams are replaced as they change.
+      Zones of other streams are invalidated by the dialogs that edit them
+    - A stream appearing in or disappearing from the ZoneStatus stream
+      invalidates the stream list, so it's fetched once on the next read
+
+    Concurrent reads of the same missing entry share a single request. Reads
+    that miss the cache block on the API, so they shouldn't be done on the GUI
+    thread. Thread-safe.
+    """
+
+    streams_changed = pyqtSignal()
+    """Emitted when streams may have been added to or removed from the server.
+    Emitted from the thread that noticed the change"""
+
+    def __init__(self):
+        super().__init__()
+
+        self._lock = RLock()
+        """Guards the cached entities. Never held during an API call"""
+
+        self._fetch_locks: Dict[Hashable, Lock] = defaultdict(Lock)
+        """One lock per cache entry being fetched, so that concurrent misses
+        only make one request"""
+
+        self._generation = 0
+        """Incremented whenever cached entities are invalidated or updated from
+        the ZoneStatus stream. Fetches that started before then don't store
+        their (possibly outdated) results"""
+
+        self._streams: Dict[int, StreamConfiguration] = {}
+        self._all_streams_cached = False
+        """Whether _streams has every stream on the server"""
+
+        self._zones: Dict[int, Zone] = {}
+        self._stream_zone_ids: Dict[int, Set[int]] = {}
+        """{stream_id: zone IDs} for streams whose every zone is cached"""
+
+        self._alarms: Dict[int, ZoneAlarm] = {}
+
+        self._subscriptions: Optional[List[Subscription]] = None
+        self._subscribe_lock = Lock()
+        """Held while subscribing to the ZoneStatus stream. Separate from
+        _lock, which the subscriptions' callbacks take while the publisher
+        holds its own lock"""
+
+    def get_stream_configurations(self) -> List[StreamConfiguration]:
+        """[blocking API] Every stream on the server"""
+        self._subscribe()
+
+        def cached() -> Optional[List[StreamConfiguration]]:
+            if not self._all_streams_cached:
+                return None
+            return list(self._streams.values())
+
+        def store(stream_confs: List[StreamConfiguration]) -> None:
+            self._streams = {stream_conf.id: stream_conf
+                             for stream_conf in stream_confs}
+            self._all_streams_cached = True
+
+        return self._get("streams", cached, api.get_stream_configurations,
+                         store)
+
+    def get_stream_configuration(self, stream_id: int) -> StreamConfiguration:
+        """[blocking API] Raises StreamConfigNotFoundError like the API if the
+        stream doesn't exist"""
+        self._subscribe()
+
+        def store(stream_conf: StreamConfiguration) -> None:
+            self._streams[stream_conf.id] = stream_conf
+
+        return self._get(
+            ("stream", stream_id),
+            lambda: self._streams.get(stream_id),
+            lambda: api.get_stream_configuration(stream_id),
+            store
+        )
+
+    def get_zones(self, stream_id: int) -> List[Zone]:
+        """[blocking API] Every zone of a stream, including their alarms"""
+        self._subscribe()
+
+        def cached() -> Optional[List[Zone]]:
+            zone_ids = self._stream_zone_ids.get(stream_id)
+            if zone_ids is None:
+                return None
+            return [self._zones[zone_id] for zone_id in zone_ids]
+
+        def store(zones: List[Zone]) -> None:
+            for zone in zones:
+                self._store_zone(zone)
+            self._stream_zone_ids[stream_id] = {zone.id for zone in zones}
+
+        return self._get(("zones", stream_id), cached,
+                         lambda: api.get_zones(stream_id), store)
+
+    def get_zone(self, zone_id: int) -> Zone:
+        """[blocking API]"""
+        self._subscribe()
+
+        return self._get(
+            ("zone", zone_id),
+            lambda: self._zones.get(zone_id),
+            lambda: api.get_zone(zone_id),
+            self._store_zone
+        )
+
+    def get_zone_alarms(self, stream_id: int) -> List[ZoneAlarm]:
+        """[blocking API] Every alarm of a stream"""
+        return [alarm
+                for zone in self.get_zones(stream_id)
+                for alarm in zone.alarms]
+
+    def get_zone_alarm(self, alarm_id: int) -> ZoneAlarm:
+        """[blocking API]"""
+        self._subscribe()
+
+        def store(alarm: ZoneAlarm) -> None:
+            self._alarms[alarm.id] = alarm
+
+        return self._get(
+            ("alarm", alarm_id),
+            lambda: self._alarms.get(alarm_id),
+            lambda: api.get_zone_alarm(alarm_id),
+            store
+        )
+
+    def invalidate_stream(self, stream_id: int) -> None:
+        """Forget a stream and its zones and alarms, e.g. after it was modified
+        or deleted"""
+        with self._lock:
+            self._generation += 1
+            self._all_streams_cached = False
+            self._forget_stream(stream_id)
+
+        self.streams_changed.emit()
+
+    def invalidate_zones(self, stream_id: int) -> None:
+        """Forget a stream's zones and alarms, e.g. after one of them was
+        created, modified or deleted. The ZoneStatus stream only reports the
+        zones of streams that are being analyzed, so this has to be done by
+        whoever made the change"""
+        with self._lock:
+            self._generation += 1
+            self._forget_zones(stream_id)
+
+    def clear(self) -> None:
+        """Forget everything, e.g. when connecting to a different server"""
+        with self._lock:
+            self._generation += 1
+            self._streams.clear()
+            self._all_streams_cached = False
+            self._zones.clear()
+            self._stream_zone_ids.clear()
+            self._alarms.clear()
+
+        self.streams_changed.emit()
+
+    def _get(self, key: Hashable,
+             cached: Callable[[], Optional[T]],
+             fetch: Callable[[], T],
+             store: Callable[[T], None]) -> T:
+        """Get an entry from the cache, or fetch and cache it if it's missing.
+
+        :param key: Identifies the entry, so only one fetch of it is made at
+            a time
+        :param cached: Returns the cached entry, or None if it isn't cached.
+            Called with the lock held
+        :param fetch: Gets the entry from the API
+        :param store: Puts the fetched entry in the cache. Called with the lock
+            held
+        """
+        with self._lock:
+            value = cached()
+        if value is not None:
+            return value
+
+        with self._lock:
+            fetch_lock = self._fetch_locks[key]
+
+        with fetch_lock:
+            # Someone else might have fetched it while we waited
+            with self._lock:
+                value = cached()
+                generation = self._generation
+            if value is not None:
+                return value
+
+            try:
+                value = fetch()
+
+                with self._lock:
+                    if generation == self._generation:
+                        store(value)
+            finally:
+                with self._lock:
+                    self._fetch_locks.pop(key, None)
+
+        return value
+
+    def _forget_stream(self, stream_id: int) -> None:
+        """Must be called with the lock held"""
+        self._streams.pop(stream_id, None)
+        self._forget_zones(stream_id)
+
+    def _forget_zones(self, stream_id: int) -> None:
+        """Must be called with the lock held"""
+        self._stream_zone_ids.pop(stream_id, None)
+        for zone in list(self._zones.values()):
+            if zone.stream_id == stream_id:
+                self._remove_zone(zone.id)
+
+    def _store_zone(self, zone: Zone) -> None:
+        """Must be called with the lock held"""
+        self._remove_zone(zone.id)
+
+        self._zones[zone.id] = zone
+        for alarm in zone.alarms:
+            self._alarms[alarm.id] = alarm
+
+        zone_ids = self._stream_zone_ids.get(zone.stream_id)
+        if zone_ids is not None:
+            zone_ids.add(zone.id)
+
+    def _remove_zone(self, zone_id: int) -> None:
+        """Must be called with the lock held"""
+        zone = self._zones.pop(zone_id, None)
+        if zone is None:
+            return
+
+        for alarm in zone.alarms:
+            self._alarms.pop(alarm.id, None)
+
+        zone_ids = self._stream_zone_ids.get(zone.stream_id)
+        if zone_ids is not None:
+            zone_ids.discard(zone_id)
+
+    def _subscribe(self) -> None:
+        """Start following the ZoneStatus stream, the first time the cache is
+        used"""
+        with self._subscribe_lock:
+            if self._subscriptions is not None:
+                return
+
+            self._subscriptions = [
+                zss_publisher.subscribe_streams(self._handle_streams_delta,
+                                                deltas=True),
+                zss_publisher.subscribe_zones(self._handle_zones_delta,
+                                              deltas=True),
+            ]
+
+    def _handle_streams_delta(self, delta: ZSSDelta) -> None:
+        # The streams in the ZoneStatus stream only have their IDs, so the
+        # stream list has to be fetched again when a stream appears. A stream
+        # that disappears might have been deleted
+        with self._lock:
+            new_stream = any(stream.id not in self._streams
+                             for stream in delta.added)
+            if not new_stream and not delta.removed:
+                return
+
+            self._generation += 1
+            self._all_streams_cached = False
+            for stream in delta.removed:
+                self._forget_stream(stream.id)
+
+        self.streams_changed.emit()
+
+    def _handle_zones_delta(self, delta: ZSSDelta) -> None:
+        with self._lock:
+            self._generation += 1
+
+            for zone in delta.added + delta.changed:
+                self._store_zone(zone)
+
+            for zone in delta.removed:
+                self._remove_zone(zone.id)
+                # The zone might have been deleted, or the stream might have
+                # stopped being analyzed. Either way, the stream's zones need
+                # to be fetched again
+                self._stream_zone_ids.pop(zone.stream_id, None)
+
+
+entity_cache = EntityCache()
@@ -0,0 +1,705 @@
+"""Decoding of streams in worker processes.
+
+Normally each SyncedStreamReader decodes its stream in a thread of the client
+process, so every stream competes for the same GIL. When enabled, the
+StreamManager instead hands its streams out to a DecodeWorkerPool. Each worker
+process runs the GstStreamReaders of the streams assigned to it, downscales
+their frames, and writes them into shared memory. In the client process, a
+RemoteStreamReader stands in for the GstStreamReader and wraps those frames
+without copying them.
+
+Each stream has a ring of frame slots in a SharedMemory segment owned by its
+worker. A slot is handed back to the worker once the client process has dropped
+every reference to the frame in it.
+"""
+import logging
+import multiprocessing
+import time
+import weakref
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from threading import Event, Lock, RLock, Thread
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage
+
+from gstly import gobject_init
+from gstly.stream_reader import GstStreamReader, StreamStatus
+
+from brainframe_qt.util import environment
+from brainframe_qt.util.events import or_events
+from .zone_status_frame import ZoneStatusFrame
+
+SLOTS_PER_STREAM: int = 16
+"""Number of frames of each stream that can be held in shared memory at once"""
+
+RESERVED_SLOTS: int = 2
+"""When fewer than this many slots of a stream are free, the client copies
+frames out of shared memory instead of holding on to their slots, so the worker
+always has somewhere to write the next frame"""
+
+NEW_FRAME_EVENT_TIMEOUT: float = 30.0
+
+WORKER_RESTART_DELAY: float = 1.0
+"""Seconds to wait before restarting a worker process that has died"""
+
+SizeType = Tuple[int, int]
+
+
+@dataclass
+class DecodeOptions:
+    """Everything a worker process needs to open a stream"""
+
+    url: str
+    latency: int
+    runtime_options: dict
+    pipeline: Optional[str]
+    proxied: bool
+    output_size: Optional[SizeType] = None
+    """Frames larger than this are downscaled to fit. None for full resolution.
+    Set by the pool"""
+    paused: bool = False
+    """Paused streams stay connected, but their frames aren't sent to the
+    client. Set by the pool"""
+
+
+class RemoteStreamReader:
+    """Stands in for the GstStreamReader of a stream that is decoded in a
+    worker process. Has the parts of GstStreamReader's interface that the
+    SyncedStreamReader uses"""
+
+    def __init__(self, stream_id: int, *, pool: "DecodeWorkerPool"):
+        self.stream_id = stream_id
+        self._pool = pool
+
+        self.latest_frame_event = Event()
+        self.new_status_event = Event()
+        self._closed_event = Event()
+
+        self._frame_lock = Lock()
+        self._latest_frame: Tuple[Optional[float], Optional[np.ndarray]] \
+            = (None, None)
+        self._latest_source_size: Optional[QSize] = None
+
+        self._status = StreamStatus.INITIALIZING
+
+    @property
+    def latest_frame(self) -> Tuple[Optional[float], Optional[np.ndarray]]:
+        """The timestamp and BGR pixels of the latest frame. The pixels are in
+        shared memory, and may already be downscaled"""
+        with self._frame_lock:
+            return self._latest_frame
+
+    @property
+    def latest_source_size(self) -> Optional[QSize]:
+        """The resolution the latest frame was decoded at, if it was
+        downscaled by the worker"""
+        with self._frame_lock:
+            return self._latest_source_size
+
+    @property
+    def status(self) -> StreamStatus:
+        return self._status
+
+    def set_output_size(self, output_size: Optional[QSize]) -> None:
+        """Have the worker downscale frames to fit within output_size"""
+        self._pool.set_output_size(self.stream_id, output_size)
+
+    def set_paused(self, paused: bool) -> None:
+        """Have the worker stop (or resume) sending frames, while staying
+        connected to the stream"""
+        self._pool.set_paused(self.stream_id, paused)
+
+    def close(self) -> None:
+        """Request the worker to close the stream"""
+        self._pool.close_stream(self.stream_id)
+
+    def wait_until_closed(self) -> None:
+        self._closed_event.wait()
+
+    def _set_frame(self, tstamp: float, frame: np.ndarray,
+                   source_size: Optional[QSize]) -> None:
+        with self._frame_lock:
+            self._latest_frame = (tstamp, frame)
+            self._latest_source_size = source_size
+
+        self.latest_frame_event.set()
+
+    def _set_status(self, status: StreamStatus) -> None:
+        self._status = status
+        self.new_status_event.set()
+
+    def _set_closed(self) -> None:
+        # Let go of the last frame, so its slot can be reused
+        with self._frame_lock:
+            self._latest_frame = (None, None)
+
+        self._closed_event.set()
+
+
+class DecodeWorkerPool:
+    """Decodes streams in a fixed number of worker processes.
+
+    Streams are assigned to the worker with the fewest streams. If a worker
+    process dies, it's restarted and its streams are reopened.
+    """
+
+    def __init__(self, worker_count: int):
+        # Forking a process with a running Qt application isn't safe
+        self._context = multiprocessing.get_context("spawn")
+
+        self._lock = RLock()
+        self._closing = False
+
+        self._readers: Dict[int, RemoteStreamReader] = {}
+        self._stream_options: Dict[int, DecodeOptions] = {}
+        self._closing_streams: Set[int] = set()
+
+        self._buffers: Dict[str, _AttachedBuffer] = {}
+        """Shared memory segments attached to, by name"""
+        self._stream_buffers: Dict[int, str] = {}
+        """The name of the segment each stream's worker currently writes to"""
+
+        self._workers: List[_WorkerHandle] = [
+            self._start_worker(index) for index in range(worker_count)
+        ]
+
+    def open_stream(self, stream_id: int, options: DecodeOptions,
+                    output_size: Optional[QSize] = None) \
+            -> RemoteStreamReader:
+        """Start decoding a stream in the least busy worker process
+
+        :param stream_id: The ID of the stream
+        :param options: How to connect to the stream
+        :param output_size: Frames larger than this are downscaled to fit by
+            the worker. None for full resolution
+        :return: A reader that receives the stream's frames
+        """
+        options.output_size = _size_to_tuple(output_size)
+
+        with self._lock:
+            worker = min(self._workers, key=lambda worker_: len(worker_.streams))
+
+            reader = RemoteStreamReader(stream_id, pool=self)
+            self._readers[stream_id] = reader
+            self._stream_options[stream_id] = options
+            self._closing_streams.discard(stream_id)
+
+            worker.streams.add(stream_id)
+            worker.send("open", stream_id, options)
+
+        return reader
+
+    def close_stream(self, stream_id: int) -> None:
+        """Request the stream's worker to close the stream. Its reader's
+        wait_until_closed returns once it has"""
+        with self._lock:
+            worker = self._worker_for_stream(stream_id)
+            if worker is None:
+                # Already closed, or never opened
+                self._forget_stream(stream_id)
+                return
+
+            self._closing_streams.add(stream_id)
+            worker.send("close", stream_id)
+
+    def set_output_size(self, stream_id: int,
+                        output_size: Optional[QSize]) -> None:
+        with self._lock:
+            options = self._stream_options.get(stream_id)
+            worker = self._worker_for_stream(stream_id)
+            if options is None or worker is None:
+                return
+
+            options.output_size = _size_to_tuple(output_size)
+            worker.send("resize", stream_id, options.output_size)
+
+    def set_paused(self, stream_id: int, paused: bool) -> None:
+        with self._lock:
+            options = self._stream_options.get(stream_id)
+            worker = self._worker_for_stream(stream_id)
+            if options is None or worker is None:
+                return
+
+            options.paused = paused
+            worker.send("pause", stream_id, paused)
+
+    def close(self) -> None:
+        """Stop all worker processes. Streams should be closed first"""
+        with self._lock:
+            self._closing = True
+
+            for worker in self._workers:
+                worker.send("shutdown")
+
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+        with self._lock:
+            for buffer in self._buffers.values():
+                buffer.retired = True
+            self._close_retired_buffers()
+
+    def _start_worker(self, index: int) -> "_WorkerHandle":
+        command_recv, command_send = self._context.Pipe(duplex=False)
+        event_recv, event_send = self._context.Pipe(duplex=False)
+
+        process = self._context.Process(
+            name=f"Decode worker {index}",
+            target=_worker_main,
+            args=(command_recv, event_send),
+            daemon=True,
+        )
+        process.start()
+
+        # The child process has its own copies of these now
+        command_recv.close()
+        event_send.close()
+
+        worker = _WorkerHandle(index=index, process=process,
+                               command_conn=command_send,
+                               event_conn=event_recv)
+
+        dispatch_thread = Thread(
+            name=f"Decode worker {index} dispatcher",
+            target=self._dispatch,
+            args=(worker,),
+            daemon=True,
+        )
+        dispatch_thread.start()
+
+        return worker
+
+    def _dispatch(self, worker: "_WorkerHandle") -> None:
+        """Receive frames and statuses from a worker process until it exits"""
+        while True:
+            try:
+                command, *args = worker.event_conn.recv()
+            except (EOFError, OSError):
+                break
+
+            with self._lock:
+                if command == "frame":
+                    self._handle_frame(worker, *args)
+                elif command == "status":
+                    self._handle_status(*args)
+                elif command == "closed":
+                    self._handle_closed(worker, *args)
+
+                self._close_retired_buffers()
+
+        with self._lock:
+            if self._closing:
+                return
+
+        self._restart_worker(worker)
+
+    def _handle_frame(self, worker: "_WorkerHandle", stream_id: int,
+                      buffer_name: str, slot: int, slot_bytes: int,
+                      slot_count: int, tstamp: float,
+                      shape: Tuple[int, int, int],
+                      source_size: Optional[SizeType]) -> None:
+        reader = self._readers.get(stream_id)
+        buffer = self._attach_buffer(stream_id, buffer_name)
+        if reader is None or buffer is None:
+            worker.send("release", stream_id, buffer_name, slot)
+            return
+
+        frame = np.ndarray(shape, dtype=np.uint8,
+                           buffer=buffer.shared_memory.buf,
+                           offset=slot * slot_bytes)
+
+        if slot_count - buffer.views <= RESERVED_SLOTS:
+            # The worker is about to run out of slots
+            frame = frame.copy()
+            worker.send("release", stream_id, buffer_name, slot)
+        else:
+            buffer.views += 1
+            weakref.finalize(frame, self._release_slot, stream_id,
+                             buffer_name, slot)
+
+        reader._set_frame(tstamp, frame, _tuple_to_size(source_size))
+
+    def _handle_status(self, stream_id: int, status_name: str) -> None:
+        reader = self._readers.get(stream_id)
+        if reader is not None:
+            reader._set_status(StreamStatus[status_name])
+
+    def _handle_closed(self, worker: "_WorkerHandle", stream_id: int) -> None:
+        worker.streams.discard(stream_id)
+
+        # The stream may have been reopened while the worker was closing it
+        if stream_id not in self._closing_streams:
+            return
+
+        self._forget_stream(stream_id)
+
+    def _forget_stream(self, stream_id: int) -> None:
+        self._closing_streams.discard(stream_id)
+        self._stream_options.pop(stream_id, None)
+
+        buffer_name = self._stream_buffers.pop(stream_id, None)
+        if buffer_name in self._buffers:
+            self._buffers[buffer_name].retired = True
+
+        reader = self._readers.pop(stream_id, None)
+        if reader is not None:
+            reader._set_closed()
+
+    def _restart_worker(self, worker: "_WorkerHandle") -> None:
+        # Its pipe closes just before the process exits
+        worker.process.join(timeout=WORKER_RESTART_DELAY)
+
+        logging.warning(
+            f"Decode worker {worker.index} exited with code "
+            f"{worker.process.exitcode}. Restarting it"
+        )
+        time.sleep(WORKER_RESTART_DELAY)
+
+        with self._lock:
+            if self._closing:
+                return
+
+            new_worker = self._start_worker(worker.index)
+            self._workers[worker.index] = new_worker
+
+            for stream_id in worker.streams:
+                if stream_id in self._closing_streams:
+                    self._forget_stream(stream_id)
+                    continue
+
+                # Frames already in the old worker's shared memory stay valid,
+                # but the new worker will write to its own
+                buffer_name = self._stream_buffers.pop(stream_id, None)
+                if buffer_name in self._buffers:
+                    self._buffers[buffer_name].retired = True
+
+                self._readers[stream_id]._set_status(StreamStatus.HALTED)
+
+                new_worker.streams.add(stream_id)
+                new_worker.send("open", stream_id,
+                                self._stream_options[stream_id])
+
+    def _attach_buffer(self, stream_id: int,
+                       buffer_name: str) -> Optional["_AttachedBuffer"]:
+        if buffer_name not in self._buffers:
+            try:
+                self._buffers[buffer_name] = _AttachedBuffer(buffer_name)
+            except FileNotFoundError:
+                # The worker has already moved on from this segment
+                return None
+
+        # The worker allocates a new segment when frames outgrow the old one
+        previous_name = self._stream_buffers.get(stream_id)
+        if previous_name != buffer_name and previous_name in self._buffers:
+            self._buffers[previous_name].retired = True
+        self._stream_buffers[stream_id] = buffer_name
+
+        return self._buffers[buffer_name]
+
+    def _release_slot(self, stream_id: int, buffer_name: str,
+                      slot: int) -> None:
+        """Called once the client has dropped every reference to a frame"""
+        with self._lock:
+            buffer = self._buffers.get(buffer_name)
+            if buffer is not None:
+                buffer.views -= 1
+
+            worker = self._worker_for_stream(stream_id)
+            if worker is not None:
+                worker.send("release", stream_id, buffer_name, slot)
+
+    def _close_retired_buffers(self) -> None:
+        """Detach from segments that no frame points into anymore.
+
+        This can't be done as soon as the last frame is released, as the
+        frame's array still holds on to the segment while it's finalized.
+        """
+        for buffer_name, buffer in list(self._buffers.items()):
+            if not buffer.retired or buffer.views > 0:
+                continue
+
+            try:
+                buffer.shared_memory.close()
+            except BufferError:
+                # A frame is still being finalized. Try again later
+                continue
+
+            del self._buffers[buffer_name]
+
+    def _worker_for_stream(self, stream_id: int) -> Optional["_WorkerHandle"]:
+        for worker in self._workers:
+            if stream_id in worker.streams:
+                return worker
+
+        return None
+
+
+@dataclass(eq=False)
+class _WorkerHandle:
+    """The client process' side of a worker process"""
+
+    index: int
+    process: multiprocessing.process.BaseProcess
+    command_conn: Connection
+    event_conn: Connection
+    streams: Set[int] = field(default_factory=set)
+    """Streams assigned to the worker"""
+    send_lock: Lock = field(default_factory=Lock)
+
+    def send(self, *message) -> None:
+        with self.send_lock:
+            try:
+                self.command_conn.send(message)
+            except (BrokenPipeError, OSError):
+                # The worker has died and will be restarted by its dispatcher
+                pass
+
+
+class _AttachedBuffer:
+    """A worker's shared memory segment, attached to from the client process"""
+
+    def __init__(self, name: str):
+        self.shared_memory = SharedMemory(name=name)
+
+        self.views = 0
+        """Frames in the client process that still point into the segment"""
+
+        self.retired = False
+        """Whether the worker has stopped writing to this segment"""
+
+
+def _worker_main(command_conn: Connection, event_conn: Connection) -> None:
+    """Entry point of a worker process"""
+    environment.set_up_environment()
+
+    _DecodeWorker(command_conn, event_conn).run()
+
+
+class _DecodeWorker:
+    """Runs in a worker process. Opens and closes streams as requested by the
+    client process"""
+
+    def __init__(self, command_conn: Connection, event_conn: Connection):
+        self._command_conn = command_conn
+        self._event_conn = event_conn
+        self._send_lock = Lock()
+
+        self._streams: Dict[int, _WorkerStream] = {}
+
+    def run(self) -> None:
+        gobject_init.start()
+
+        while True:
+            try:
+                command, *args = self._command_conn.recv()
+            except (EOFError, OSError):
+                # The client process has gone away
+                break
+
+            if command == "shutdown":
+                break
+            elif command == "open":
+                self._open_stream(*args)
+            elif command == "close":
+                self._close_stream(*args)
+            elif command == "resize":
+                stream_id, output_size = args
+                if stream_id in self._streams:
+                    self._streams[stream_id].output_size = output_size
+            elif command == "pause":
+                stream_id, paused = args
+                if stream_id in self._streams:
+                    self._streams[stream_id].paused = paused
+            elif command == "release":
+                stream_id, buffer_name, slot = args
+                if stream_id in self._streams:
+                    self._streams[stream_id].release_slot(buffer_name, slot)
+
+        for stream in self._streams.values():
+            stream.close()
+        for stream in self._streams.values():
+            stream.join()
+
+    def send(self, *message) -> None:
+        with self._send_lock:
+            try:
+                self._event_conn.send(message)
+            except (BrokenPipeError, OSError):
+                pass
+
+    def _open_stream(self, stream_id: int, options: DecodeOptions) -> None:
+        if stream_id in self._streams:
+            self._close_stream(stream_id)
+
+        stream = _WorkerStream(stream_id, options, worker=self)
+        self._streams[stream_id] = stream
+        stream.start()
+
+    def _close_stream(self, stream_id: int) -> None:
+        stream = self._streams.pop(stream_id, None)
+        if stream is None:
+            # Nothing to close, but the client is waiting to hear that it is
+            self.send("closed", stream_id)
+            return
+
+        stream.close()
+        stream.join()
+
+
+class _WorkerStream(Thread):
+    """Decodes a single stream within a worker process"""
+
+    def __init__(self, stream_id: int, options: DecodeOptions, *,
+                 worker: _DecodeWorker):
+        super().__init__(name=f"Decode thread for stream ID {stream_id}",
+                         daemon=True)
+
+        self.stream_id = stream_id
+        self.options = options
+        self.output_size: Optional[SizeType] = options.output_size
+        self.paused = options.paused
+
+        self._worker = worker
+        self._close_requested = False
+
+        self._slots_lock = Lock()
+        self._buffer: Optional[SharedMemory] = None
+        self._slot_bytes = 0
+        self._free_slots: List[int] = []
+
+    def close(self) -> None:
+        self._close_requested = True
+
+    def release_slot(self, buffer_name: str, slot: int) -> None:
+        with self._slots_lock:
+            # Slots of old segments aren't reused
+            if self._buffer is not None and self._buffer.name == buffer_name:
+                self._free_slots.append(slot)
+
+    def run(self) -> None:
+        stream_reader = GstStreamReader(
+            self.stream_id,
+            url=self.options.url,
+            latency=self.options.latency,
+            runtime_options=self.options.runtime_options,
+            pipeline_str=self.options.pipeline,
+            proxied=self.options.proxied,
+        )
+        stream_reader._default_latency = self.options.latency
+
+        self._worker.send("status", self.stream_id, stream_reader.status.name)
+
+        frame_or_status_event = or_events(stream_reader.latest_frame_event,
+                                          stream_reader.new_status_event)
+
+        while not self._close_requested:
+            if not frame_or_status_event.wait(NEW_FRAME_EVENT_TIMEOUT):
+                continue
+
+            if stream_reader.new_status_event.is_set():
+                stream_reader.new_status_event.clear()
+                self._worker.send("status", self.stream_id,
+                                  stream_reader.status.name)
+            if stream_reader.latest_frame_event.is_set():
+                stream_reader.latest_frame_event.clear()
+                if not self.paused:
+                    self._handle_frame(*stream_reader.latest_frame)
+
+        stream_reader.close()
+        stream_reader.wait_until_closed()
+
+        self._worker.send("closed", self.stream_id)
+        self._release_buffer()
+
+    def _handle_frame(self, tstamp: float,
+                      frame_bgr: Optional[np.ndarray]) -> None:
+        if frame_bgr is None:
+            return
+
+        # Downscale here, so the client doesn't have to
+        max_size = _tuple_to_size(self.output_size)
+        frame = ZoneStatusFrame.from_bgr_frame(frame_bgr, tstamp,
+                                               max_size=max_size)
+        image = frame.materialize()
+        if frame.frame_array is not None:
+            pixels = frame.frame_array
+        else:
+            pixels = _image_pixels(image)
+
+        with self._slots_lock:
+            slot = self._acquire_slot(pixels.nbytes)
+            if slot is None:
+                # The client is holding on to every slot. Drop the frame
+                return
+
+            slot_array = np.ndarray(pixels.shape, dtype=np.uint8,
+                                    buffer=self._buffer.buf,
+                                    offset=slot * self._slot_bytes)
+            slot_array[...] = pixels
+            # Don't hold on to the segment, so it can be closed later
+            del slot_array
+
+            buffer_name = self._buffer.name
+            slot_bytes = self._slot_bytes
+
+        self._worker.send("frame", self.stream_id, buffer_name, slot,
+                          slot_bytes, SLOTS_PER_STREAM, tstamp, pixels.shape,
+                          _size_to_tuple(frame.source_size))
+
+    def _acquire_slot(self, frame_bytes: int) -> Optional[int]:
+        if self._buffer is None or frame_bytes > self._slot_bytes:
+            # Frames no longer fit (or this is the first one). The client
+            # process keeps its own mapping of the old segment for as long as
+            # it needs it
+            self._release_buffer()
+
+            self._buffer = SharedMemory(create=True,
+                                        size=frame_bytes * SLOTS_PER_STREAM)
+            self._slot_bytes = frame_bytes
+            self._free_slots = list(range(SLOTS_PER_STREAM))
+
+        if not self._free_slots:
+            return None
+
+        return self._free_slots.pop(0)
+
+    def _release_buffer(self) -> None:
+        if self._buffer is None:
+            return
+
+        self._buffer.close()
+        self._buffer.unlink()
+        self._buffer = None
+
+
+def _image_pixels(image: QImage) -> np.ndarray:
+    """View a BGR888 QImage's pixels as an array, without its line padding"""
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+
+    lines = np.frombuffer(bits, dtype=np.uint8) \
+        .reshape(image.height(), image.bytesPerLine())
+
+    return lines[:, :image.width() * 3].reshape(image.height(),
+                                                image.width(), 3)
+
+
+def _size_to_tuple(size: Optional[QSize]) -> Optional[SizeType]:
+    # QSize can't be pickled across processes
+    if size is None:
+        return None
+
+    return size.width(), size.height()
+
+
+def _tuple_to_size(size: Optional[SizeType]) -> Optional[QSize]:
+    if size is None:
+        return None
+
+    return QSize(*size)
@@ -1,41 +1,71 @@
 import typing
-from threading import RLock
-from typing import ClassVar, List, Optional
+from collections import deque
+from threading import Lock, RLock
+from typing import ClassVar, Deque, Optional
 from weakref import WeakSet
 
 from brainframe_qt.api_utils.streaming.zone_status_frame import \
     ZoneStatusFrame
 from brainframe_qt.ui.resources.config import StreamingSettings, RenderSettings
 
+BYTES_PER_MB = 1024 * 1024
+
 
 class SyncedFrameBuffer:
-    GUARANTEED_BUFFER_SPACE: int = 30
-    """Amount of space each buffer is allocated, even if total is over max"""
+    """Per-stream frame buffer that shares a memory budget with the buffers of
+    all other streams.
+
+    The budget is measured in bytes of frame data rather than in frames, so a
+    4K stream uses up more of it than a thumbnail-sized one. When the shared
+    budget is used up, each stream is entitled to an equal (fair) share of it,
+    and streams holding more than that are the ones that have to give up frames.
+    """
+
+    _total_lock: ClassVar[Lock] = Lock()
+    """Guards _total_bytes. Only ever held for a single arithmetic operation"""
 
-    _buffer_lock: ClassVar[RLock] = RLock()
+    _total_bytes: ClassVar[int] = 0
+    """Bytes of frame data held across all buffers. Kept up to date
+    incrementally so that checking whether the shared buffer is full doesn't
+    need to visit every buffer"""
 
     _instances = WeakSet()  # type: ClassVar[WeakSet[SyncedFrameBuffer]]
 
-    _max_buffer_size: ClassVar[int] = 300
-    """The maximum size of the shared frame buffer. This value is given a
-    default for testing purposes but will be overridden by a user-configurable
-    setting when run normally.
+    _max_buffer_bytes: ClassVar[int] = 1024 * BYTES_PER_MB
+    """The maximum size of the shared frame buffer in bytes. This value is
+    given a default for testing purposes but will be overridden by a
+    user-configurable setting when run normally.
     """
 
     _delay_compensation: ClassVar[float] = 0.0
 
     def __init__(self):
-        self._buffer: List[ZoneStatusFrame] = []
+        self._buffer_lock = RLock()
+        """Guards this instance's buffer. Each stream has its own so streams
+        don't contend with each other"""
+
+        self._buffer: Deque[ZoneStatusFrame] = deque()
+        """Ring buffer of frames, oldest on the left. Its size is bounded by
+        the shared byte budget"""
+
+        self._bytes = 0
+        """Bytes of frame data held by this buffer"""
+
         self._instances.add(self)
 
         self.render_settings = RenderSettings()
         self.set_delay_compensation(self.render_settings.delay_compensation)
 
         self.streaming_settings = StreamingSettings()
-        self.set_max_buffer_size(self.streaming_settings.frame_buffer_size)
+        self.set_max_buffer_bytes(
+            self.streaming_settings.frame_buffer_size_mb * BYTES_PER_MB)
 
         self._init_signals()
 
+    def __del__(self) -> None:
+        # Frames still in the buffer no longer count against the shared total
+        self._adjust_total_bytes(-self._bytes)
+
     def __len__(self) -> int:
         return len(self._buffer)
 
@@ -47,6 +77,11 @@ class SyncedFrameBuffer:
 
         with self._buffer_lock:
             frame.tstamp += self._delay_compensation
+
+            frame_bytes = self._frame_bytes(frame)
+            self._bytes += frame_bytes
+            self._adjust_total_bytes(frame_bytes)
+
             self._buffer.append(frame)
 
     @classmethod
@@ -58,16 +93,31 @@ class SyncedFrameBuffer:
         cls._delay_compensation = delay_compensation
 
     @classmethod
-    def set_max_buffer_size(cls, max_size: int) -> None:
-        """Sets the shared maximum size of the frame buffer.
+    def set_max_buffer_bytes(cls, max_bytes: int) -> None:
+        """Sets the shared maximum size of the frame buffer, in bytes.
 
         If this value is decreased during runtime, the buffer will not
-        immediately decrease in size. It will slowly decrease as frames are
-        removed from the buffer.
+        immediately decrease in size. It will slowly decrease as streams over
+        their fair share give up frames.
 
-        :param max_size: The new buffer size
+        :param max_bytes: The new buffer size
         """
-        cls._max_buffer_size = max_size
+        cls._max_buffer_bytes = max_bytes
+
+    @classmethod
+    def get_max_buffer_bytes(cls) -> int:
+        """The shared maximum size of the frame buffer, in bytes"""
+        return cls._max_buffer_bytes
+
+    @classmethod
+    def get_total_bytes(cls) -> int:
+        """Bytes of frame data currently held across all buffers"""
+        return cls._total_bytes
+
+    @classmethod
+    def get_buffer_count(cls) -> int:
+        """Number of buffers (one per stream reader) sharing the budget"""
+        return len(cls._instances)
 
     @property
     def is_empty(self) -> bool:
@@ -75,11 +125,26 @@ class SyncedFrameBuffer:
 
     @property
     def is_full(self) -> bool:
-        return self._total_length >= self._max_buffer_size
+        return self._total_bytes >= self._max_buffer_bytes
+
+    @property
+    def fair_share(self) -> int:
+        """Bytes of the shared buffer this buffer is entitled to when the
+        shared buffer is full"""
+        return self._max_buffer_bytes // max(self.get_buffer_count(), 1)
 
     @property
-    def needs_guaranteed_space(self) -> bool:
-        return len(self) < self.GUARANTEED_BUFFER_SPACE
+    def exceeds_fair_share(self) -> bool:
+        return self._bytes >= self.fair_share
+
+    def peek_oldest(self) -> Optional[ZoneStatusFrame]:
+        """The oldest frame in this instance's buffer, without popping it. None
+        if buffer is empty"""
+        with self._buffer_lock:
+            if self.is_empty:
+                return None
+
+            return self._buffer[0]
 
     def pop_oldest(self) -> Optional[ZoneStatusFrame]:
         """Pop the oldest frame from this instance's buffer. None if buffer is
@@ -89,7 +154,13 @@ class SyncedFrameBuffer:
                 return None
 
             # Get oldest frame for stream
-            return self._buffer.pop(0)
+            frame = self._buffer.popleft()
+
+            frame_bytes = self._frame_bytes(frame)
+            self._bytes -= frame_bytes
+            self._adjust_total_bytes(-frame_bytes)
+
+            return frame
 
     def pop_until(self, tstamp: float) -> Optional[ZoneStatusFrame]:
         """Pop frames until the provided oldest frame in the buffer is newer
@@ -131,15 +202,21 @@ class SyncedFrameBuffer:
             else:
                 return None
 
-    @property
-    def _total_length(self) -> int:
-        with self._buffer_lock:
-            return sum(map(len, self._instances))
+    @classmethod
+    def _adjust_total_bytes(cls, delta: int) -> None:
+        with cls._total_lock:
+            cls._total_bytes += delta
+
+    @staticmethod
+    def _frame_bytes(frame: ZoneStatusFrame) -> int:
+        # The decoded buffer of a full resolution frame, or the QImage of a
+        # downscaled one
+        return frame.nbytes
 
     def _handle_settings_change(self, setting: str, value: object):
-        if setting == "frame_buffer_size":
+        if setting == "frame_buffer_size_mb":
             value = typing.cast(int, value)
-            self.set_max_buffer_size(value)
+            self.set_max_buffer_bytes(value * BYTES_PER_MB)
         if setting == "video_delay_compensation":
             value = typing.cast(float, value)
             self.set_delay_compensation(value)
@@ -1,5 +1,10 @@
+import bisect
+import time
+import typing
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import timedelta
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set
 from uuid import UUID, uuid4
 
 from brainframe.api.bf_codecs import ZoneStatus, Zone
@@ -9,18 +14,49 @@ from .frame_buffer import SyncedFrameBuffer
 from .zone_status_frame import ZoneStatusFrame
 
 
+@dataclass
+class _StatusEntry:
+    """ZoneStatuses received for a single timestamp"""
+
+    tstamp: float
+    statuses: Dict[str, ZoneStatus]
+    track_ids: Set[UUID] = field(default_factory=set)
+    """Tracks that had a detection at this timestamp"""
+
+
 class FrameSyncer:
-    """Keeps frames synced with detections and tracks"""
+    """Keeps frames synced with detections and tracks.
+
+    Recent ZoneStatuses are kept in a short, time-ordered history, and each
+    buffered frame is paired with the ZoneStatuses closest to it in time. A
+    frame is held back until ZoneStatuses at or after its timestamp have
+    arrived, so that the closest ones are known, or until it has waited longer
+    than MAX_FRAME_WAIT_SECONDS.
+    """
     MAX_CACHE_TRACK_SECONDS = 30
 
+    STATUS_HISTORY_SECONDS = 10
+    """ZoneStatuses older than this (relative to the newest) are forgotten"""
+
+    MAX_FRAME_WAIT_SECONDS = 2
+    """Frames are paired with the closest ZoneStatuses available once newer
+    frames this much older than them have arrived, even if analysis hasn't
+    caught up"""
+
+    DECOUPLED_CLOCK_SECONDS = 60
+    """If frame and ZoneStatus timestamps are further apart than this, the
+    video's clock is decoupled from the server's (e.g., a proxied stream), and
+    frames can't be matched by timestamp. Frames are then paired with the
+    latest ZoneStatuses as soon as they arrive"""
+
     def __init__(self):
         self.last_status_tstamp: float = -1
-        """Keep track of the timestamp of the last new ZoneStatus that was 
+        """Keep track of the timestamp of the last new ZoneStatus that was
         received."""
 
         self.last_used_zone_statuses: Optional[Dict[str, ZoneStatus]] = None
         """The last zone status object that was put into a processed frame.
-        Useful for identifying if a ProcessFrame has new information, or is 
+        Useful for identifying if a ProcessFrame has new information, or is
         simply paired with old information."""
 
         self.latest_processed = None
@@ -29,10 +65,18 @@ class FrameSyncer:
         self.buffer = SyncedFrameBuffer()
         """Holds a queue of empty ZoneStatusFrames"""
 
-        self.tracks: Dict[UUID, DetectionTrack] = {}
+        self.tracks: typing.OrderedDict[UUID, DetectionTrack] = OrderedDict()
         """Keep a dict of Detection.track_id: DetectionTrack of all detections
-        that are ongoing. Then, every once in a while, prune DetectionTracks 
-        that haven't gotten updates in a while."""
+        that are ongoing. Then, every once in a while, prune DetectionTracks
+        that haven't gotten updates in a while.
+
+        Ordered by when each track was last updated, least recent first, so
+        that expired tracks can be pruned without looking at the others."""
+
+        self._status_history: List[_StatusEntry] = []
+        """Recently received ZoneStatuses, oldest first"""
+        self._status_tstamps: List[float] = []
+        """Timestamps of _status_history, for binary searching"""
 
     def sync(self, *,
              latest_frame: ZoneStatusFrame,
@@ -43,14 +87,17 @@ class FrameSyncer:
         Input is a ZoneStatusFrame with a frame and tstamp, and the latest
         ZoneStatuses
 
-        Returns a ZoneStatusFrame with the statuses synced to its frame, or
-        None if no frame to sync to."""
+        Returns a ZoneStatusFrame with the statuses closest in time synced to
+        its frame, or None if no frame is ready yet."""
 
         self.buffer.add_frame(latest_frame)
 
+        if len(latest_zone_statuses):
+            self._add_statuses(latest_zone_statuses)
+
         # Analysis still spinning up. Skip
-        if not len(latest_zone_statuses):
-            if not self.buffer.is_full or self.buffer.needs_guaranteed_space:
+        if not self._status_history:
+            if not self.buffer.is_full or not self.buffer.exceeds_fair_share:
                 # Keep building buffer; nothing to do
                 return None
 
@@ -60,6 +107,7 @@ class FrameSyncer:
             popped_frame = self.buffer.pop_oldest()
             popped_frame.frame_metadata.client_buffer_full = True
             popped_frame.frame_metadata.no_analysis = True
+            popped_frame.frame_metadata.synced_time = time.monotonic()
 
             # Return a ZoneStatusFrame with zone_statuses=None in the case when
             # the buffer is already full, but the server still has never
@@ -67,63 +115,166 @@ class FrameSyncer:
             self.latest_processed = popped_frame
             return popped_frame
 
-        # Get timestamp off of default zone's status (all should be equal)
-        status_tstamp = latest_zone_statuses[Zone.FULL_FRAME_ZONE_NAME].tstamp
-
-        # Check if this is a fresh zone_status or not
-        if self.last_status_tstamp != status_tstamp:
-            self.last_status_tstamp = status_tstamp
+        popped_frame = self._pop_ready_frame(newest_frame_tstamp=latest_frame.tstamp)
 
-            # Iterate over all new detections, and add them to their tracks
-            dets = latest_zone_statuses[Zone.FULL_FRAME_ZONE_NAME].within
-            for det in dets:
-                # Create new tracks where necessary
-                track_id = det.track_id if det.track_id else uuid4()
-
-                if track_id not in self.tracks:
-                    self.tracks[track_id] = DetectionTrack()
-                self.tracks[track_id].add_detection(det, status_tstamp)
-
-        # Always pop the oldest frame to prevent buffering/freezing due to decoupled timestamps
-        popped_frame = self.buffer.pop_oldest()
-
-        # If we have a frame using any means, use it
         if popped_frame is not None:
-            popped_frame.frame_metadata.analysis_latency = timedelta(seconds=0)
+            if self._is_decoupled(popped_frame.tstamp):
+                # Timestamps can't be compared. Use the latest statuses
+                entry = self._status_history[-1]
+                analysis_latency = 0.0
+            else:
+                entry = self._closest_statuses(popped_frame.tstamp)
+                analysis_latency = abs(popped_frame.tstamp - entry.tstamp)
+
+            popped_frame.frame_metadata.analysis_latency \
+                = timedelta(seconds=analysis_latency)
 
             self._apply_statuses_to_frame(
                 frame=popped_frame,
-                statuses=latest_zone_statuses,
+                entry=entry,
                 tracks=self.tracks,
             )
 
-            self.last_used_zone_statuses = latest_zone_statuses
+            self.last_used_zone_statuses = entry.statuses
+            popped_frame.frame_metadata.synced_time = time.monotonic()
+
+            self.latest_processed = popped_frame
 
         # Prune DetectionTracks using the server timestamp so they don't expire instantly
-        self._prune_detection_tracks(status_tstamp)
+        self._prune_detection_tracks(self.last_status_tstamp)
 
-        self.latest_processed = popped_frame
         return popped_frame
 
+    def _add_statuses(self, zone_statuses: Dict[str, ZoneStatus]) -> None:
+        # Get timestamp off of default zone's status (all should be equal)
+        status_tstamp = zone_statuses[Zone.FULL_FRAME_ZONE_NAME].tstamp
+
+        # Only fresh zone_statuses are new information
+        if status_tstamp == self.last_status_tstamp:
+            return
+
+        if status_tstamp < self.last_status_tstamp:
+            # The clock went backwards, e.g. the stream or server restarted.
+            # What's been kept so far is on the old timeline, and can't be
+            # ordered or compared with the new one
+            self._status_history.clear()
+            self._status_tstamps.clear()
+            self.tracks.clear()
+
+        self.last_status_tstamp = status_tstamp
+
+        entry = _StatusEntry(tstamp=status_tstamp, statuses=zone_statuses)
+
+        # Iterate over all new detections, and add them to their tracks
+        dets = zone_statuses[Zone.FULL_FRAME_ZONE_NAME].within
+        for det in dets:
+            # Create new tracks where necessary
+            track_id = det.track_id if det.track_id else uuid4()
+
+            track = self.tracks.get(track_id)
+            if track is None:
+                track = self.tracks[track_id] = DetectionTrack()
+            else:
+                self.tracks.move_to_end(track_id)
+            track.add_detection(det, status_tstamp)
+
+            entry.track_ids.add(track_id)
+
+        self._status_history.append(entry)
+        self._status_tstamps.append(status_tstamp)
+
+        # Forget statuses that are too old to be paired with buffered frames,
+        # always keeping at least two
+        oldest_kept = bisect.bisect_left(
+            self._status_tstamps, status_tstamp - self.STATUS_HISTORY_SECONDS)
+        oldest_kept = min(oldest_kept, len(self._status_history) - 2)
+        if oldest_kept > 0:
+            del self._status_history[:oldest_kept]
+            del self._status_tstamps[:oldest_kept]
+
+    def _pop_ready_frame(self, newest_frame_tstamp: float) \
+            -> Optional[ZoneStatusFrame]:
+        """Pop the oldest buffered frame, if it's ready to be paired"""
+        newest_status_tstamp = self._status_tstamps[-1]
+
+        # Frames that two newer statuses have arrived for fell behind (e.g.
+        # after a stall in analysis). Skip them so playback catches up
+        if len(self._status_tstamps) >= 2:
+            previous_status_tstamp = self._status_tstamps[-2]
+            while len(self.buffer) > 1:
+                oldest_frame = self.buffer.peek_oldest()
+                if oldest_frame.tstamp >= previous_status_tstamp \
+                        or self._is_decoupled(oldest_frame.tstamp):
+                    break
+                self.buffer.pop_oldest()
+
+        oldest_frame = self.buffer.peek_oldest()
+        if oldest_frame is None:
+            return None
+
+        if self._is_decoupled(oldest_frame.tstamp):
+            return self.buffer.pop_oldest()
+
+        # The closest statuses are known once a status at or after the frame
+        # has arrived
+        if newest_status_tstamp >= oldest_frame.tstamp:
+            return self.buffer.pop_oldest()
+
+        # Analysis is lagging behind. Don't wait on it forever
+        if newest_frame_tstamp - oldest_frame.tstamp \
+                > self.MAX_FRAME_WAIT_SECONDS:
+            return self.buffer.pop_oldest()
+
+        if self.buffer.is_full and self.buffer.exceeds_fair_share:
+            popped_frame = self.buffer.pop_oldest()
+            popped_frame.frame_metadata.client_buffer_full = True
+            return popped_frame
+
+        return None
+
+    def _closest_statuses(self, frame_tstamp: float) -> _StatusEntry:
+        """The ZoneStatuses closest in time to a frame"""
+        index = bisect.bisect_left(self._status_tstamps, frame_tstamp)
+
+        if index == 0:
+            return self._status_history[0]
+        if index == len(self._status_history):
+            return self._status_history[-1]
+
+        before = self._status_history[index - 1]
+        after = self._status_history[index]
+        if frame_tstamp - before.tstamp <= after.tstamp - frame_tstamp:
+            return before
+        else:
+            return after
+
+    def _is_decoupled(self, frame_tstamp: float) -> bool:
+        return abs(frame_tstamp - self.last_status_tstamp) \
+            > self.DECOUPLED_CLOCK_SECONDS
+
     # noinspection PyMethodMayBeStatic
     def _apply_statuses_to_frame(self, *, frame: ZoneStatusFrame,
-                                 statuses: Dict[str, ZoneStatus],
+                                 entry: _StatusEntry,
                                  tracks: Dict[UUID, DetectionTrack]) \
             -> None:
 
-        # Get timestamp off of default zone's status (all should be equal)
-        status_tstamp = statuses[Zone.FULL_FRAME_ZONE_NAME].tstamp
-
         # Get a list of DetectionTracks that had a detection for
-        # this timestamp
-        relevant_dets = [dt.copy() for dt in tracks.values()
-                         if dt.latest_tstamp == status_tstamp]
+        # this timestamp. Snapshots share the tracks' history, so the GUI thread
+        # gets a stable view of them without copying it
+        relevant_dets = [tracks[track_id].snapshot()
+                         for track_id in entry.track_ids
+                         if track_id in tracks]
 
-        frame.zone_statuses = statuses
+        frame.zone_statuses = entry.statuses
         frame.tracks = relevant_dets
 
     def _prune_detection_tracks(self, frame_tstamp: float) -> None:
-        for uuid, track in list(self.tracks.items()):
+        # Statuses only ever get newer, so the least recently updated tracks
+        # are also the ones with the oldest detections. Stop at the first
+        # track that hasn't expired
+        while self.tracks:
+            uuid, track = next(iter(self.tracks.items()))
             detection_lapse = frame_tstamp - track.latest_tstamp
-            if detection_lapse > self.MAX_CACHE_TRACK_SECONDS:
-                del self.tracks[uuid]
+            if detection_lapse <= self.MAX_CACHE_TRACK_SECONDS:
+                break
+            del self.tracks[uuid]
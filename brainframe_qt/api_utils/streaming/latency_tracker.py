@@ -0,0 +1,122 @@
+import csv
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from .zone_status_frame import ZoneStatusFrameMeta
+
+STAGES: Tuple[str, ...] = ("sync", "queue", "render", "total")
+"""Stages a frame's latency is broken down into
+
+- sync: decoded to released by the FrameSyncer. Includes the time the frame
+  spent buffered, waiting for analysis results
+- queue: released by the FrameSyncer to taken off the stream by the
+  StreamEventManager, i.e. waiting on the Qt event queue and render clock
+- render: taken off the stream to painted by the StreamWidget
+- total: decoded to painted
+"""
+
+BIN_EDGES_MS = np.array(
+    [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, np.inf])
+"""Edges of the latency histogram bins, in milliseconds. Spaced roughly
+logarithmically, as latencies range from well under a millisecond to the
+length of the frame buffer"""
+
+
+@dataclass
+class FrameLatency:
+    """Latency of a single frame at each stage, in milliseconds"""
+
+    decoded_time: float
+    """When the frame was decoded, from time.monotonic()"""
+    sync: float
+    queue: float
+    render: float
+    total: float
+
+    @classmethod
+    def from_metadata(cls, frame_metadata: ZoneStatusFrameMeta) \
+            -> Optional["FrameLatency"]:
+        """Measure a painted frame's latency from its stage timestamps.
+        Returns None if the frame didn't go through every stage"""
+        times = (frame_metadata.decoded_time, frame_metadata.synced_time,
+                 frame_metadata.dequeued_time, frame_metadata.painted_time)
+        if None in times:
+            return None
+
+        decoded_time, synced_time, dequeued_time, painted_time = times
+
+        return cls(
+            decoded_time=decoded_time,
+            sync=(synced_time - decoded_time) * 1000,
+            queue=(dequeued_time - synced_time) * 1000,
+            render=(painted_time - dequeued_time) * 1000,
+            total=(painted_time - decoded_time) * 1000,
+        )
+
+
+class FrameLatencyTracker:
+    """Rolling record of how long a stream's frames took to get from the
+    decoder to the screen, broken down by stage.
+
+    Only keeps the most recent frames, so the histograms reflect how the stream
+    is doing now. Meant to be used from the GUI thread only.
+    """
+
+    HISTORY_SIZE = 1000
+    """Number of frames the histograms are built from"""
+
+    def __init__(self, history_size: int = HISTORY_SIZE):
+        self._latencies: Deque[FrameLatency] = deque(maxlen=history_size)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def add_frame(self, frame_metadata: ZoneStatusFrameMeta) -> None:
+        """Record a frame once it has been painted. Frames that are missing
+        any of the stage timestamps are ignored"""
+        latency = FrameLatency.from_metadata(frame_metadata)
+        if latency is not None:
+            self._latencies.append(latency)
+
+    def clear(self) -> None:
+        self._latencies.clear()
+
+    def latencies(self, stage: str) -> np.ndarray:
+        """Latencies of the recorded frames at a stage, in milliseconds, oldest
+        first"""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown latency stage: {stage}")
+
+        return np.array([getattr(latency, stage)
+                         for latency in self._latencies])
+
+    def histogram(self, stage: str) -> np.ndarray:
+        """Number of recorded frames in each of the BIN_EDGES_MS bins"""
+        counts, _edges = np.histogram(self.latencies(stage), BIN_EDGES_MS)
+        return counts
+
+    def percentiles(self, stage: str,
+                    percentiles: Tuple[float, ...] = (50, 95, 99)) \
+            -> Optional[Dict[float, float]]:
+        """Percentiles of the latencies at a stage, in milliseconds, or None if
+        no frames have been recorded"""
+        latencies = self.latencies(stage)
+        if not len(latencies):
+            return None
+
+        values: List[float] = np.percentile(latencies, percentiles).tolist()
+        return dict(zip(percentiles, values))
+
+    def write_csv(self, file: TextIO) -> None:
+        """Write the latency of every recorded frame, one row per frame"""
+        writer = csv.writer(file)
+        writer.writerow(["decoded_time", *(f"{stage}_ms" for stage in STAGES)])
+
+        for latency in list(self._latencies):
+            writer.writerow([
+                f"{latency.decoded_time:.6f}",
+                *(f"{getattr(latency, stage):.3f}" for stage in STAGES),
+            ])
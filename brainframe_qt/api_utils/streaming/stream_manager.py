@@ -1,43 +1,108 @@
+import itertools
 import logging
 import typing
+from collections import OrderedDict
+from dataclasses import dataclass
 from threading import RLock
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
-from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QObject, QSize
 
 from brainframe.api.bf_codecs import StreamConfiguration
 
 from brainframe_qt.api_utils import api
+from brainframe_qt.api_utils.entity_cache import entity_cache
+from brainframe_qt.ui.resources.config import StreamingSettings
+from .decode_pool import DecodeWorkerPool
 from .synced_reader import SyncedStreamReader
 
 
+@dataclass
+class _SubscriberRequest:
+    """What a single subscriber (usually a StreamWidget) needs from a stream"""
+
+    output_size: Optional[QSize] = None
+    """Largest size the stream is displayed at. None for full resolution"""
+
+    visible: bool = True
+    """Whether the subscriber is currently on screen"""
+
+    pinned: bool = False
+    """Pinned streams are always decoded, regardless of the decode budget"""
+
+
 class StreamManager(QObject):
-    """Keeps track of existing Stream objects, and creates new ones as necessary"""
+    """Keeps track of existing Stream objects, and creates new ones as necessary.
+
+    Only a limited number of streams are decoded at once (the decode budget). Each
+    subscriber reports whether it's on screen, and whether it's pinned (e.g. the
+    expanded stream). Pinned streams always run, then visible streams get the rest
+    of the budget, most recently requested first. Streams that aren't on screen
+    are paused.
 
-    _MAX_ACTIVE_STREAMS = 5
-    """Number of streams to run concurrently"""
+    A few of the most recently paused streams are warm paused: they stay
+    connected so that they can resume (e.g. when scrolled back into view) without
+    reconnecting. Streams decoded in this process keep decoding while warm paused,
+    so they're only kept connected with what's left of the decode budget. Streams
+    paused explicitly with pause_streaming are always disconnected.
+    """
 
     def __init__(self, *, parent: QObject):
         super().__init__(parent=parent)
 
         self._stream_lock = RLock()
 
-        self._running_streams: List[int] = []
-        """Currently running streams. Does not include stay-alive streams.
-        
-        Max length should be _NUM_ACTIVE_STREAMS
-        """
-        self._paused_streams: List[int] = []
+        self._running_streams: Set[int] = set()
+        """Currently running streams"""
+        self._paused_streams: Set[int] = set()
         """Currently paused streams"""
+        self._held_streams: Set[int] = set()
+        """Streams explicitly paused with pause_streaming. They aren't scheduled
+        until resume_streaming is called"""
+        self._warm_streams: typing.OrderedDict[int, None] = OrderedDict()
+        """Paused streams that are still connected, least recently paused first.
+        Used as an ordered set"""
 
         self.stream_readers: Dict[int, SyncedStreamReader] = {}
         """All StreamReaders currently instantiated, paused or unpaused"""
 
+        self._requests: Dict[int, Dict[object, _SubscriberRequest]] = {}
+        """What each subscriber of each stream has requested"""
+
+        self._request_order = itertools.count()
+        self._last_requested: Dict[int, int] = {}
+        """When each stream was last started or resumed. Used to break ties between
+        streams with the same priority, most recent first"""
+
+        self.streaming_settings = StreamingSettings()
+
+        self._decode_pool: Optional[DecodeWorkerPool] = None
+        """Worker processes that decode streams, if enabled. Started along with
+        the first stream"""
+
         self._init_signals()
 
     def _init_signals(self) -> None:
         self.destroyed.connect(self.close)
 
+        self.streaming_settings.value_changed.connect(self._handle_settings_change)
+
+    @property
+    def max_decoding_streams(self) -> int:
+        """Maximum number of streams to decode concurrently"""
+        return self.streaming_settings.max_decoding_streams
+
+    @property
+    def max_warm_paused_streams(self) -> int:
+        """Maximum number of paused streams to keep connected"""
+        return max(self.streaming_settings.max_warm_paused_streams, 0)
+
+    @property
+    def max_decoding_pixel_rate(self) -> float:
+        """Maximum number of pixels per second to decode across all streams. 0 for
+        no limit"""
+        return self.streaming_settings.max_decoding_megapixels * 1_000_000
+
     def close(self) -> None:
         """Request and wait for all streams to close"""
         self._close()
@@ -47,29 +112,130 @@ class StreamManager(QObject):
         its corresponding StreamReader
         """
         api.delete_stream_configuration(stream_id, timeout=timeout)
+        entity_cache.invalidate_stream(stream_id)
         self.stop_streaming(stream_id)
 
     def pause_streaming(self, stream_id) -> None:
-        self._set_stream_paused(stream_id, True)
-        self._ensure_running_streams()
+        """Pause a stream until resume_streaming is called, even if it's visible"""
+        with self._stream_lock:
+            self._held_streams.add(stream_id)
+            self._ensure_running_streams()
 
     def resume_streaming(self, stream_id) -> None:
-        self._set_stream_paused(stream_id, False)
-        self._ensure_running_streams()
+        """Give a stream priority over other streams of the same visibility, and
+        release it if it was paused with pause_streaming"""
+        with self._stream_lock:
+            self._held_streams.discard(stream_id)
+            self._last_requested[stream_id] = next(self._request_order)
+            self._ensure_running_streams()
 
     def start_streaming(
             self,
             stream_conf: StreamConfiguration,
             url: str,
+            output_size: Optional[QSize] = None,
+            *,
+            subscriber: object = None,
+            visible: bool = True,
+            pinned: bool = False,
     ) -> SyncedStreamReader:
         """Starts reading from the stream using the given information, or returns an
         existing reader if we're already reading this stream.
 
         :param stream_conf: The stream to connect to
         :param url: The URL to stream on
+        :param output_size: The largest size the subscriber will display the stream
+            at. The stream's frames are downscaled to fit the largest size requested
+            by any of its subscribers. None for full resolution
+        :param subscriber: The object that will be displaying the stream. Used to
+            update or release its requests later on
+        :param visible: Whether the subscriber is currently on screen
+        :param pinned: Whether the stream should be decoded regardless of the
+            decode budget
         :return: A SyncedStreamReader for the stream
         """
-        return self._start_stream(stream_conf, url)
+        with self._stream_lock:
+            stream_reader = self._get_stream_reader(stream_conf, url)
+
+            self._requests.setdefault(stream_conf.id, {})[subscriber] = \
+                _SubscriberRequest(output_size, visible=visible, pinned=pinned)
+            self._update_output_size(stream_conf.id)
+
+            self._last_requested[stream_conf.id] = next(self._request_order)
+            self._ensure_running_streams()
+
+        return stream_reader
+
+    def set_output_size(
+            self,
+            stream_id: int,
+            subscriber: object,
+            output_size: Optional[QSize]
+    ) -> None:
+        """Update the output size requested by a subscriber of a stream. The stream
+        is renegotiated if the largest requested size changes, for example when a
+        stream is expanded.
+
+        :param stream_id: The ID of the stream
+        :param subscriber: The object displaying the stream
+        :param output_size: The largest size the subscriber will display the stream
+            at. None for full resolution
+        """
+        with self._stream_lock:
+            request = self._get_request(stream_id, subscriber)
+            if request is None:
+                return
+
+            request.output_size = output_size
+            self._update_output_size(stream_id)
+
+    def set_visible(self, stream_id: int, subscriber: object, visible: bool) -> None:
+        """Update whether a subscriber of a stream is on screen. Streams that aren't
+        on screen for any of their subscribers are paused
+
+        :param stream_id: The ID of the stream
+        :param subscriber: The object displaying the stream
+        :param visible: Whether the subscriber is on screen
+        """
+        with self._stream_lock:
+            request = self._get_request(stream_id, subscriber)
+            if request is None or request.visible is visible:
+                return
+
+            request.visible = visible
+            self._ensure_running_streams()
+
+    def set_pinned(self, stream_id: int, subscriber: object, pinned: bool) -> None:
+        """Update whether a subscriber needs a stream decoded regardless of the
+        decode budget
+
+        :param stream_id: The ID of the stream
+        :param subscriber: The object displaying the stream
+        :param pinned: Whether the stream should always be decoded
+        """
+        with self._stream_lock:
+            request = self._get_request(stream_id, subscriber)
+            if request is None or request.pinned is pinned:
+                return
+
+            request.pinned = pinned
+            self._ensure_running_streams()
+
+    def release_subscriber(self, stream_id: int, subscriber: object) -> None:
+        """Forget the requests of a subscriber that is no longer displaying the
+        stream
+
+        :param stream_id: The ID of the stream
+        :param subscriber: The object that was displaying the stream
+        """
+        with self._stream_lock:
+            if self._get_request(stream_id, subscriber) is None:
+                return
+
+            del self._requests[stream_id][subscriber]
+
+            self._update_output_size(stream_id)
+            self._ensure_running_streams()
 
     def stop_streaming(self, stream_id: int) -> None:
         """Requests a stream to close asynchronously
@@ -86,6 +252,10 @@ class StreamManager(QObject):
                 self._stop_stream(stream_id)
                 stream_reader.wait_until_closed()
 
+            if self._decode_pool is not None:
+                self._decode_pool.close()
+                self._decode_pool = None
+
     def _create_synced_reader(
             self, stream_conf: StreamConfiguration, url: str
     ) -> SyncedStreamReader:
@@ -93,6 +263,7 @@ class StreamManager(QObject):
         synced_stream_reader = SyncedStreamReader(
             stream_conf,
             url,
+            decode_pool=self._get_decode_pool(),
             # No parent if moving to a different thread
             parent=typing.cast(QObject, None),
         )
@@ -100,23 +271,100 @@ class StreamManager(QObject):
         return synced_stream_reader
 
     def _ensure_running_streams(self) -> None:
-        """Pause/unpause streams if over/under max"""
+        """Run the highest priority streams that fit within the decode budget, and
+        pause the rest"""
         with self._stream_lock:
-            while (
-                len(self._running_streams) < self._MAX_ACTIVE_STREAMS
-                and self._paused_streams
-            ):
-                self._set_stream_paused(self._paused_streams[0], False)
+            max_streams = self.max_decoding_streams
+            max_pixel_rate = self.max_decoding_pixel_rate
+
+            num_streams = 0
+            pixel_rate = 0.0
+
+            def fits_budget(stream_pixel_rate_: float) -> bool:
+                if num_streams >= max_streams:
+                    return False
+                # Always allow at least one stream, however large
+                return not max_pixel_rate or not num_streams \
+                    or pixel_rate + stream_pixel_rate_ <= max_pixel_rate
+
+            # Hidden streams sort after all the visible ones, so they're only
+            # warm paused with what's left of the budget after those
+            for stream_id in sorted(self.stream_readers, key=self._stream_priority):
+                pinned, visible = self._stream_visibility(stream_id)
+                stream_pixel_rate = self.stream_readers[stream_id].pixel_rate
+
+                held = stream_id in self._held_streams
+
+                if pinned:
+                    run = True
+                elif not visible or held:
+                    run = False
+                else:
+                    run = fits_budget(stream_pixel_rate)
+
+                warm = not run and not held
+                if warm and self._decode_pool is None:
+                    # Warm paused streams are still decoded when decoding in
+                    # this process, so they count against the budget
+                    warm = fits_budget(stream_pixel_rate)
+
+                if run or warm:
+                    num_streams += 1
+                    pixel_rate += stream_pixel_rate
+
+                self._set_stream_paused(stream_id, paused=not run, warm=warm)
+
+            self._trim_warm_streams()
+
+            if self._decode_pool is None:
+                decoded_streams = self._running_streams.union(self._warm_streams)
+            else:
+                decoded_streams = self._running_streams
+            logging.debug(
+                f"Decoding {len(decoded_streams)} of {len(self.stream_readers)} "
+                f"streams ({len(self._warm_streams)} warm paused) at "
+                f"{self._pixel_rate(decoded_streams) / 1_000_000:.1f} MP/s"
+            )
 
-            for _running_stream_id in self._running_streams[self._MAX_ACTIVE_STREAMS:]:
-                self._set_stream_paused(_running_stream_id, paused=True)
+    def _pixel_rate(self, stream_ids: Set[int]) -> float:
+        return sum(self.stream_readers[stream_id].pixel_rate
+                   for stream_id in stream_ids)
 
     def _forget_stream(self, stream_id: int) -> None:
         with self._stream_lock:
             self._set_stream_paused(stream_id, paused=True)
 
             self._paused_streams.remove(stream_id)
+            self._held_streams.discard(stream_id)
+            self._warm_streams.pop(stream_id, None)
             self.stream_readers.pop(stream_id)
+            self._requests.pop(stream_id, None)
+            self._last_requested.pop(stream_id, None)
+
+    def _get_decode_pool(self) -> Optional[DecodeWorkerPool]:
+        """The pool of decode worker processes. None if streams are decoded in
+        this process.
+
+        The number of workers is read when the first stream is started, so
+        changing it takes effect the next time the client is started.
+        """
+        with self._stream_lock:
+            worker_count = self.streaming_settings.decode_worker_processes
+            if self._decode_pool is None and worker_count > 0:
+                self._decode_pool = DecodeWorkerPool(worker_count)
+
+            return self._decode_pool
+
+    def _get_request(
+        self,
+        stream_id: int,
+        subscriber: object,
+    ) -> Optional[_SubscriberRequest]:
+        with self._stream_lock:
+            if stream_id not in self.stream_readers:
+                return None
+
+            return self._requests.get(stream_id, {}).get(subscriber)
 
     def _get_stream_reader(
         self,
@@ -125,46 +373,96 @@ class StreamManager(QObject):
     ) -> Optional[SyncedStreamReader]:
         with self._stream_lock:
             if stream_conf.id in self.stream_readers:
-                # If it's paused, then run self._unpause_stream, otherwise, return it
                 stream_reader = self.stream_readers[stream_conf.id]
             else:
                 stream_reader = self._create_synced_reader(stream_conf, url)
                 self.stream_readers[stream_conf.id] = stream_reader
 
+                # Newly created readers start off streaming
+                self._running_streams.add(stream_conf.id)
+
         return stream_reader
 
-    def _set_stream_paused(self, stream_id: int, paused: bool) -> None:
+    def _handle_settings_change(self, setting: str, _value: object) -> None:
+        if setting in ("max_decoding_streams", "max_decoding_megapixels",
+                       "max_warm_paused_streams"):
+            self._ensure_running_streams()
+
+    def _set_stream_paused(self, stream_id: int, paused: bool,
+                           warm: bool = False) -> None:
+        """
+        :param warm: Whether a stream that's being paused should stay connected.
+            Streams that are already warm paused are disconnected if False
+        """
         with self._stream_lock:
             stream_reader = self.stream_readers[stream_id]
 
-            if paused:
-                stream_reader.pause_streaming()
-                destination_list = self._paused_streams
-            else:
+            warm = warm and self.max_warm_paused_streams > 0
+
+            # Pausing a paused reader would make it pause again as soon as it's
+            # resumed, so only act on changes
+            if paused and stream_id not in self._paused_streams:
+                stream_reader.pause_streaming(warm=warm)
+                if warm:
+                    self._warm_streams[stream_id] = None
+            elif paused and not warm and stream_id in self._warm_streams:
+                del self._warm_streams[stream_id]
+                stream_reader.end_warm_pause()
+            elif not paused and stream_id not in self._running_streams:
                 stream_reader.resume_streaming()
-                destination_list = self._running_streams
 
-            if stream_id in self._paused_streams:
-                self._paused_streams.remove(stream_id)
-            if stream_id in self._running_streams:
-                self._running_streams.remove(stream_id)
+            if not paused:
+                self._warm_streams.pop(stream_id, None)
 
-            destination_list.insert(0, stream_id)
+            self._running_streams.discard(stream_id)
+            self._paused_streams.discard(stream_id)
 
-    def _start_stream(
-            self,
-            stream_conf: StreamConfiguration,
-            url: str,
-    ) -> SyncedStreamReader:
+            if paused:
+                self._paused_streams.add(stream_id)
+            else:
+                self._running_streams.add(stream_id)
+
+    def _trim_warm_streams(self) -> None:
+        """Disconnect the least recently paused streams that don't fit in the
+        warm pause limit"""
         with self._stream_lock:
-            stream_reader = self._get_stream_reader(stream_conf, url)
+            while len(self._warm_streams) > self.max_warm_paused_streams:
+                stream_id, _ = self._warm_streams.popitem(last=False)
+                self.stream_readers[stream_id].end_warm_pause()
 
-            if stream_conf.id not in self._running_streams:
-                self._set_stream_paused(stream_conf.id, False)
+    def _stream_priority(self, stream_id: int) -> Tuple[bool, bool, int]:
+        """Sort key for streams. Pinned, then visible, then most recently requested
+        streams come first"""
+        pinned, visible = self._stream_visibility(stream_id)
+        return not pinned, not visible, -self._last_requested.get(stream_id, -1)
 
-            self._ensure_running_streams()
+    def _stream_visibility(self, stream_id: int) -> Tuple[bool, bool]:
+        """Whether any subscriber has pinned the stream, and whether any has it on
+        screen"""
+        requests: List[_SubscriberRequest] = \
+            list(self._requests.get(stream_id, {}).values())
 
-        return stream_reader
+        pinned = any(request.pinned for request in requests)
+        visible = any(request.visible for request in requests)
+
+        return pinned, visible
+
+    def _update_output_size(self, stream_id: int) -> None:
+        """Size the stream's frames to the largest of its subscribers' requests"""
+        with self._stream_lock:
+            output_sizes = [request.output_size
+                            for request in self._requests.get(stream_id, {}).values()]
+
+            if not output_sizes \
+                    or any(output_size is None for output_size in output_sizes):
+                output_size = None
+            else:
+                output_size = QSize(
+                    max(output_size.width() for output_size in output_sizes),
+                    max(output_size.height() for output_size in output_sizes),
+                )
+
+            self.stream_readers[stream_id].set_output_size(output_size)
 
     def _stop_stream(self, stream_id: int) -> None:
         with self._stream_lock:
@@ -1,9 +1,10 @@
 import logging
+import time
 from enum import Enum, auto
 from threading import Event, Thread
-from typing import Optional
+from typing import Optional, Union
 
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QSize, pyqtSignal
 
 from brainframe.api.bf_codecs import StreamConfiguration
 from gstly import gobject_init
@@ -12,11 +13,15 @@ from gstly.stream_reader import GstStreamReader, StreamReader, StreamStatus
 from brainframe_qt.api_utils import api
 from brainframe_qt.util.events import or_events
 
+from .decode_pool import DecodeOptions, DecodeWorkerPool, RemoteStreamReader
 from .frame_syncer import FrameSyncer
 from .zone_status_frame import ZoneStatusFrame
 
 NEW_FRAME_EVENT_TIMEOUT: float = 30.0
 
+PIXEL_RATE_SMOOTHING: float = 0.1
+"""Weight of the newest frame in the decoded pixel rate's moving average"""
+
 
 class SyncedStatus(Enum):
     """SyncedStreamReader wrapper of gstly's StreamStatus.
@@ -64,18 +69,27 @@ class SyncedStreamReader(QObject):
         stream_conf: StreamConfiguration,
         stream_url: str,
         *,
+        decode_pool: Optional[DecodeWorkerPool] = None,
         parent: QObject
     ):
         """Creates a new SyncedStreamReader.
         :param stream_conf: The stream that this synced stream reader is for
         :param stream_url: The url of the stream
+        :param decode_pool: If provided, the stream is decoded in one of the
+            pool's worker processes instead of in this process
         """
         super().__init__(parent=parent)
 
         self.stream_conf = stream_conf
         self.stream_url = stream_url
 
-        self._stream_reader: Optional[GstStreamReader] = None
+        self._decode_pool = decode_pool
+
+        self._stream_reader: Optional[
+            Union[GstStreamReader, RemoteStreamReader]] = None
+        self._frame_or_status_event: Optional[Event] = None
+        """Set when _stream_reader has a new frame or status. Created along with
+        the reader, as or_events can only be applied to its events once"""
 
         self.latest_processed_frame: Optional[ZoneStatusFrame] = None
         """Latest frame synced with results.
@@ -83,12 +97,25 @@ class SyncedStreamReader(QObject):
 
         self.frame_syncer = FrameSyncer()
 
+        self._output_size: Optional[QSize] = None
+        """Frames larger than this are downscaled to fit before being buffered.
+        None to keep the full resolution"""
+
+        self._pixel_rate = 0.0
+        """Moving average of decoded pixels per second"""
+        self._last_frame_time: Optional[float] = None
+
         self._stream_status = SyncedStatus.INITIALIZING
 
         self._start_streaming_event = Event()
         """Used to request the thread to start streaming"""
         self._pause_streaming_event = Event()
         """Used to request the thread to (temporarily) pause streaming"""
+        self._end_warm_pause_event = Event()
+        """Used to request the thread to disconnect a warm paused stream"""
+
+        self._warm_pause = False
+        """Whether the requested pause should keep the stream connected"""
 
         self._start_streaming_event.set()
 
@@ -117,6 +144,15 @@ class SyncedStreamReader(QObject):
             or self.stream_status is SyncedStatus.PAUSED
         )
 
+    @property
+    def is_warm_paused(self) -> bool:
+        """Whether the stream is paused but still connected, so that it can be
+        resumed without reconnecting"""
+        return (
+            self.stream_status is SyncedStatus.PAUSED
+            and self._stream_reader is not None
+        )
+
     @property
     def stream_status(self) -> SyncedStatus:
         """The current status of the stream"""
@@ -132,19 +168,59 @@ class SyncedStreamReader(QObject):
             self._stream_status = stream_status
             self.stream_state_changed.emit(stream_status)
 
+    @property
+    def output_size(self) -> Optional[QSize]:
+        """The size frames are downscaled to fit within. None if frames are kept
+        at full resolution"""
+        return self._output_size
+
+    @property
+    def pixel_rate(self) -> float:
+        """Decoded pixels per second, measured at full resolution. Keeps its last
+        value while the stream is paused, as an estimate of the cost of resuming
+        it. 0 if no frames have been decoded yet"""
+        return self._pixel_rate
+
+    def set_output_size(self, output_size: Optional[QSize]) -> None:
+        """Downscale frames to fit within output_size from the next frame on.
+
+        The GstStreamReader doesn't expose its pipeline's caps, so scaling is
+        done on this reader's thread right after decode. Everything downstream
+        (the frame buffer and the GUI thread) only ever sees the smaller frames.
+
+        :param output_size: The largest size frames need to be displayed at.
+            None for full resolution
+        """
+        self._output_size = output_size
+
+        # Streams decoded in a worker process are downscaled there instead
+        stream_reader = self._stream_reader
+        if isinstance(stream_reader, RemoteStreamReader):
+            stream_reader.set_output_size(output_size)
+
     def close(self) -> None:
         """Sends a request to close the SyncedStreamReader"""
         logging.debug(f"SyncedStreamReader for stream {self.stream_conf.id} closing")
 
         self._interrupt_requested = True
 
-    def pause_streaming(self) -> None:
+    def pause_streaming(self, *, warm: bool = False) -> None:
         """Pause streaming.
         Streaming is not immediately paused, but will be handled in the main loop in
         _process_stream_events
+
+        :param warm: If True, the stream stays connected while paused and its
+            frames are ignored, so that resuming it doesn't have to reconnect.
+            Otherwise the stream is closed until it's resumed
         """
+        self._warm_pause = warm
         self._pause_streaming_event.set()
 
+    def end_warm_pause(self) -> None:
+        """Disconnect a warm paused stream, leaving it paused. Does nothing if the
+        stream isn't warm paused by the time the request is handled"""
+        self._end_warm_pause_event.set()
+
     def resume_streaming(self) -> None:
         """Resume (more accurately, re-start) streaming.
         Streaming is not immediately paused, but will be handled in the main loop.
@@ -163,6 +239,10 @@ class SyncedStreamReader(QObject):
             if self._start_streaming_event.wait(0.2):
                 self._start_streaming()
                 self._process_stream_events()
+            elif self._end_warm_pause_event.is_set():
+                self._end_warm_pause_event.clear()
+                if self._stream_reader is not None:
+                    self._stop_streaming()
 
         if self._stream_reader is not None:
             self._stop_streaming()
@@ -186,6 +266,7 @@ class SyncedStreamReader(QObject):
         self.finished.emit()
 
     def _handle_frame_event(self) -> None:
+        decoded_time = time.monotonic()
         self._stream_reader.latest_frame_event.clear()
 
         # Get the new frame + timestamp
@@ -194,21 +275,30 @@ class SyncedStreamReader(QObject):
         if frame_bgr is None:
             return
 
-        frame_rgb = frame_bgr[..., ::-1].copy()
-        del frame_bgr
+        # Frames decoded in a worker process may have been downscaled already
+        source_size: Optional[QSize] = None
+        if isinstance(self._stream_reader, RemoteStreamReader):
+            source_size = self._stream_reader.latest_source_size
+
+        if source_size is not None:
+            self._measure_pixel_rate(source_size.width() * source_size.height())
+        else:
+            self._measure_pixel_rate(frame_bgr.shape[0] * frame_bgr.shape[1])
 
         # Get the latest zone statuses from status receiver thread
         statuses = api.get_status_receiver().latest_statuses(self.stream_conf.id)
 
-        # Convert the numpy frame to a QImage (Thread-Safe)
-        frame = ZoneStatusFrame.image_from_numpy_frame(frame_rgb)
+        # Downscale the frame now if it's too large. Otherwise the decoded
+        # buffer is only wrapped in a QImage once the GUI displays it. The
+        # ZoneStatusFrame keeps the buffer alive until then
+        frame = ZoneStatusFrame.from_bgr_frame(frame_bgr, frame_tstamp,
+                                               max_size=self._output_size,
+                                               source_size=source_size)
+        frame.frame_metadata.decoded_time = decoded_time
 
         # Run the syncing algorithm
         new_processed_frame = self.frame_syncer.sync(
-            latest_frame=ZoneStatusFrame(
-                frame=frame,
-                tstamp=frame_tstamp,
-            ),
+            latest_frame=frame,
             latest_zone_statuses=statuses
         )
 
@@ -228,14 +318,37 @@ class SyncedStreamReader(QObject):
             if is_new:
                 self.frame_received.emit()
 
+    def _measure_pixel_rate(self, frame_pixels: int) -> None:
+        now = time.monotonic()
+        last_frame_time, self._last_frame_time = self._last_frame_time, now
+
+        if last_frame_time is None or now <= last_frame_time:
+            return
+
+        pixel_rate = frame_pixels / (now - last_frame_time)
+        if self._pixel_rate:
+            pixel_rate = (PIXEL_RATE_SMOOTHING * pixel_rate
+                          + (1 - PIXEL_RATE_SMOOTHING) * self._pixel_rate)
+
+        self._pixel_rate = pixel_rate
+
     def _handle_status_event(self) -> None:
         self._stream_reader.new_status_event.clear()
 
         self.stream_status = SyncedStatus.from_stream_status(self._stream_reader.status)
 
     def _start_streaming(self) -> None:
-        """Create a new GstStreamReader. Gstreamer streaming begins immediately"""
+        """Create a new GstStreamReader. Gstreamer streaming begins immediately.
+        Warm paused streams carry on with their existing reader instead"""
         self._start_streaming_event.clear()
+        self._end_warm_pause_event.clear()
+
+        # Don't count the time spent paused as time between frames
+        self._last_frame_time = None
+
+        if self._stream_reader is not None:
+            self._resume_warm_stream()
+            return
 
         pipeline: Optional[str] = self.stream_conf.connection_options.get("pipeline")
 
@@ -245,21 +358,48 @@ class SyncedStreamReader(QObject):
         # Streams created with a premises are always proxied from that premises
         is_proxied = self.stream_conf.premises_id is not None
 
-        gobject_init.start()
+        if self._decode_pool is not None:
+            decode_options = DecodeOptions(
+                url=self.stream_url,
+                latency=latency,
+                runtime_options=self.stream_conf.runtime_options,
+                pipeline=pipeline,
+                proxied=is_proxied,
+            )
+            self._stream_reader = self._decode_pool.open_stream(
+                self.stream_conf.id, decode_options,
+                output_size=self._output_size)
+        else:
+            gobject_init.start()
+
+            self._stream_reader = GstStreamReader(
+                self.stream_conf.id,
+                url=self.stream_url,
+                latency=latency,
+                runtime_options=self.stream_conf.runtime_options,
+                pipeline_str=pipeline,
+                proxied=is_proxied
+            )
+            self._stream_reader._default_latency = latency
 
-        self._stream_reader = GstStreamReader(
-            self.stream_conf.id,
-            url=self.stream_url,
-            latency=latency,
-            runtime_options=self.stream_conf.runtime_options,
-            pipeline_str=pipeline,
-            proxied=is_proxied
+        self._frame_or_status_event = or_events(
+            self._stream_reader.latest_frame_event,
+            self._stream_reader.new_status_event
         )
-        self._stream_reader._default_latency = latency
 
         # Ensure that the status is sent out (esp. if we're resuming a stream)
         self.stream_status = SyncedStatus.INITIALIZING
 
+    def _resume_warm_stream(self) -> None:
+        """Carry on with the reader of a warm paused stream"""
+        if isinstance(self._stream_reader, RemoteStreamReader):
+            self._stream_reader.set_paused(False)
+
+        # The stream is still connected, so there's no need to show it
+        # initializing again. Its next frame is processed right away
+        self.stream_status = SyncedStatus.from_stream_status(
+            self._stream_reader.status)
+
     def _stop_streaming(self) -> None:
         """Stop the current stream. Blocking function.
 
@@ -269,6 +409,7 @@ class SyncedStreamReader(QObject):
         self._stream_reader.close()
         self._stream_reader.wait_until_closed()
         self._stream_reader = None
+        self._frame_or_status_event = None
 
     def _process_stream_events(self) -> None:
         """Handle posted events in current object and within the GstStreamReader"""
@@ -279,15 +420,21 @@ class SyncedStreamReader(QObject):
             )
             return
 
-        frame_or_status_event = or_events(self._stream_reader.latest_frame_event,
-                                          self._stream_reader.new_status_event)
+        frame_or_status_event = self._frame_or_status_event
 
         while not self._interrupt_requested:
 
             if self._pause_streaming_event.is_set():
                 # Streaming paused. Stop loop for now
-                self.stream_status = SyncedStatus.PAUSED
                 self._pause_streaming_event.clear()
+
+                if not self._warm_pause:
+                    self._stop_streaming()
+                elif isinstance(self._stream_reader, RemoteStreamReader):
+                    # Have the worker stop sending frames that would be ignored
+                    self._stream_reader.set_paused(True)
+
+                self.stream_status = SyncedStatus.PAUSED
                 break
 
             if not frame_or_status_event.wait(NEW_FRAME_EVENT_TIMEOUT):
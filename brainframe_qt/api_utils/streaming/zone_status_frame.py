@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
 from datetime import timedelta
-from typing import Dict, List, Optional
+from threading import Lock
+from typing import ClassVar, Dict, List, Optional
 
 import numpy as np
+from PyQt5.QtCore import QSize, Qt
 from PyQt5.QtGui import QImage
 
 from brainframe.api.bf_codecs import ZoneStatus
@@ -12,10 +14,19 @@ from brainframe_qt.api_utils.detection_tracks import DetectionTrack
 
 @dataclass(eq=False)  # eq=False as np frames can't be compared using __eq__
 class ZoneStatusFrame:
-    """A frame that may or may not have undergone processing on the server."""
+    """A frame that may or may not have undergone processing on the server.
 
-    frame: QImage
-    """Frame as a QImage"""
+    Frames created from decoded buffers are lazy: they hold on to the raw
+    buffer and are only wrapped in a QImage when materialize() is called,
+    which the GUI does for the frames it actually displays. Most frames are
+    dropped by the FrameSyncer or replaced by a newer one before that happens.
+    Frames that have to be downscaled are the exception, as that's done
+    before they're buffered.
+    """
+
+    frame: Optional[QImage]
+    """Frame as a QImage. May wrap frame_array without owning its pixel data.
+    None until the frame is materialized"""
 
     tstamp: float
     """The timestamp of the frame"""
@@ -29,24 +40,158 @@ class ZoneStatusFrame:
     frame_metadata: 'ZoneStatusFrameMeta' \
         = field(default_factory=lambda: ZoneStatusFrameMeta())
 
+    frame_array: Optional[np.ndarray] = None
+    """The decoded frame that `frame` points into, or will be converted from,
+    if any. Holding a reference keeps the buffer alive for as long as the
+    QImage is in use"""
+
+    source_size: Optional[QSize] = None
+    """Resolution of the decoded frame, if `frame` was downscaled from it.
+    Zones and detections are always in decoded-frame coordinates"""
+
+    _counts_lock: ClassVar[Lock] = Lock()
+    _conversion_count: ClassVar[int] = 0
+    """Frames that have been materialized"""
+    _avoided_conversion_count: ClassVar[int] = 0
+    """Frames that were discarded without ever being materialized"""
+
     # Cython currently isn't working with @dataclass or NamedTuple, but this
     # fixes it. There's a PR to fix this, and here's the relevant issue:
     # https://github.com/cython/cython/issues/2552
     __annotations__ = {
-        'frame': QImage,
+        'frame': Optional[QImage],
         'tstamp': float,
         'zone_statuses': Optional[Dict[str, ZoneStatus]],
         'tracks': Optional[List[DetectionTrack]],
         'frame_metadata': 'ZoneStatusFrameMeta',
+        'frame_array': Optional[np.ndarray],
+        'source_size': Optional[QSize],
     }
 
+    def __del__(self) -> None:
+        if self.frame is None and self.frame_array is not None:
+            with self._counts_lock:
+                ZoneStatusFrame._avoided_conversion_count += 1
+
+    @classmethod
+    def from_bgr_frame(cls, frame_bgr: np.ndarray, tstamp: float,
+                       max_size: Optional[QSize] = None,
+                       source_size: Optional[QSize] = None) \
+            -> "ZoneStatusFrame":
+        """Create a lazy ZoneStatusFrame that holds on to the decoded BGR
+        frame until it's materialized.
+
+        Frames larger than max_size are downscaled right away, on the calling
+        (decoding) thread, so that the frame buffer and the GUI thread only
+        ever see the smaller frames. The number of bytes copied is recorded in
+        the frame's metadata.
+
+        :param frame_bgr: The decoded frame
+        :param tstamp: The timestamp of the frame
+        :param max_size: If the frame is larger than this, it is downscaled
+            (keeping its aspect ratio) to fit. None to keep the full resolution
+        :param source_size: The resolution the frame was decoded at, if it was
+            already downscaled before being passed in
+        """
+        height, width, _channels = frame_bgr.shape
+        if source_size is not None \
+                or not cls._needs_downscale(QSize(width, height), max_size):
+            return cls(
+                frame=None,
+                tstamp=tstamp,
+                frame_array=frame_bgr,
+                source_size=source_size,
+            )
+
+        frame_metadata = ZoneStatusFrameMeta()
+        if not frame_bgr.flags.c_contiguous:
+            frame_bgr = np.ascontiguousarray(frame_bgr)
+            frame_metadata.bytes_copied += frame_bgr.nbytes
+
+        # The scaled QImage owns its (much smaller) buffer. It's kept as BGR,
+        # like decoded frames, as smooth scaling converts it to RGB32
+        image = cls.image_from_numpy_frame(frame_bgr) \
+            .scaled(max_size, Qt.KeepAspectRatio, Qt.SmoothTransformation) \
+            .convertToFormat(QImage.Format_BGR888)
+        frame_metadata.bytes_copied += image.sizeInBytes()
+
+        with cls._counts_lock:
+            ZoneStatusFrame._conversion_count += 1
+
+        return cls(
+            frame=image,
+            tstamp=tstamp,
+            frame_metadata=frame_metadata,
+            source_size=QSize(width, height),
+        )
+
+    @classmethod
+    def get_conversion_count(cls) -> int:
+        """Number of frames that have been converted to a QImage"""
+        return cls._conversion_count
+
+    @classmethod
+    def get_avoided_conversion_count(cls) -> int:
+        """Number of frames that were discarded before they had to be converted
+        to a QImage"""
+        return cls._avoided_conversion_count
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of pixel data held by the frame"""
+        if self.frame_array is not None:
+            return self.frame_array.nbytes
+        if self.frame is not None:
+            return self.frame.sizeInBytes()
+        return 0
+
+    def materialize(self) -> QImage:
+        """Get the frame as a QImage, wrapping the decoded BGR frame first if
+        necessary.
+
+        The QImage points directly into the decoded frame. The pixel data is
+        only copied if the array isn't contiguous in memory. The number of
+        bytes copied is recorded in the frame's metadata.
+
+        Must only be called from one thread at a time.
+        """
+        if self.frame is not None:
+            return self.frame
+
+        frame_bgr = self.frame_array
+        if not frame_bgr.flags.c_contiguous:
+            frame_bgr = np.ascontiguousarray(frame_bgr)
+            self.frame_metadata.bytes_copied += frame_bgr.nbytes
+
+        image = self.image_from_numpy_frame(frame_bgr)
+
+        self.frame_array = frame_bgr
+        self.frame = image
+
+        with self._counts_lock:
+            ZoneStatusFrame._conversion_count += 1
+
+        return image
+
     @staticmethod
     def image_from_numpy_frame(frame: np.ndarray) -> QImage:
-        height, width, channel = frame.shape
+        """Wrap a BGR numpy frame in a QImage without copying it.
+
+        The QImage does not own the buffer, so the array must be kept alive for
+        as long as the QImage (or any shallow copy of it) is in use.
+        """
+        height, width, _channels = frame.shape
         bytes_per_line = width * 3
-        # Create a deep copy of the QImage so the background thread can safely discard the underlying numpy array
-        image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888).copy()
-        return image
+        return QImage(frame.data, width, height, bytes_per_line,
+                      QImage.Format_BGR888)
+
+    @staticmethod
+    def _needs_downscale(size: QSize, max_size: Optional[QSize]) -> bool:
+        if max_size is None or max_size.isEmpty():
+            return False
+
+        return size.width() > max_size.width() \
+            or size.height() > max_size.height()
 
 
 @dataclass
@@ -54,6 +199,19 @@ class ZoneStatusFrameMeta:
     no_analysis: bool = False
     analysis_latency: timedelta = timedelta(seconds=0)
     client_buffer_full: bool = False
+    bytes_copied: int = 0
+    """Bytes of pixel data copied on the way from the decoder to the screen"""
+
+    # Times (from time.monotonic()) that the frame passed each stage on its
+    # way to the screen, or None if it hasn't reached that stage yet
+    decoded_time: Optional[float] = None
+    """When the decoded frame was received from the stream reader"""
+    synced_time: Optional[float] = None
+    """When the FrameSyncer released the frame, paired with ZoneStatuses"""
+    dequeued_time: Optional[float] = None
+    """When a StreamEventManager took the frame off its stream for display"""
+    painted_time: Optional[float] = None
+    """When a StreamWidget finished painting the frame"""
 
     # Cython currently isn't working with @dataclass or NamedTuple, but this
     # fixes it. There's a PR to fix this, and here's the relevant issue:
@@ -61,5 +219,10 @@ class ZoneStatusFrameMeta:
     __annotations__ = {
         'no_analysis': bool,
         'analysis_latency': timedelta,
-        'client_buffer_full': bool
+        'client_buffer_full': bool,
+        'bytes_copied': int,
+        'decoded_time': Optional[float],
+        'synced_time': Optional[float],
+        'dequeued_time': Optional[float],
+        'painted_time': Optional[float],
     }
\ No newline at end of file
@@ -1,7 +1,14 @@
+import logging
+import time
 import typing
+from collections import defaultdict
+from dataclasses import dataclass, field
 from enum import Enum, auto
-from threading import RLock
-from typing import Callable, Dict, List, Set, Union
+from threading import Condition, Lock, RLock, Thread
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, \
+    Tuple, Union
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal, pyqtSlot
 
 from brainframe.api import StatusReceiver, ZONE_STATUS_TYPE
 from brainframe.api.bf_codecs import Alert, StreamConfiguration, Zone, \
@@ -19,6 +26,12 @@ ZSSDatumType = Union[
 
 ZSSDataType = List[ZSSDatumType]
 
+SLOW_CALLBACK_SECONDS = 0.05
+"""Subscriber callbacks that take longer than this are logged"""
+
+SLOW_CALLBACK_LOG_INTERVAL = 10.0
+"""Minimum seconds between logging slow calls of the same subscription"""
+
 
 class ZSSTopic(Enum):
     STREAMS = auto()
@@ -28,67 +41,391 @@ class ZSSTopic(Enum):
     ZONE_STATUSES = auto()
 
 
+_FilterKey = Tuple[Any, ...]
+
+_TOPIC_FILTERS: Dict[ZSSTopic, Tuple[str, ...]] = {
+    ZSSTopic.STREAMS: ("stream_id",),
+    ZSSTopic.ZONES: ("stream_id", "zone_id"),
+    ZSSTopic.ALARMS: ("stream_id", "zone_id", "alarm_id"),
+    ZSSTopic.ALERTS: ("stream_id", "zone_id", "alarm_id", "alert_id"),
+    ZSSTopic.ZONE_STATUSES: ("stream_id",),
+}
+"""The filters supported by each topic"""
+
+_TOPIC_DATUM_KEYS: Dict[ZSSTopic, Callable[[ZSSDatumType], _FilterKey]] = {
+    ZSSTopic.STREAMS: lambda stream: (stream.id,),
+    ZSSTopic.ZONES: lambda zone: (zone.stream_id, zone.id),
+    ZSSTopic.ALARMS: lambda alarm: (alarm.stream_id, alarm.zone_id, alarm.id),
+    ZSSTopic.ALERTS: lambda alert: (alert.stream_id, alert.zone_id,
+                                    alert.alarm_id, alert.id),
+    ZSSTopic.ZONE_STATUSES: lambda zone_status: (zone_status.zone.stream_id,),
+}
+"""Values of a datum for each of its topic's filters"""
+
+_TOPIC_DATUM_IDS: Dict[ZSSTopic, Callable[[ZSSDatumType], Any]] = {
+    ZSSTopic.STREAMS: lambda stream: stream.id,
+    ZSSTopic.ZONES: lambda zone: zone.id,
+    ZSSTopic.ALARMS: lambda alarm: alarm.id,
+    ZSSTopic.ALERTS: lambda alert: alert.id,
+    ZSSTopic.ZONE_STATUSES: lambda zone_status: zone_status.zone.id,
+}
+"""What identifies a datum between packets, for delta subscriptions"""
+
+
+_TOPIC_CONTENT_KEYS: Dict[ZSSTopic, Callable[[ZSSDatumType], Any]] = {
+    # The streams sent over the ZSS are fakes with just an ID (see _publish)
+    ZSSTopic.STREAMS: lambda stream: None,
+    # The codecs are dataclasses, so comparing them compares their fields
+    # directly, without serializing them
+    ZSSTopic.ZONES: lambda zone: zone,
+    ZSSTopic.ALARMS: lambda alarm: alarm,
+    ZSSTopic.ALERTS: lambda alert: alert,
+    # Zone statuses are new for every frame the server processes, so there's no
+    # need to look any further than their timestamp
+    ZSSTopic.ZONE_STATUSES: lambda zone_status: zone_status.tstamp,
+}
+"""What a datum is compared by, with ==, to tell whether it changed"""
+
+
+@dataclass
+class ZSSDelta:
+    """What changed in a topic since the previous packet. Sent to subscriptions
+    made with `deltas=True`"""
+
+    added: ZSSDataType = field(default_factory=list)
+    changed: ZSSDataType = field(default_factory=list)
+    removed: ZSSDataType = field(default_factory=list)
+    """The last version of each datum that is no longer being sent"""
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+def _merge_deltas(older: ZSSDelta, newer: ZSSDelta,
+                  datum_id: Callable[[ZSSDatumType], Any]) -> ZSSDelta:
+    """Combine two consecutive deltas into one with the same overall effect"""
+    changes: Dict[Any, Tuple[str, ZSSDatumType]] = {}
+
+    for change_type in ("added", "changed", "removed"):
+        for datum in getattr(older, change_type):
+            changes[datum_id(datum)] = (change_type, datum)
+
+    for change_type in ("added", "changed", "removed"):
+        for datum in getattr(newer, change_type):
+            id_ = datum_id(datum)
+            older_change_type = changes.get(id_, (None, None))[0]
+
+            if change_type == "removed" and older_change_type == "added":
+                # Came and went without the subscriber ever seeing it
+                del changes[id_]
+                continue
+
+            if change_type == "added" and older_change_type == "removed":
+                # The subscriber still has the old version of it
+                change_type = "changed"
+            elif change_type == "changed" and older_change_type == "added":
+                # The subscriber hasn't seen it yet
+                change_type = "added"
+
+            changes[id_] = (change_type, datum)
+
+    merged = ZSSDelta()
+    for change_type, datum in changes.values():
+        getattr(merged, change_type).append(datum)
+
+    return merged
+
+
 class Subscription:
 
-    def __init__(self, topic: ZSSTopic, callback: Callable, filters=None):
+    def __init__(self, topic: ZSSTopic, callback: Callable, filters=None,
+                 deltas: bool = False, gui_thread: bool = False):
         self.topic: ZSSTopic = topic
         self.callback: Callable = callback
         self.filters: Dict[str, int] = filters or {}
 
+        unsupported_filters = [
+            filter_name for filter_name, filter_value in self.filters.items()
+            if filter_value is not any
+            and filter_name not in _TOPIC_FILTERS[topic]
+        ]
+        if unsupported_filters:
+            raise ValueError(f"{topic} can't be filtered by "
+                             f"{', '.join(unsupported_filters)}")
+
+        self.deltas = deltas
+        """If True, the callback receives a ZSSDelta, and is only called when
+        something matching the filters has changed"""
+
+        self.gui_thread = gui_thread
+        """If True, the callback is called on the GUI thread. Payloads that
+        arrive while an earlier one is still waiting for the GUI thread
+        supersede it"""
+
+        self.key: _FilterKey = tuple(
+            self.filters.get(filter_name, any)
+            for filter_name in _TOPIC_FILTERS[topic]
+        )
+        """Filter values in the order of the topic's filters. `any` is a
+        wildcard"""
+
+        self.active = True
+        """False once unsubscribed. Payloads already on their way to the
+        subscription are dropped"""
+
+        self.call_count = 0
+        self.total_callback_time = 0.0
+        """Seconds spent in the callback, across all calls"""
+        self.max_callback_time = 0.0
+        self._last_slow_log: Optional[float] = None
+
     def __repr__(self):
         return f"zss_pubsub.Subscription(" \
-               f"{self.topic}, {self.callback.__qualname__}, {self.filters}" \
+               f"{self.topic}, {self.callback.__qualname__}, {self.filters}, " \
+               f"deltas={self.deltas}, gui_thread={self.gui_thread}" \
                f")"
 
     def filter_data(self, datum: ZSSDatumType):
-        if self.topic is ZSSTopic.STREAMS:
-            return self._filter_stream(datum)
-        if self.topic is ZSSTopic.ZONES:
-            return self._filter_zone(datum)
-        if self.topic is ZSSTopic.ALARMS:
-            return self._filter_alarm(datum)
-        if self.topic is ZSSTopic.ALERTS:
-            return self._filter_alert(datum)
-        if self.topic is ZSSTopic.ZONE_STATUSES:
-            return self._filter_zone_status(datum)
-
-    def _filter_zone_status(self, zone_status: ZoneStatus):
-        if self.filters["stream_id"] not in [any, zone_status.zone.stream_id]:
-            return False
-        return True
-
-    def _filter_stream(self, stream: StreamConfiguration):
-        if self.filters["stream_id"] not in [any, stream.id]:
-            return False
-        return True
-
-    def _filter_zone(self, zone: Zone):
-        if self.filters["stream_id"] not in [any, zone.stream_id]:
-            return False
-        if self.filters["zone_id"] not in [any, zone.id]:
-            return False
-        return True
-
-    def _filter_alarm(self, alarm: ZoneAlarm):
-        if self.filters["stream_id"] not in [any, alarm.stream_id]:
-            return False
-        if self.filters["zone_id"] not in [any, alarm.zone_id]:
-            return False
-        if self.filters["alarm_id"] not in [any, alarm.id]:
-            return False
-        return True
-
-    def _filter_alert(self, alert: Alert):
-        # Currently unsupported
-        # if self.filters["stream_id"] not in [any, alert.stream_id]:
-        #     return False
-        # if self.filters["zone_id"] not in [any, alert.zone_id]:
-        #     return False
-        if self.filters["alarm_id"] not in [any, alert.alarm_id]:
-            return False
-        if self.filters["alert_id"] not in [any, alert.id]:
-            return False
-        return True
+        datum_key = _TOPIC_DATUM_KEYS[self.topic](datum)
+        return all(filter_value is any or filter_value == datum_value
+                   for filter_value, datum_value in zip(self.key, datum_key))
+
+
+class _SubscriptionIndex:
+    """The subscriptions to a single topic, indexed by their filter values.
+
+    Finding the subscriptions a datum matches costs one dict lookup per
+    combination of wildcards in use (usually only a couple), no matter how many
+    subscriptions there are.
+    """
+
+    def __init__(self, topic: ZSSTopic):
+        self.topic = topic
+
+        self._datum_key = _TOPIC_DATUM_KEYS[topic]
+
+        self._by_key: Dict[_FilterKey, Set[Subscription]] = defaultdict(set)
+
+        self._wildcard_masks: Dict[Tuple[bool, ...], int] = defaultdict(int)
+        """Number of subscriptions with each combination of wildcard filters"""
+
+    def __iter__(self) -> Iterator[Subscription]:
+        for subscriptions in self._by_key.values():
+            yield from subscriptions
+
+    def __len__(self) -> int:
+        return sum(self._wildcard_masks.values())
+
+    def add(self, subscription: Subscription) -> None:
+        subscriptions = self._by_key[subscription.key]
+        if subscription in subscriptions:
+            return
+
+        subscriptions.add(subscription)
+        self._wildcard_masks[self._wildcard_mask(subscription.key)] += 1
+
+    def remove(self, subscription: Subscription) -> None:
+        """Raises KeyError if the subscription isn't in the index"""
+        subscriptions = self._by_key[subscription.key]
+        subscriptions.remove(subscription)
+        if not subscriptions:
+            del self._by_key[subscription.key]
+
+        mask = self._wildcard_mask(subscription.key)
+        self._wildcard_masks[mask] -= 1
+        if not self._wildcard_masks[mask]:
+            del self._wildcard_masks[mask]
+
+    def match(self, datum: ZSSDatumType) -> Iterator[Subscription]:
+        """Subscriptions whose filters match the datum"""
+        datum_key = self._datum_key(datum)
+
+        for mask in self._wildcard_masks:
+            key = tuple(any if is_wildcard else value
+                        for is_wildcard, value in zip(mask, datum_key))
+
+            yield from self._by_key.get(key, ())
+
+    @staticmethod
+    def _wildcard_mask(key: _FilterKey) -> Tuple[bool, ...]:
+        return tuple(filter_value is any for filter_value in key)
+
+
+def _call_subscriber(subscriber: Subscription,
+                     payload: Union[ZSSDataType, ZSSDelta]) -> None:
+    if not subscriber.active:
+        return
+
+    start_time = time.perf_counter()
+    try:
+        subscriber.callback(payload)
+    except RuntimeError as exc:
+        if "has been deleted" in str(exc):
+            # TODO: A race condition occurs when a subscriber
+            #  deletes itself while we're iterating over the
+            #  subscription list. For now, we just ignore it
+            #  because that occurrence will just resolve itself
+            #  and the subscriber's unsubscribe call will come
+            #  through eventually
+            pass
+
+            # TODO: If the above race condition is fixed, this
+            #  should be used instead of `pass`
+            # func_name = subscriber.callback.__qualname__
+            # msg = f"Pubsub callback {func_name} was called "\
+            #       f"but attempted to access a deleted " \
+            #       f"QObject:\n\t{exc}"
+            # logging.error(msg)
+        else:
+            _log_callback_error(subscriber)
+    except Exception:
+        _log_callback_error(subscriber)
+    finally:
+        _record_callback_time(subscriber, time.perf_counter() - start_time)
+
+
+def _log_callback_error(subscriber: Subscription) -> None:
+    """Log the exception a subscriber's callback raised, instead of letting it
+    stop the payload from being delivered to the other subscribers. Delta
+    subscribers in particular would never get the changes in it, as the next
+    delta is taken against it. Must be called from an except block"""
+    func_name = subscriber.callback.__qualname__
+    logging.exception(f"Pubsub callback {func_name} for {subscriber.topic} "
+                      f"raised an exception")
+
+
+def _record_callback_time(subscriber: Subscription, callback_time: float) \
+        -> None:
+    subscriber.call_count += 1
+    subscriber.total_callback_time += callback_time
+    subscriber.max_callback_time = max(subscriber.max_callback_time,
+                                       callback_time)
+
+    if callback_time < SLOW_CALLBACK_SECONDS:
+        return
+
+    # Slow subscribers are usually slow on every packet. Don't flood the log
+    now = time.monotonic()
+    if subscriber._last_slow_log is not None \
+            and now - subscriber._last_slow_log < SLOW_CALLBACK_LOG_INTERVAL:
+        return
+    subscriber._last_slow_log = now
+
+    func_name = subscriber.callback.__qualname__
+    average_time = subscriber.total_callback_time / subscriber.call_count
+    logging.warning(
+        f"Slow pubsub callback {func_name} for {subscriber.topic}: took "
+        f"{callback_time * 1000:.1f} ms (average {average_time * 1000:.1f} "
+        f"ms over {subscriber.call_count} calls)"
+    )
+
+
+class _GUIDispatcher(QObject):
+    """Delivers payloads to subscriptions on the GUI thread.
+
+    Only the latest payload for each subscription is kept while it waits for
+    the GUI thread (deltas are merged instead), and everything pending is
+    delivered in a single event. If the GUI stalls, subscribers catch up with
+    the current state once, instead of replaying every stale packet.
+    """
+
+    _drain_requested = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+
+        self._pending_lock = Lock()
+        self._pending: Dict[Subscription, Union[ZSSDataType, ZSSDelta]] = {}
+
+        self.dropped_payloads = 0
+        """Number of payloads that were superseded before being delivered"""
+
+        self._drain_requested.connect(self._drain, Qt.QueuedConnection)
+
+    def post(self, subscription: Subscription,
+             payload: Union[ZSSDataType, ZSSDelta]) -> None:
+        """Queue a payload for delivery on the GUI thread. Can be called from
+        any thread"""
+        with self._pending_lock:
+            drain_needed = not self._pending
+
+            if subscription in self._pending:
+                self.dropped_payloads += 1
+
+                if subscription.deltas:
+                    payload = _merge_deltas(
+                        self._pending[subscription], payload,
+                        _TOPIC_DATUM_IDS[subscription.topic]
+                    )
+
+            self._pending[subscription] = payload
+
+        if drain_needed:
+            self._drain_requested.emit()
+
+    def discard(self, subscription: Subscription) -> None:
+        """Forget any payload pending for the subscription"""
+        with self._pending_lock:
+            self._pending.pop(subscription, None)
+
+    @pyqtSlot()
+    def _drain(self) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+
+        for subscription, payload in pending.items():
+            _call_subscriber(subscription, payload)
+
+
+class _PublishDispatcher:
+    """Publishes packets from the ZoneStatus stream on a dedicated thread, so
+    the StatusReceiver never waits on subscribers.
+
+    Each topic holds at most one packet waiting to be published. If
+    subscribers fall behind, a newer packet replaces the waiting one, and
+    subscribers skip straight to the current state.
+    """
+
+    def __init__(self, publish: Callable[[Dict[ZSSTopic, ZSSDataType]], None]):
+        self._publish = publish
+
+        self._pending_condition = Condition()
+        self._pending: Dict[ZSSTopic, ZSSDataType] = {}
+        """The latest unpublished data of each topic"""
+
+        self.dropped_packets = 0
+        """Number of topic packets that were replaced before being published"""
+
+        self._thread: Optional[Thread] = None
+
+    def post(self, message: Dict[ZSSTopic, ZSSDataType]) -> None:
+        """Queue a message for publishing. Never blocks on subscribers"""
+        with self._pending_condition:
+            for topic, data in message.items():
+                if topic in self._pending:
+                    self.dropped_packets += 1
+                self._pending[topic] = data
+
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name="ZSSPublisher",
+                                      daemon=True)
+                self._thread.start()
+
+            self._pending_condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._pending_condition:
+                while not self._pending:
+                    self._pending_condition.wait()
+
+                message, self._pending = self._pending, {}
+
+            try:
+                self._publish(message)
+            except Exception:
+                # Keep publishing later packets
+                logging.exception("Error while publishing ZoneStatus packet")
 
 
 class _ZSSPubSub:
@@ -99,41 +436,129 @@ class _ZSSPubSub:
         self.status_receiver = typing.cast(StatusReceiver, None)
 
         self.subscriptions_lock = RLock()
-        self.subscriptions: Dict[ZSSTopic, Set[Subscription]] = {
-            topic: set()
+        self.subscriptions: Dict[ZSSTopic, _SubscriptionIndex] = {
+            topic: _SubscriptionIndex(topic)
+            for topic in ZSSTopic
+        }
+        self.delta_subscriptions: Dict[ZSSTopic, _SubscriptionIndex] = {
+            topic: _SubscriptionIndex(topic)
             for topic in ZSSTopic
         }
 
+        self._unprimed_subscriptions: Set[Subscription] = set()
+        """Delta subscriptions that haven't been sent the current data yet"""
+
+        self._snapshots: Dict[ZSSTopic, Dict[Any, Tuple[Any, ZSSDatumType]]] = {}
+        """{datum ID: (content key, datum)} for each topic as of the previous
+        packet. Only kept for topics with delta subscriptions"""
+
+        self.gui_dispatcher = _GUIDispatcher()
+        """Delivers payloads to subscriptions made with `gui_thread=True`"""
+
+        self.publish_dispatcher = _PublishDispatcher(self.publish)
+        """Publishes packets from the StatusReceiver on its own thread"""
+
     def publish(self, message: Dict[ZSSTopic, ZSSDataType]):
-        for topic, data in message.items():
-
-            # We have the chance to modify the subscriptions while iterating
-            # (even with the lock), so I just make a copy
-            subscribers = list(self.subscriptions[topic])
-
-            with self.subscriptions_lock:
-                for subscriber in subscribers:
-                    publish_data = list(filter(subscriber.filter_data, data))
-
-                    try:
-                        subscriber.callback(publish_data)
-                    except RuntimeError as exc:
-                        if "has been deleted" in str(exc):
-                            # TODO: A race condition occurs when a subscriber
-                            #  deletes itself while we're iterating over the
-                            #  subscription list. For now, we just ignore it
-                            #  because that occurrence will just resolve itself
-                            #  and the subscriber's unsubscribe call will come
-                            #  through eventually
-                            pass
-
-                            # TODO: If the above race condition is fixed, this
-                            #  should be used instead of `pass`
-                            # func_name = subscriber.callback.__qualname__
-                            # msg = f"Pubsub callback {func_name} was called "\
-                            #       f"but attempted to access a deleted " \
-                            #       f"QObject:\n\t{exc}"
-                            # logging.error(msg)
+        deliveries: List[Tuple[Subscription, Union[ZSSDataType, ZSSDelta]]] \
+            = []
+
+        with self.subscriptions_lock:
+            for topic, data in message.items():
+                deliveries.extend(self._route_deltas(topic, data))
+
+                subscriptions = self.subscriptions[topic]
+
+                # Every subscriber is called, even if none of the data matches
+                # its filters. Subscribers rely on this to know that something
+                # has gone away
+                publish_data: Dict[Subscription, ZSSDataType] = {
+                    subscription: [] for subscription in subscriptions
+                }
+
+                # Route each datum to just the subscriptions it matches
+                for datum in data:
+                    for subscription in subscriptions.match(datum):
+                        publish_data[subscription].append(datum)
+
+                deliveries.extend(publish_data.items())
+
+        # Callbacks are called without the lock, so they can't hold up
+        # (un)subscribing from other threads. Callbacks might also modify the
+        # subscriptions, so the data was routed before calling any of them
+        for subscriber, payload in deliveries:
+            self._deliver(subscriber, payload)
+
+    def _route_deltas(self, topic: ZSSTopic, data: ZSSDataType) \
+            -> List[Tuple[Subscription, ZSSDelta]]:
+        """Work out what each delta subscription to the topic should be sent.
+        Must be called with the subscriptions lock held"""
+        subscriptions = self.delta_subscriptions[topic]
+
+        if not len(subscriptions):
+            # Don't bother keeping track of changes nobody is interested in
+            self._snapshots.pop(topic, None)
+            return []
+
+        delta = self._diff(topic, data)
+
+        publish_deltas: Dict[Subscription, ZSSDelta] = defaultdict(ZSSDelta)
+
+        # New subscriptions start off with everything they match
+        unprimed = {subscription
+                    for subscription in self._unprimed_subscriptions
+                    if subscription.topic is topic}
+        for subscription in unprimed:
+            self._unprimed_subscriptions.remove(subscription)
+            publish_deltas[subscription].added.extend(
+                filter(subscription.filter_data, data))
+
+        # Everyone else just gets what changed
+        for change_type in ("added", "changed", "removed"):
+            for datum in getattr(delta, change_type):
+                for subscription in subscriptions.match(datum):
+                    if subscription in unprimed:
+                        continue
+
+                    getattr(publish_deltas[subscription], change_type) \
+                        .append(datum)
+
+        return [(subscriber, subscriber_delta)
+                for subscriber, subscriber_delta in publish_deltas.items()
+                if subscriber_delta]
+
+    def _deliver(self, subscriber: Subscription,
+                 payload: Union[ZSSDataType, ZSSDelta]) -> None:
+        if subscriber.gui_thread:
+            self.gui_dispatcher.post(subscriber, payload)
+        else:
+            _call_subscriber(subscriber, payload)
+
+    def _diff(self, topic: ZSSTopic, data: ZSSDataType) -> ZSSDelta:
+        """Compare the data to the previous packet's, and keep it for the next"""
+        datum_id = _TOPIC_DATUM_IDS[topic]
+        content_key = _TOPIC_CONTENT_KEYS[topic]
+
+        previous = self._snapshots.get(topic, {})
+        current: Dict[Any, Tuple[Any, ZSSDatumType]] = {}
+
+        delta = ZSSDelta()
+        for datum in data:
+            id_ = datum_id(datum)
+            content = content_key(datum)
+            current[id_] = (content, datum)
+
+            if id_ not in previous:
+                delta.added.append(datum)
+            # Not !=, as Codec overrides __ne__ to compare their dicts
+            elif not previous[id_][0] == content:
+                delta.changed.append(datum)
+
+        delta.removed = [datum for id_, (_content, datum) in previous.items()
+                         if id_ not in current]
+
+        self._snapshots[topic] = current
+
+        return delta
 
     def _publish(self, zone_status_packet: ZONE_STATUS_TYPE):
         streams = []
@@ -159,58 +584,88 @@ class _ZSSPubSub:
                 alarms.extend(zone_status.zone.alarms)
                 alerts.extend(zone_status.alerts)
 
-        self.publish({ZSSTopic.STREAMS: streams,
-                      ZSSTopic.ZONES: zones,
-                      ZSSTopic.ALARMS: alarms,
-                      ZSSTopic.ALERTS: alerts,
-                      ZSSTopic.ZONE_STATUSES: zone_statuses})
+        # Called on the StatusReceiver's thread. Subscribers are called on the
+        # dispatcher's, so they don't hold up receiving the next packet
+        self.publish_dispatcher.post({ZSSTopic.STREAMS: streams,
+                                      ZSSTopic.ZONES: zones,
+                                      ZSSTopic.ALARMS: alarms,
+                                      ZSSTopic.ALERTS: alerts,
+                                      ZSSTopic.ZONE_STATUSES: zone_statuses})
 
-    def subscribe(self, topic: ZSSTopic, callback: Callable, filters=None) \
+    def subscribe(self, topic: ZSSTopic, callback: Callable, filters=None,
+                  deltas: bool = False, gui_thread: bool = False) \
             -> Subscription:
+        """Subscribe to a topic of the ZoneStatus stream.
+
+        By default, the callback is called with the list of data matching the
+        filters for every packet, even if the list is empty. If deltas is True,
+        it's instead called with a ZSSDelta of what was added, changed or
+        removed, and only when something matching the filters changed. The
+        first delta has everything currently matching the filters as added.
+
+        Callbacks are called on the publisher's thread, or on the GUI thread if
+        gui_thread is True. Either way, if the callback falls behind, it's only
+        called with the latest payload. Callbacks that take longer than
+        SLOW_CALLBACK_SECONDS are logged.
+        """
 
         if self.status_receiver is None:
             self.status_receiver = api.get_status_receiver()
             self.status_receiver.add_listener(self._publish)
 
-        subscription = Subscription(topic, callback, filters)
+        subscription = Subscription(topic, callback, filters, deltas=deltas,
+                                    gui_thread=gui_thread)
         with self.subscriptions_lock:
-            self.subscriptions[topic].add(subscription)
+            if deltas:
+                self.delta_subscriptions[topic].add(subscription)
+                self._unprimed_subscriptions.add(subscription)
+            else:
+                self.subscriptions[topic].add(subscription)
         return subscription
 
-    def subscribe_zone_statuses(self, callback: Callable, stream_id=any):
+    def subscribe_zone_statuses(self, callback: Callable, stream_id=any,
+                                deltas: bool = False, gui_thread: bool = False):
         filters = {"stream_id": stream_id}
 
         return self.subscribe(ZSSTopic.ZONE_STATUSES, callback,
-                              filters=filters)
+                              filters=filters, deltas=deltas,
+                              gui_thread=gui_thread)
 
-    def subscribe_streams(self, callback: Callable, stream_id=any) \
+    def subscribe_streams(self, callback: Callable, stream_id=any,
+                          deltas: bool = False, gui_thread: bool = False) \
             -> Subscription:
 
         filters = {"stream_id": stream_id}
 
-        return self.subscribe(ZSSTopic.STREAMS, callback, filters=filters)
+        return self.subscribe(ZSSTopic.STREAMS, callback, filters=filters,
+                              deltas=deltas, gui_thread=gui_thread)
 
-    def subscribe_zones(self, callback: Callable, stream_id=any, zone_id=any) \
+    def subscribe_zones(self, callback: Callable, stream_id=any, zone_id=any,
+                        deltas: bool = False, gui_thread: bool = False) \
             -> Subscription:
 
         filters = {"stream_id": stream_id,
                    "zone_id": zone_id}
 
-        return self.subscribe(ZSSTopic.ZONES, callback, filters=filters)
+        return self.subscribe(ZSSTopic.ZONES, callback, filters=filters,
+                              deltas=deltas, gui_thread=gui_thread)
 
     def subscribe_alarms(self, callback: Callable,
-                         stream_id=any, zone_id=any, alarm_id=any) \
+                         stream_id=any, zone_id=any, alarm_id=any,
+                         deltas: bool = False, gui_thread: bool = False) \
             -> Subscription:
 
         filters = {"stream_id": stream_id,
                    "zone_id": zone_id,
                    "alarm_id": alarm_id}
 
-        return self.subscribe(ZSSTopic.ALARMS, callback, filters=filters)
+        return self.subscribe(ZSSTopic.ALARMS, callback, filters=filters,
+                              deltas=deltas, gui_thread=gui_thread)
 
     def subscribe_alerts(self, callback: Callable,
                          stream_id=any, zone_id=any, alarm_id=any,
-                         alert_id=any) \
+                         alert_id=any, deltas: bool = False,
+                         gui_thread: bool = False) \
             -> Subscription:
 
         filters = {"stream_id": stream_id,
@@ -218,11 +673,21 @@ class _ZSSPubSub:
                    "alarm_id": alarm_id,
                    "alert_id": alert_id}
 
-        return self.subscribe(ZSSTopic.ALERTS, callback, filters=filters)
+        return self.subscribe(ZSSTopic.ALERTS, callback, filters=filters,
+                              deltas=deltas, gui_thread=gui_thread)
 
     def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.active = False
+
         with self.subscriptions_lock:
-            self.subscriptions[subscription.topic].remove(subscription)
+            if subscription.deltas:
+                self.delta_subscriptions[subscription.topic] \
+                    .remove(subscription)
+                self._unprimed_subscriptions.discard(subscription)
+            else:
+                self.subscriptions[subscription.topic].remove(subscription)
+
+        self.gui_dispatcher.discard(subscription)
 
 
 # noinspection SpellCheckingInspection
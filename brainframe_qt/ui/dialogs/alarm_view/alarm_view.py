@@ -1,17 +1,20 @@
-from typing import Dict, List, Union
+import logging
+from typing import Dict, Iterator, Set, Union
 
-from PyQt5.QtCore import QMetaObject, QThread, Q_ARG, Qt, pyqtSlot
+from requests.exceptions import RequestException
+from PyQt5.QtCore import QTimer, Qt
 from PyQt5.QtGui import QIcon
-from PyQt5.QtWidgets import QApplication, QDialog, QLayout, QVBoxLayout, \
-    QWidget
+from PyQt5.QtWidgets import QApplication, QDialog, QVBoxLayout, QWidget
 
 from brainframe_qt.api_utils import api
+from brainframe.api import bf_errors
 from brainframe.api.bf_codecs import StreamConfiguration, Zone, ZoneAlarm
-from brainframe_qt.api_utils.zss_pubsub import zss_publisher
+from brainframe_qt.api_utils.entity_cache import entity_cache
+from brainframe_qt.api_utils.zss_pubsub import ZSSDelta, zss_publisher
 from brainframe_qt.extensions import WindowedActivity
 from brainframe_qt.ui.dialogs.alarm_view.alarm_view_ui import AlarmViewUI
+from brainframe_qt.ui.resources import QTAsyncWorker
 from brainframe_qt.ui.resources.alarms.alarm_bundle import AlarmBundle
-from brainframe_qt.ui.resources.mixins.data_structure import IterableMI
 
 
 class AlertActivity(WindowedActivity):
@@ -31,7 +34,11 @@ class AlertActivity(WindowedActivity):
         return QApplication.translate("AlertActivity", "Alerts")
 
 
-class AlarmView(AlarmViewUI, IterableMI):
+class AlarmView(AlarmViewUI):
+
+    BUNDLE_RETRY_INTERVAL = 5000
+    """Milliseconds to wait before fetching StreamConfigurations that failed to
+    be fetched again"""
 
     def __init__(self, parent: QWidget):
         super().__init__(parent)
@@ -39,6 +46,13 @@ class AlarmView(AlarmViewUI, IterableMI):
         self.bundle_mode = AlarmBundle.BundleType.BY_STREAM
         self.bundle_map: Dict[int, AlarmBundle] = {}
         """{object.id: AlarmBundle}"""
+        self._pending_bundle_ids: Set[int] = set()
+        """IDs of bundles waiting on their StreamConfiguration"""
+        self._failed_bundle_ids: Set[int] = set()
+        """IDs of pending bundles whose StreamConfiguration couldn't be
+        fetched, waiting to be retried"""
+
+        self._bundle_retry_timer = self._init_bundle_retry_timer()
 
         self._init_signals()
 
@@ -57,13 +71,21 @@ class AlarmView(AlarmViewUI, IterableMI):
 
         dialog.show()
 
-    def iterable_layout(self) -> QLayout:
-        return self.container_widget.layout()
+    def __iter__(self) -> Iterator[AlarmBundle]:
+        return iter(list(self.bundle_map.values()))
+
+    def _init_bundle_retry_timer(self) -> QTimer:
+        bundle_retry_timer = QTimer(self)
+        bundle_retry_timer.setSingleShot(True)
+        bundle_retry_timer.setInterval(self.BUNDLE_RETRY_INTERVAL)
+        bundle_retry_timer.timeout.connect(self._retry_stream_bundles)
+        return bundle_retry_timer
 
     def _init_signals(self):
 
         if self.bundle_mode == AlarmBundle.BundleType.BY_STREAM:
-            sub = zss_publisher.subscribe_streams(self.handle_stream_id_stream)
+            sub = zss_publisher.subscribe_streams(
+                self.handle_stream_id_stream, deltas=True, gui_thread=True)
         elif self.bundle_mode == AlarmBundle.BundleType.BY_ZONE:
             # TODO:
             sub = zss_publisher.subscribe_zones(self.handle_zone_stream)
@@ -103,32 +125,72 @@ class AlarmView(AlarmViewUI, IterableMI):
         else:
             raise NotImplementedError
 
-    @pyqtSlot(object)
-    def handle_stream_id_stream(self,
-                                server_streams: List[StreamConfiguration]):
-        """Add new alarms when the ZSS gets them"""
-
-        if QThread.currentThread() != self.thread():
-            # Move to the UI Thread
-            QMetaObject.invokeMethod(self,
-                                     self.handle_stream_id_stream.__name__,
-                                     Qt.QueuedConnection,
-                                     Q_ARG("PyQt_PyObject", server_streams))
-            return
-
-        server_stream_ids = {stream.id for stream in server_streams}
-
-        new_stream_ids = server_stream_ids.difference(self.bundle_map)
-        del_stream_ids = set(self.bundle_map).difference(server_stream_ids)
+    def handle_stream_id_stream(self, streams_delta: ZSSDelta):
+        """Add and remove bundles as streams come and go from the ZSS"""
 
         # NOTE: THIS RELIES ON HACKS TO WORK. CURRENTLY THE StatusReceiver
-        # SENDS _FAKE_ StreamConfigurations WITH JUST .id ATTRIBUTES SET
-        for new_stream_id in new_stream_ids:
-            # TODO: THIS API CALL IS SYNCHRONOUS WITH THE REST OF THE UI THREAD
-            self.create_bundle(api.get_stream_configuration(new_stream_id))
+        # SENDS _FAKE_ StreamConfigurations WITH JUST .id ATTRIBUTES SET. The
+        # real ones come from the entity cache
+        for new_stream in streams_delta.added:
+            self._create_stream_bundle(new_stream.id)
+
+        for del_stream in streams_delta.removed:
+            self._pending_bundle_ids.discard(del_stream.id)
+            self._failed_bundle_ids.discard(del_stream.id)
+            if del_stream.id in self.bundle_map:
+                self.delete_bundle_by_id(del_stream.id)
+
+    def _create_stream_bundle(self, stream_id: int) -> None:
+        if stream_id in self.bundle_map \
+                or stream_id in self._pending_bundle_ids:
+            return
 
-        for del_alarm_id in del_stream_ids:
-            self.delete_bundle_by_id(del_alarm_id)
+        self._pending_bundle_ids.add(stream_id)
+        self._fetch_stream_bundle(stream_id)
+
+    def _fetch_stream_bundle(self, stream_id: int) -> None:
+        def on_success(stream_conf: StreamConfiguration) -> None:
+            # The stream might have gone away while it was being fetched
+            if stream_id not in self._pending_bundle_ids:
+                return
+
+            self._pending_bundle_ids.remove(stream_id)
+            self.create_bundle(stream_conf)
+
+        def on_error(exc: BaseException) -> None:
+            if stream_id not in self._pending_bundle_ids:
+                return
+
+            # The stream was deleted before it could be fetched
+            if isinstance(exc, bf_errors.StreamConfigNotFoundError):
+                self._pending_bundle_ids.remove(stream_id)
+                return
+
+            if not isinstance(exc, (RequestException, bf_errors.BaseAPIError)):
+                self._pending_bundle_ids.remove(stream_id)
+                raise exc
+
+            # The stream won't be reported as added again, so the bundle stays
+            # pending until it can be created
+            logging.warning(f"While fetching stream {stream_id} for its alarm "
+                            f"bundle: {exc}. Retrying")
+            self._failed_bundle_ids.add(stream_id)
+            if not self._bundle_retry_timer.isActive():
+                self._bundle_retry_timer.start()
+
+        QTAsyncWorker(self, entity_cache.get_stream_configuration,
+                      f_args=(stream_id,),
+                      on_success=on_success, on_error=on_error) \
+            .start()
+
+    def _retry_stream_bundles(self) -> None:
+        failed_bundle_ids = self._failed_bundle_ids
+        self._failed_bundle_ids = set()
+
+        for stream_id in failed_bundle_ids:
+            # Streams that went away in the meantime aren't pending anymore
+            if stream_id in self._pending_bundle_ids:
+                self._fetch_stream_bundle(stream_id)
 
 
 if __name__ == '__main__':
@@ -1,9 +1,12 @@
+from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QIcon, QDoubleValidator
 from PyQt5.QtWidgets import QApplication, QDialog, QWidget
 from PyQt5.uic import loadUi
 
+from brainframe_qt.api_utils.streaming.frame_buffer import BYTES_PER_MB, \
+    SyncedFrameBuffer
 from brainframe_qt.extensions import DialogActivity
-from brainframe_qt.ui.resources.config import RenderSettings
+from brainframe_qt.ui.resources.config import RenderSettings, StreamingSettings
 from brainframe_qt.ui.resources.paths import qt_ui_paths
 
 
@@ -52,6 +55,31 @@ class RenderConfiguration(QDialog):
         self.recognition_checkbox.setChecked(
             self.render_config.show_recognition_labels)
         self.extra_data_checkbox.setChecked(self.render_config.show_extra_data)
+        self.frame_latency_checkbox.setChecked(
+            self.render_config.show_frame_latency)
+
+        self.streaming_config = StreamingSettings()
+
+        self.frame_buffer_input.setValue(
+            self.streaming_config.frame_buffer_size_mb)
+
+        # Keep the frame buffer usage up to date while the dialog is open
+        self._usage_timer = QTimer(parent=self)
+        self._usage_timer.timeout.connect(self._update_frame_buffer_usage)
+        self._usage_timer.start(1000)
+        self._update_frame_buffer_usage()
+
+    def _update_frame_buffer_usage(self) -> None:
+        used_mb = SyncedFrameBuffer.get_total_bytes() / BYTES_PER_MB
+        max_mb = SyncedFrameBuffer.get_max_buffer_bytes() / BYTES_PER_MB
+        num_streams = SyncedFrameBuffer.get_buffer_count()
+
+        usage_text = self.tr("{used_mb:.0f} of {max_mb:.0f} MB in use by "
+                             "{num_streams} stream(s)")
+        usage_text = usage_text.format(used_mb=used_mb, max_mb=max_mb,
+                                       num_streams=num_streams)
+
+        self.frame_buffer_usage_label.setText(usage_text)
 
     @classmethod
     def show_dialog(cls, parent):
@@ -89,3 +117,7 @@ class RenderConfiguration(QDialog):
             = dialog.recognition_checkbox.isChecked()
         dialog.render_config.show_extra_data \
             = dialog.extra_data_checkbox.isChecked()
+        dialog.render_config.show_frame_latency \
+            = dialog.frame_latency_checkbox.isChecked()
+        dialog.streaming_config.frame_buffer_size_mb \
+            = dialog.frame_buffer_input.value()
@@ -7,6 +7,7 @@ from PyQt5.uic import loadUi
 from brainframe.api import bf_codecs
 
 from brainframe_qt.api_utils import api
+from brainframe_qt.api_utils.entity_cache import entity_cache
 from brainframe_qt.ui.dialogs import AlarmCreationDialog
 from brainframe_qt.ui.resources import QTAsyncWorker
 from brainframe_qt.ui.resources.paths import qt_ui_paths
@@ -24,6 +25,7 @@ class TaskConfiguration(QDialog):
         self.stream_conf = stream_conf
         self.video_task_config.change_stream(stream_conf)
         self.stream_name_label.setText(stream_conf.name)
+        self.zone_list.stream_id = stream_conf.id
 
         # Create TaskAndZone widgets in ZoneList for zones in database
         self._init_zones()
@@ -77,7 +79,9 @@ class TaskConfiguration(QDialog):
                 return
 
             def set_zone_alarm():
-                return api.set_zone_alarm(alarm)
+                new_alarm = api.set_zone_alarm(alarm)
+                entity_cache.invalidate_zones(self.stream_conf.id)
+                return new_alarm
 
             def add_alarm(new_alarm):
                 self.zone_list.add_alarm(zone, new_alarm)
@@ -139,6 +143,7 @@ class TaskConfiguration(QDialog):
         # Add zone to database
         api_zone = self.unconfirmed_zone.to_api_zone(self.stream_conf.id)
         confirmed_zone = Zone.from_api_zone(api.set_zone(api_zone))
+        entity_cache.invalidate_zones(self.stream_conf.id)
 
         # Only do this for new zones
         if self.unconfirmed_zone.id is None:
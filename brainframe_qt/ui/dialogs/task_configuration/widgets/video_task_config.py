@@ -74,12 +74,13 @@ class VideoTaskConfig(StreamWidget):
             self.polygon_is_valid_signal.emit(True)
 
     def on_frame(self, frame: ZoneStatusFrame) -> None:
-        # Base class' .on_frame also clears all QGraphicsItems, so we skip that while
+        # Base class' .on_frame can clear all QGraphicsItems, so we skip that while
         # we're working on a Zone
         if self.in_progress_zone is None:
             super().on_frame(frame)
         else:
-            self.scene().set_frame(pixmap=frame.frame)
+            self.scene().set_frame(pixmap=self._frame_to_pixmap(frame),
+                                   source_size=frame.source_size)
 
     def start_zone_edit(self, zone: Zone) -> None:
         # Temporarily disable region and line drawing
@@ -13,6 +13,7 @@ from PyQt5.QtWidgets import (
 from brainframe.api import bf_codecs
 
 from brainframe_qt.api_utils import api
+from brainframe_qt.api_utils.entity_cache import entity_cache
 
 from ..core.zone import Zone, Line, Region
 from .zone_list_item import ZoneListItem
@@ -99,6 +100,7 @@ class ZoneList(QTreeWidget):
         # Delete zone from database
         if zone_id is not None:
             api.delete_zone(zone_id)
+            self._invalidate_zones()
 
         # Delete the zone ZoneListItem from tree
         self.takeTopLevelItem(self.indexOfTopLevelItem(self.zones[zone_id]))
@@ -111,6 +113,7 @@ class ZoneList(QTreeWidget):
 
         # Delete alarm from database
         api.delete_zone_alarm(alarm_id)
+        self._invalidate_zones()
 
         # Delete the alarm ZoneListItem from tree
         zone_item.removeChild(alarm_item)
@@ -121,6 +124,11 @@ class ZoneList(QTreeWidget):
 
         zone_item.setIcon(0, icon)
 
+    def _invalidate_zones(self) -> None:
+        """Let the entity cache know the stream's zones have changed"""
+        if self.stream_id is not None:
+            entity_cache.invalidate_zones(self.stream_id)
+
     def _new_row(self, name, entry_type: EntryType):
         row = ZoneListItem(["", name, "", ""])
         row.setIcon(0, self._get_item_icon(entry_type))
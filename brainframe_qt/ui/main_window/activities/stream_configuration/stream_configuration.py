@@ -10,6 +10,7 @@ from PyQt5.QtWidgets import QDialogButtonBox, QWidget
 from brainframe.api import bf_codecs, bf_errors
 
 from brainframe_qt.api_utils import api, get_stream_manager
+from brainframe_qt.api_utils.entity_cache import entity_cache
 from brainframe_qt.ui.main_window.activities.stream_configuration \
     .stream_configuration_ui import StreamConfigurationUI
 from brainframe_qt.ui.resources import CanceledError, ProgressFileReader, QTAsyncWorker
@@ -321,6 +322,9 @@ class StreamConfiguration(StreamConfigurationUI):
             self.disable_input_fields(True)
             self._reset_stream_conf = enabled_stream_conf
 
+            # Other widgets might still have the previous configuration
+            entity_cache.invalidate_stream(enabled_stream_conf.id)
+
             self.stream_conf_modified.emit(enabled_stream_conf)
 
         def start_analysis(sent_stream_conf: bf_codecs.StreamConfiguration):
@@ -1,21 +1,51 @@
-from typing import Dict, Iterable, List, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
 import logging
 
 from requests.exceptions import RequestException
-from PyQt5.QtCore import QTimer
-from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from PyQt5.QtCore import QModelIndex, QObject, Qt, QTimer
+from PyQt5.QtWidgets import QAbstractItemView, QApplication, QWidget
 from PyQt5.uic import loadUi
 
 from brainframe_qt.api_utils import api
-from brainframe.api import bf_codecs, bf_errors
+from brainframe.api import bf_errors
 from brainframe.api.bf_codecs import Alert, Zone, ZoneAlarm
+from brainframe_qt.api_utils.entity_cache import entity_cache
+from brainframe_qt.api_utils.zss_pubsub import Subscription, ZSSDelta, \
+    zss_publisher
+from brainframe_qt.ui.dialogs import AlertEntryPopup
 from brainframe_qt.ui.resources import QTAsyncWorker
+from brainframe_qt.ui.resources.alarms.alert_list_model import AlertListModel
 from brainframe_qt.ui.resources.paths import qt_ui_paths
 
-from .alert_log_entry import AlertLogEntry
+from .alert_log_delegate import AlertLogDelegate
 
 
 class AlertLog(QWidget):
+    """The most recent alerts of the expanded stream.
+
+    Alerts are pushed by the ZoneStatus stream as they start, change and end.
+    The server is only asked for:
+
+    - the final state of alerts that have ended
+    - alerts newer than the newest one seen, when the stream is opened and
+      every CATCH_UP_INTERVAL. This picks up alerts that started and ended
+      between two ZoneStatus packets
+    - older alerts, a page at a time, as the log is scrolled down to them
+    """
+
+    MAX_ALERTS = 100
+    """Number of the most recent alerts fetched when the stream is opened, and
+    at most when catching up"""
+
+    CATCH_UP_PAGE_SIZE = 10
+    """Number of alerts asked for at a time when catching up"""
+
+    CATCH_UP_INTERVAL = 60_000
+    """Milliseconds between queries for alerts the ZoneStatus stream missed"""
+
+    SYNC_RETRY_INTERVAL = 5_000
+    """Milliseconds to wait before trying again when fetching alerts fails"""
 
     def __init__(self, parent=None):
         super().__init__(parent=parent)
@@ -23,146 +53,331 @@ class AlertLog(QWidget):
         loadUi(qt_ui_paths.alert_log_ui, self)
 
         self.stream_id = None
-        self.alert_widgets: Dict[int, AlertLogEntry] = {}  # key = alert_id
 
-        # Start a QTimer for periodically updating unverified alerts
-        self.timer = QTimer()
+        self.alert_model = _StreamAlertListModel(self)
+        self.alert_delegate = AlertLogDelegate(self.alert_list)
+
+        self._last_alert_id: Optional[int] = None
+        """Cursor for catching up. Every alert of the stream up to this ID has
+        been seen. None if the server hasn't been asked yet"""
+
+        self._pending_alerts: Dict[int, Alert] = {}
+        """Alerts from the ZoneStatus stream waiting to be shown"""
+        self._ended_alert_ids: Set[int] = set()
+        """Alerts that left the ZoneStatus stream, whose final state needs
+        fetching"""
+        self._catch_up_needed = False
+
+        self._alerts_subscription: Optional[Subscription] = None
+        """ZoneStatus stream alerts of the current stream"""
+
+        self._sync_running = False
+        """Whether a worker is fetching alerts. Only one runs at a time, and
+        anything that comes up in the meantime is handled by the next one"""
+
+        # Occasionally catch up on alerts the ZoneStatus stream missed
+        self.catch_up_timer = QTimer(parent=self)
         # noinspection PyUnresolvedReferences
-        self.timer.timeout.connect(self.sync_alerts_with_server)
-        self.timer.start(1000)
+        self.catch_up_timer.timeout.connect(self.catch_up_with_server)
+        self.catch_up_timer.start(self.CATCH_UP_INTERVAL)
 
-        self.alert_log.setLayout(QVBoxLayout())
+        # Try again soon after an error, instead of waiting on the catch up
+        self.sync_retry_timer = QTimer(parent=self)
+        self.sync_retry_timer.setSingleShot(True)
+        # noinspection PyUnresolvedReferences
+        self.sync_retry_timer.timeout.connect(self._sync)
+
+        self._init_alert_list()
+        self._init_signals()
+
+    def _init_alert_list(self) -> None:
+        self.alert_list.setModel(self.alert_model)
+        self.alert_list.setItemDelegate(self.alert_delegate)
+
+        # Every row is the same height, which saves the view from measuring
+        # each of them
+        self.alert_list.setUniformItemSizes(True)
+        self.alert_list.setSelectionMode(QAbstractItemView.NoSelection)
+        self.alert_list.setMouseTracking(True)
+
+    def _init_signals(self) -> None:
+        self.alert_delegate.alert_icon_clicked.connect(self.display_alert_info)
+
+        self.destroyed.connect(lambda: self._unsubscribe_from_alerts())
 
     def change_stream(self, stream_id: int) -> None:
+        self.stop_streaming()
+
         self.stream_id = stream_id
-        self._delete_alerts_by_id(self.alert_widgets.keys())
-        self.sync_alerts_with_server()
+
+        # The first delta has every alert of the stream that's ongoing
+        self._alerts_subscription = zss_publisher.subscribe_alerts(
+            self._handle_alerts_delta, stream_id=stream_id,
+            deltas=True, gui_thread=True)
+
+        self.catch_up_with_server()
 
     def stop_streaming(self) -> None:
+        self._unsubscribe_from_alerts()
+
         self.stream_id = None
-        self._delete_alerts_by_id(self.alert_widgets.keys())
+        self.alert_model.clear()
+
+        self._last_alert_id = None
+        self._pending_alerts.clear()
+        self._ended_alert_ids.clear()
+        self._catch_up_needed = False
+        self.sync_retry_timer.stop()
+
+    def catch_up_with_server(self) -> None:
+        """Ask the server for alerts newer than the newest one seen"""
+        self._catch_up_needed = True
+        self._sync()
+
+    def display_alert_info(self, alert_id: int) -> None:
+        """Display a pop-up describing the alert"""
+        row = self.alert_model.row_of(alert_id)
+        if row is None:
+            return
 
-    def sync_alerts_with_server(self):
+        alert_text = self.alert_model.index(row).data(Qt.ToolTipRole) or ""
+        AlertEntryPopup.show_alert(alert_text, alert_id, self)
 
-        # Important. Used in set_alerts_checked
-        stream_id = self.stream_id
+    def _handle_alerts_delta(self, alerts_delta: ZSSDelta) -> None:
+        if self.stream_id is None:
+            return
+
+        for alert in alerts_delta.added + alerts_delta.changed:
+            self._pending_alerts[alert.id] = alert
+
+        for alert in alerts_delta.removed:
+            # The alert is over. Its end time has to come from the server
+            self._pending_alerts.pop(alert.id, None)
+            self._ended_alert_ids.add(alert.id)
+
+        self._sync()
+
+    def _unsubscribe_from_alerts(self) -> None:
+        if self._alerts_subscription is not None:
+            zss_publisher.unsubscribe(self._alerts_subscription)
+            self._alerts_subscription = None
 
-        if stream_id is None:
-            self._delete_alerts_by_id(self.alert_widgets.keys())
+    def _sync(self) -> None:
+        """Start a worker to fetch whatever is pending, if one isn't already
+        running"""
+        if self._sync_running or self.stream_id is None:
             return
 
-        def get_alerts_from_server():
-
-            try:
-                # Get a page of the 100 most recent alerts
-                server_side_alerts, total_count = api.get_alerts(
-                    stream_id=stream_id,
-                    limit=100,
-                    offset=0)
-            except bf_errors.StreamConfigNotFoundError:
-                # Return an empty list. The callback will delete all the
-                # existing Alerts from the UI
-                return []
-            except (RequestException, bf_errors.BaseAPIError) as ex:
-                logging.debug(f"While polling for alerts: {ex}")
-                return None
-
-            # We want it oldest to newest
-            unverified_alerts = server_side_alerts[::-1]
-
-            return unverified_alerts
-
-        def set_alerts_checked(alerts: List[Alert]):
-            # Make sure that the stream_id was not changed while the API call
-            # was blocked
+        if not (self._pending_alerts or self._ended_alert_ids
+                or self._catch_up_needed):
+            return
+
+        # Important. Used to make sure the stream didn't change in the meantime
+        stream_id = self.stream_id
+        request = _SyncRequest(
+            stream_id=stream_id,
+            alerts=self._pending_alerts,
+            ended_alert_ids=self._ended_alert_ids,
+            catch_up_from=self._last_alert_id
+            if self._catch_up_needed else _NO_CATCH_UP,
+        )
+
+        self._pending_alerts = {}
+        self._ended_alert_ids = set()
+        self._catch_up_needed = False
+        self._sync_running = True
+
+        def on_success(result: Optional[_SyncResult]) -> None:
+            self._sync_running = False
+
             if self.stream_id != stream_id:
-                # Just wait for the next run of the timer
+                # Start over for the new stream
+                self._sync()
                 return
 
-            if alerts is None:
-                # An error occurred while fetching alerts
+            if result is None:
+                # An error occurred. Put everything back and try again shortly
+                request.alerts.update(self._pending_alerts)
+                self._pending_alerts = request.alerts
+                self._ended_alert_ids |= request.ended_alert_ids
+                if request.catch_up_from is not _NO_CATCH_UP:
+                    self._catch_up_needed = True
+
+                self.sync_retry_timer.start(self.SYNC_RETRY_INTERVAL)
                 return
 
-            # If no change to stream_id, then use the results from the API
-            self._set_alerts(alerts)
+            self._apply_sync_result(result)
+            self._sync()
 
-        QTAsyncWorker(self, get_alerts_from_server,
-                      on_success=set_alerts_checked) \
+        QTAsyncWorker(self, self._fetch_alerts, f_args=(request,),
+                      on_success=on_success) \
             .start()
 
-    def _set_alerts(self, server_side_alerts: List[Alert]):
-
-        def get_alarms_and_zones():
-            try:
-                alarms: List[ZoneAlarm] = api.get_zone_alarms(self.stream_id)
-                zones: List[Zone] = api.get_zones(self.stream_id)
-            except bf_errors.StreamConfigNotFoundError:
-                return None
-            except (RequestException, bf_errors.BaseAPIError) as ex:
-                logging.debug(f"Error while getting alarms and zones for "
-                              f"alerts: {ex}")
-                return None
-            alarm_dict = {alarm.id: alarm for alarm in alarms}
-            zone_dict = {zone.id: zone for zone in zones}
-
-            return alarm_dict, zone_dict
-
-        def edit_alerts(alarms_and_zones: Tuple[Dict[int, ZoneAlarm],
-                                                Dict[int, Zone]]):
-
-            if alarms_and_zones is None:
-                # This occurs when a stream was deleted while the api call
-                # for getting alarms/zones was being called, or if a connection
-                # error occurred.
-                # We're relying on sync_alerts_with_server to clean up
-                # the Alert Log
-                return None
-
-            alarms, zones = alarms_and_zones
-
-            existing_alert_ids = set(self.alert_widgets.keys())
-            server_side_alert_ids = {alert.id for alert in server_side_alerts}
-
-            # Create new alerts
-            new_alerts_ids = server_side_alert_ids - existing_alert_ids
-            new_alerts = [alert for alert in server_side_alerts
-                          if alert.id in new_alerts_ids]
-            self._add_alerts(new_alerts, alarms, zones)
-
-            # Update info on existing alerts
-            update_alert_ids = server_side_alert_ids & existing_alert_ids
-            update_alerts = [alert for alert in server_side_alerts
-                             if alert.id in update_alert_ids]
-            self._update_alerts(update_alerts)
-
-            # Remove deleted alerts
-            deleted_alert_ids = existing_alert_ids - server_side_alert_ids
-            self._delete_alerts_by_id(deleted_alert_ids)
-
-        QTAsyncWorker(self, get_alarms_and_zones, on_success=edit_alerts) \
-            .start()
+    @classmethod
+    def _fetch_alerts(cls, request: "_SyncRequest") -> Optional["_SyncResult"]:
+        result = _SyncResult(alerts=dict(request.alerts))
+
+        try:
+            if request.catch_up_from is not _NO_CATCH_UP:
+                new_alerts = cls._fetch_new_alerts(request.stream_id,
+                                                   request.catch_up_from)
+                result.alerts.update((alert.id, alert) for alert in new_alerts)
+                result.last_alert_id = max(
+                    (alert.id for alert in new_alerts),
+                    default=request.catch_up_from or 0
+                )
+
+            for alert_id in request.ended_alert_ids:
+                try:
+                    result.alerts[alert_id] = api.get_alert(alert_id)
+                except bf_errors.AlertNotFoundError:
+                    result.deleted_alert_ids.add(alert_id)
+
+            zones: List[Zone] = entity_cache.get_zones(request.stream_id)
+        except bf_errors.StreamConfigNotFoundError:
+            # The stream was deleted. The expanded view will be closed
+            return _SyncResult()
+        except (RequestException, bf_errors.BaseAPIError) as ex:
+            logging.debug(f"While fetching alerts: {ex}")
+            return None
+
+        result.zones = {zone.id: zone for zone in zones}
+        result.alarms = {alarm.id: alarm
+                         for zone in zones
+                         for alarm in zone.alarms}
+
+        return result
+
+    @classmethod
+    def _fetch_new_alerts(cls, stream_id: int, last_alert_id: Optional[int]) \
+            -> List[Alert]:
+        """[blocking API] Alerts of the stream newer than last_alert_id, up to
+        MAX_ALERTS of them"""
+        if last_alert_id is None:
+            alerts, _total_count = api.get_alerts(
+                stream_id=stream_id,
+                limit=cls.MAX_ALERTS,
+                offset=0)
+            return alerts
+
+        # Alerts come newest first. Page back until reaching one already seen
+        new_alerts: List[Alert] = []
+        offset = 0
+        while len(new_alerts) < cls.MAX_ALERTS:
+            alerts, _total_count = api.get_alerts(
+                stream_id=stream_id,
+                limit=cls.CATCH_UP_PAGE_SIZE,
+                offset=offset)
+            offset += len(alerts)
+
+            new_alerts.extend(alert for alert in alerts
+                              if alert.id > last_alert_id)
+
+            if len(alerts) < cls.CATCH_UP_PAGE_SIZE \
+                    or any(alert.id <= last_alert_id for alert in alerts):
+                break
+
+        return new_alerts
+
+    def _apply_sync_result(self, result: "_SyncResult") -> None:
+        if self._last_alert_id is None and result.last_alert_id is not None:
+            # The newest alerts are in. Older ones are fetched by the model as
+            # the log is scrolled down
+            self.alert_model.set_query(stream_id=self.stream_id)
+
+        if result.last_alert_id is not None:
+            self._last_alert_id = max(result.last_alert_id,
+                                      self._last_alert_id or 0)
+
+        self.alert_model.set_alarms(result.alarms, result.zones)
+
+        # Assume alerts of alarms that are gone were deleted elsewhere and that
+        # we can ignore them
+        alerts = [alert for alert in result.alerts.values()
+                  if alert.alarm_id in result.alarms
+                  or self.alert_model.contains_alert(alert.id)]
+        self.alert_model.add_alerts(alerts)
+
+        self.alert_model.remove_alerts(result.deleted_alert_ids)
+
+
+class _StreamAlertListModel(AlertListModel):
+    """Alerts of a stream, with the name of each alert's alarm as its
+    DisplayRole and a description of the alert as its ToolTipRole"""
+
+    def __init__(self, parent: QObject):
+        super().__init__(parent)
+
+        self._alarms: Dict[int, ZoneAlarm] = {}
+        self._zones: Dict[int, Zone] = {}
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole) \
+                or not index.isValid() or index.row() >= self.rowCount():
+            return super().data(index, role)
+
+        alert = self.alert(index.row())
+        alarm = self._alarms.get(alert.alarm_id)
+        if alarm is None:
+            return None
+
+        if role == Qt.DisplayRole:
+            return alarm.name
+
+        zone = self._zones.get(alarm.zone_id)
+        zone_name = zone.name if zone is not None else ""
+
+        # TODO: Ensure support for more than one condition if implemented
+        # Create text for alert
+        alert_text = ""
+        for condition in alarm.count_conditions + alarm.rate_conditions:
+            text = QApplication.translate("AlertLogEntry", "{} in region [{}]")
+            text = text.format(repr(condition), zone_name)
+            alert_text += text
+
+        return alert_text
+
+    def set_alarms(self, alarms: Dict[int, ZoneAlarm],
+                   zones: Dict[int, Zone]) -> None:
+        """Alarms and zones of the stream, to describe its alerts with"""
+        if alarms == self._alarms and zones == self._zones:
+            return
+
+        self._alarms = alarms
+        self._zones = zones
+
+        if self.rowCount() > 0:
+            self.dataChanged.emit(self.index(0),
+                                  self.index(self.rowCount() - 1),
+                                  [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def clear(self) -> None:
+        super().clear()
+
+        self._alarms = {}
+        self._zones = {}
+
+
+_NO_CATCH_UP = object()
+"""Sentinel for a sync that doesn't need to catch up with the server"""
+
+
+@dataclass
+class _SyncRequest:
+    stream_id: int
+    alerts: Dict[int, Alert]
+    """Alerts already received from the ZoneStatus stream"""
+    ended_alert_ids: Set[int]
+    catch_up_from: object
+    """The last alert ID seen (None if the server hasn't been asked yet) or
+    _NO_CATCH_UP"""
+
 
-    def _add_alerts(self, alerts: Iterable[Alert],
-                    alarms: Dict[int, ZoneAlarm],
-                    zones: Dict[int, Zone]):
-
-        for alert in alerts:
-            try:
-                alarm: ZoneAlarm = alarms[alert.alarm_id]
-                zone: Zone = zones[alarm.zone_id]
-            except KeyError:
-                # Assume the alarm or zone was deleted elsewhere and
-                # that we can ignore the alert
-                continue
-
-            alert_widget = AlertLogEntry(alert, alarm, zone.name)
-            self.alert_log.layout().insertWidget(0, alert_widget)
-            self.alert_widgets[alert.id] = alert_widget
-
-    def _delete_alerts_by_id(self, alert_ids: Iterable[int]):
-        for alert_id in list(alert_ids):
-            self.alert_widgets.pop(alert_id).deleteLater()
-
-    def _update_alerts(self, alerts: Iterable[Alert]):
-        for alert in alerts:
-            self.alert_widgets[alert.id].update(alert)
+@dataclass
+class _SyncResult:
+    alerts: Dict[int, Alert] = field(default_factory=dict)
+    deleted_alert_ids: Set[int] = field(default_factory=set)
+    alarms: Dict[int, ZoneAlarm] = field(default_factory=dict)
+    zones: Dict[int, Zone] = field(default_factory=dict)
+    last_alert_id: Optional[int] = None
+    """New cursor for catching up, if the server was asked"""
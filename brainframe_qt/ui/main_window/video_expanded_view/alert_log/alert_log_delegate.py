@@ -0,0 +1,121 @@
+import typing
+from typing import Optional
+
+import pendulum
+from PyQt5.QtCore import QAbstractItemModel, QEvent, QModelIndex, QRect, \
+    QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QIcon, QMouseEvent, QPainter, QPixmap
+from PyQt5.QtWidgets import QApplication, QStyle, QStyleOptionViewItem, \
+    QStyledItemDelegate, QWidget
+
+from brainframe.api.bf_codecs import Alert
+from brainframe_qt.ui.resources.alarms.alert_list_model import AlertRole
+from brainframe_qt.ui.resources.config import LocaleSettings
+
+
+class AlertLogDelegate(QStyledItemDelegate):
+    """Paints a row of the AlertLog: an alert icon, the time span of the alert
+    in the format 16:20 PST - 16:21 PST, and the name of its alarm (the
+    model's DisplayRole)"""
+
+    alert_icon_clicked = pyqtSignal(int)
+    """The icon of a row was clicked. Sends the alert ID"""
+
+    MARGIN = 9
+    SPACING = 6
+    ICON_SIZE = 32
+    ICON_BUTTON_SIZE = 40
+
+    _alert_icon = typing.cast(QIcon, None)
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent)
+
+        self.locale_settings = LocaleSettings()
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem,
+              index: QModelIndex) -> None:
+        alert: Alert = index.data(AlertRole)
+        if alert is None:
+            return
+
+        painter.save()
+
+        # Background, including hover
+        style = option.widget.style() if option.widget \
+            else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter,
+                            option.widget)
+
+        icon_rect = self._icon_rect(option.rect)
+        self._get_alert_icon().paint(painter, icon_rect)
+
+        # The time span and alarm name share the rest of the row
+        text_left = icon_rect.right() + 1 + self.SPACING
+        text_width = (option.rect.right() - self.MARGIN - text_left) // 2
+        time_span_rect = QRect(text_left, option.rect.top(),
+                               text_width, option.rect.height())
+        alarm_name_rect = time_span_rect.translated(text_width, 0)
+
+        painter.drawText(time_span_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                         self._time_span_text(alert))
+
+        alarm_name: Optional[str] = index.data(Qt.DisplayRole)
+        if alarm_name:
+            alarm_name = option.fontMetrics.elidedText(
+                alarm_name, Qt.ElideRight, alarm_name_rect.width())
+            painter.drawText(alarm_name_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                             alarm_name)
+
+        painter.restore()
+
+    def sizeHint(self, option: QStyleOptionViewItem,
+                 index: QModelIndex) -> QSize:
+        height = max(option.fontMetrics.height(), self.ICON_BUTTON_SIZE)
+        return QSize(option.rect.width(), height)
+
+    def editorEvent(self, event: QEvent, model: QAbstractItemModel,
+                    option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() != QEvent.MouseButtonRelease:
+            return super().editorEvent(event, model, option, index)
+
+        event: QMouseEvent
+        alert: Alert = index.data(AlertRole)
+        if alert is None or event.button() != Qt.LeftButton:
+            return False
+
+        if self._icon_rect(option.rect).contains(event.pos()):
+            self.alert_icon_clicked.emit(alert.id)
+            return True
+
+        return False
+
+    def _icon_rect(self, rect: QRect) -> QRect:
+        top = rect.top() + (rect.height() - self.ICON_SIZE) // 2
+        return QRect(rect.left() + self.MARGIN, top,
+                     self.ICON_SIZE, self.ICON_SIZE)
+
+    def _time_span_text(self, alert: Alert) -> str:
+        start_text = self._time_text(alert.start_time)
+
+        if alert.end_time is None:
+            # The timespan hasn't ended yet. Display the format:
+            # 16:20 PST (Ongoing)
+            return f"{start_text} {self.tr('(Ongoing)')}"
+
+        return f"{start_text} - {self._time_text(alert.end_time)}"
+
+    def _time_text(self, timestamp: float) -> str:
+        display_time = pendulum.from_timestamp(timestamp) \
+            .in_tz(self.locale_settings.get_user_timezone())
+        return f"{display_time.format('HH:mm')} {display_time.tzname()}"
+
+    @classmethod
+    def _get_alert_icon(cls) -> QIcon:
+        """Cache the alert icon, scaled down to size"""
+        if cls._alert_icon is None:
+            pixmap = QPixmap(":/icons/alert")
+            pixmap = pixmap.scaled(cls.ICON_SIZE, cls.ICON_SIZE,
+                                   transformMode=Qt.SmoothTransformation)
+            cls._alert_icon = QIcon(pixmap)
+        return cls._alert_icon
@@ -1 +0,0 @@
-from .alert_log_entry import AlertLogEntry
\ No newline at end of file
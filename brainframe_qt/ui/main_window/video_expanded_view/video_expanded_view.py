@@ -1,7 +1,7 @@
 import logging
 import typing
 
-from PyQt5.QtCore import QEvent, QTimerEvent, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QEvent, pyqtSignal, pyqtSlot
 from PyQt5.QtWidgets import QWidget
 from PyQt5.uic import loadUi
 
@@ -9,7 +9,8 @@ from brainframe.api import bf_errors
 from brainframe.api.bf_codecs import StreamConfiguration
 from requests.exceptions import RequestException
 
-from brainframe_qt.api_utils import api, get_stream_manager
+from brainframe_qt.api_utils import get_stream_manager
+from brainframe_qt.api_utils.entity_cache import entity_cache
 from brainframe_qt.ui.dialogs import CapsuleConfigDialog, TaskConfiguration
 from brainframe_qt.ui.resources import QTAsyncWorker, stylesheet_watcher
 from brainframe_qt.ui.resources.paths import qt_qss_paths, qt_ui_paths
@@ -49,8 +50,6 @@ class VideoExpandedView(QWidget):
         self._init_ui()
         self._init_signals()
 
-        self.startTimer(1000)
-
     def _init_ui(self):
         # https://stackoverflow.com/a/43835396/8134178
         # 3 : 1 height ratio initially
@@ -69,6 +68,10 @@ class VideoExpandedView(QWidget):
         self.stream_config_button.clicked.connect(
             lambda: self.toggle_stream_config_signal.emit(self.stream_conf))
 
+        # Streams are only checked for deletion when they might have changed,
+        # rather than polling the server
+        entity_cache.streams_changed.connect(self.check_stream_deleted)
+
     def enterEvent(self, event: QEvent):
         self.hide_button.show()
         super().enterEvent(event)
@@ -77,19 +80,24 @@ class VideoExpandedView(QWidget):
         self.hide_button.hide()
         super().leaveEvent(event)
 
-    def timerEvent(self, timer_event: QTimerEvent):
+    def check_stream_deleted(self) -> None:
         """Close the expanded view if the currently open stream no longer
-        exists on the server"""
+        exists on the server
+
+        Connected to:
+        - EntityCache -- Dynamic
+          entity_cache.streams_changed
+        """
         # Don't do anything if we don't have an active stream_conf
         if not self.stream_conf:
             return
 
         def get_stream_configurations():
             try:
-                stream_configurations = api.get_stream_configurations()
+                stream_configurations = entity_cache.get_stream_configurations()
                 return stream_configurations
             except (RequestException, bf_errors.BaseAPIError) as ex:
-                logging.debug(f"Error while polling for stream "
+                logging.debug(f"Error while checking for stream "
                               f"configurations: {ex}")
                 return None
 
@@ -116,6 +124,9 @@ class VideoExpandedView(QWidget):
         self.alert_log.change_stream(stream_conf.id)
         self.stream_conf = stream_conf
 
+        # The stream might have been deleted before it was opened
+        self.check_stream_deleted()
+
     @pyqtSlot()
     def expanded_stream_closed_slot(self):
         """Signaled by close button"""
@@ -3,6 +3,7 @@ from typing import Callable, List
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QHBoxLayout, QVBoxLayout, QWidget
 
+from .latency import OverlayLatencyPanel
 from .tray import OverlayTray
 from .. import AbstractOverlayAlert
 
@@ -14,6 +15,7 @@ class OverlayBody(QWidget):
         super().__init__(parent=parent)
 
         self.button_widget = self._init_button_widget()
+        self.latency_panel = self._init_latency_panel()
         self.tray = self._init_tray()
 
         self._init_layout()
@@ -23,6 +25,10 @@ class OverlayBody(QWidget):
         overlay_tray = OverlayTray(parent=self)
         return overlay_tray
 
+    def _init_latency_panel(self) -> OverlayLatencyPanel:
+        latency_panel = OverlayLatencyPanel(parent=self)
+        return latency_panel
+
     def _init_button_widget(self) -> ...:
         return QWidget(parent=self)
 
@@ -34,6 +40,7 @@ class OverlayBody(QWidget):
         main_layout.addWidget(self.button_widget)
 
         content_layout.addStretch()
+        content_layout.addWidget(self.latency_panel)
         content_layout.addWidget(self.tray)
 
         self.setLayout(main_layout)
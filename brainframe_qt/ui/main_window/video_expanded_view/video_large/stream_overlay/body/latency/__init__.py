@@ -0,0 +1 @@
+from .latency_panel import OverlayLatencyPanel
@@ -0,0 +1,257 @@
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+from PyQt5.QtCore import QRectF, QSize, Qt, QTimer
+from PyQt5.QtGui import QColor, QPainter, QPaintEvent
+from PyQt5.QtWidgets import QApplication, QFileDialog, QFrame, QHBoxLayout, \
+    QPushButton, QSizePolicy, QVBoxLayout, QWidget
+
+from brainframe_qt.api_utils.streaming.latency_tracker import BIN_EDGES_MS, \
+    FrameLatencyTracker, STAGES
+from brainframe_qt.ui.resources.config import RenderSettings
+from brainframe_qt.ui.resources.ui_elements.widgets.dialogs import \
+    BrainFrameMessage
+
+
+class OverlayLatencyPanel(QFrame):
+    """Histograms of how long the stream's recent frames took to get from the
+    decoder to the screen, at each stage along the way"""
+
+    REFRESH_INTERVAL = 500
+    """Milliseconds between updates of the histograms"""
+
+    def __init__(self, parent: QWidget):
+        super().__init__(parent=parent)
+
+        self.latency_tracker: Optional[FrameLatencyTracker] = None
+        self.render_config = RenderSettings()
+
+        self.histogram = self._init_histogram()
+        self.export_button = self._init_export_button()
+        self._refresh_timer = self._init_refresh_timer()
+
+        self._init_layout()
+        self._init_style()
+        self._init_signals()
+
+        self._handle_settings_change()
+
+    def _init_histogram(self) -> "_LatencyHistogram":
+        histogram = _LatencyHistogram(parent=self)
+
+        return histogram
+
+    def _init_export_button(self) -> QPushButton:
+        export_button = QPushButton(self.tr("Export CSV"), parent=self)
+        export_button.setToolTip(
+            self.tr("Save the latency of each recent frame to a CSV file"))
+
+        return export_button
+
+    def _init_refresh_timer(self) -> QTimer:
+        refresh_timer = QTimer(parent=self)
+        refresh_timer.setInterval(self.REFRESH_INTERVAL)
+
+        return refresh_timer
+
+    def _init_layout(self) -> None:
+        layout = QHBoxLayout()
+
+        button_layout = QVBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(self.export_button)
+
+        layout.addWidget(self.histogram)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def _init_style(self) -> None:
+        # Allow background of widget to be styled
+        self.setAttribute(Qt.WA_StyledBackground, True)
+
+        self.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Maximum)
+
+    def _init_signals(self) -> None:
+        self._refresh_timer.timeout.connect(self.refresh)
+        self.export_button.clicked.connect(self.export_csv)
+        self.render_config.value_changed.connect(self._handle_settings_change)
+
+    def set_latency_tracker(
+        self, latency_tracker: Optional[FrameLatencyTracker]
+    ) -> None:
+        self.latency_tracker = latency_tracker
+        self.refresh()
+
+    def refresh(self) -> None:
+        if self.latency_tracker is None:
+            self.histogram.set_stages([])
+            return
+
+        stages = [
+            _StageLatency(
+                name=stage,
+                counts=self.latency_tracker.histogram(stage),
+                percentiles=self.latency_tracker.percentiles(stage, (50, 95)),
+            )
+            for stage in STAGES
+        ]
+
+        self.histogram.set_stages(stages)
+
+    def export_csv(self) -> None:
+        if self.latency_tracker is None:
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.tr("Export Frame Latency"),
+            "frame_latency.csv",
+            self.tr("CSV files (*.csv)")
+        )
+
+        # User cancelled
+        if not file_path:
+            return
+
+        try:
+            with open(file_path, "w", newline="") as file:
+                self.latency_tracker.write_csv(file)
+        except OSError as exc:
+            message_title = self.tr("Error exporting frame latency")
+            message_info = self.tr("Unable to write {file_path}: {error}") \
+                .format(file_path=file_path, error=exc.strerror)
+
+            BrainFrameMessage.warning(
+                parent=self,
+                title=message_title,
+                warning=message_info
+            ).open()
+
+    def _handle_settings_change(self, _setting: Optional[str] = None,
+                                _value: object = None) -> None:
+        show_frame_latency = self.render_config.show_frame_latency
+
+        self.setVisible(show_frame_latency)
+
+        if show_frame_latency:
+            self.refresh()
+            self._refresh_timer.start()
+        else:
+            self._refresh_timer.stop()
+
+
+class _StageLatency(NamedTuple):
+    name: str
+    counts: np.ndarray
+    """Frames in each of the BIN_EDGES_MS bins"""
+    percentiles: Optional[Dict[float, float]]
+
+
+class _LatencyHistogram(QWidget):
+    """One row of bars per stage, one bar per latency bin"""
+
+    ROW_HEIGHT = 24
+    LABEL_WIDTH = 60
+    BAR_WIDTH = 16
+    STATS_WIDTH = 130
+    SPACING = 4
+
+    BAR_COLOR = QColor(255, 255, 255, 200)
+    TEXT_COLOR = QColor(Qt.white)
+
+    STAGE_NAMES = {
+        "sync": QApplication.translate("OverlayLatencyPanel", "Sync"),
+        "queue": QApplication.translate("OverlayLatencyPanel", "Queue"),
+        "render": QApplication.translate("OverlayLatencyPanel", "Render"),
+        "total": QApplication.translate("OverlayLatencyPanel", "Total"),
+    }
+
+    def __init__(self, *, parent: QWidget):
+        super().__init__(parent=parent)
+
+        self._stages: List[_StageLatency] = []
+
+        self.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+
+    def set_stages(self, stages: List[_StageLatency]) -> None:
+        self._stages = stages
+        self.update()
+
+    def sizeHint(self) -> QSize:
+        bin_count = len(BIN_EDGES_MS) - 1
+        width = (self.LABEL_WIDTH + bin_count * self.BAR_WIDTH
+                 + self.STATS_WIDTH + 2 * self.SPACING)
+        # An extra row for the bin labels
+        height = (len(STAGES) + 1) * self.ROW_HEIGHT
+
+        return QSize(width, height)
+
+    def paintEvent(self, _event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.setPen(self.TEXT_COLOR)
+
+        bars_left = self.LABEL_WIDTH + self.SPACING
+        stats_left = bars_left + (len(BIN_EDGES_MS) - 1) * self.BAR_WIDTH \
+            + self.SPACING
+
+        for row, stage in enumerate(self._stages):
+            top = row * self.ROW_HEIGHT
+
+            label_rect = QRectF(0, top, self.LABEL_WIDTH, self.ROW_HEIGHT)
+            painter.drawText(label_rect, Qt.AlignRight | Qt.AlignVCenter,
+                             self.STAGE_NAMES.get(stage.name, stage.name))
+
+            # Bars are scaled to the fullest bin of the row
+            max_count = stage.counts.max() if len(stage.counts) else 0
+            for bin_index, count in enumerate(stage.counts):
+                if not max_count or not count:
+                    continue
+
+                bar_height = (self.ROW_HEIGHT - 2) * count / max_count
+                bar_rect = QRectF(
+                    bars_left + bin_index * self.BAR_WIDTH + 1,
+                    top + self.ROW_HEIGHT - 1 - bar_height,
+                    self.BAR_WIDTH - 2,
+                    bar_height
+                )
+                painter.fillRect(bar_rect, self.BAR_COLOR)
+
+            stats_rect = QRectF(stats_left, top, self.STATS_WIDTH,
+                                self.ROW_HEIGHT)
+            painter.drawText(stats_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                             self._stats_text(stage))
+
+        # Label the lower edge of every other bin
+        labels_top = len(STAGES) * self.ROW_HEIGHT
+        font = painter.font()
+        font.setPointSizeF(font.pointSizeF() * 0.75)
+        painter.setFont(font)
+        for bin_index, edge in enumerate(BIN_EDGES_MS[:-1:2]):
+            label_rect = QRectF(
+                bars_left + bin_index * 2 * self.BAR_WIDTH - self.BAR_WIDTH,
+                labels_top,
+                self.BAR_WIDTH * 2,
+                self.ROW_HEIGHT
+            )
+            painter.drawText(label_rect, Qt.AlignHCenter | Qt.AlignTop,
+                             self._edge_text(edge))
+
+        label_rect = QRectF(stats_left, labels_top, self.STATS_WIDTH,
+                            self.ROW_HEIGHT)
+        painter.drawText(label_rect, Qt.AlignLeft | Qt.AlignTop,
+                         self.tr("ms, p50 / p95"))
+
+    @staticmethod
+    def _stats_text(stage: _StageLatency) -> str:
+        if stage.percentiles is None:
+            return "-"
+
+        p50, p95 = stage.percentiles[50], stage.percentiles[95]
+        return f"{p50:.1f} / {p95:.1f}"
+
+    @staticmethod
+    def _edge_text(edge_ms: float) -> str:
+        if edge_ms >= 1000:
+            return f"{edge_ms / 1000:g}s"
+        return f"{edge_ms:g}"
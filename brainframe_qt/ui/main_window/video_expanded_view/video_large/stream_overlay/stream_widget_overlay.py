@@ -1,9 +1,11 @@
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 
 from PyQt5.QtWidgets import QWidget
 from brainframe.api import bf_codecs
 
+from brainframe_qt.api_utils.streaming.latency_tracker import \
+    FrameLatencyTracker
 from brainframe_qt.api_utils.streaming.zone_status_frame import ZoneStatusFrameMeta
 
 from . import alerts as stream_alerts
@@ -24,6 +26,11 @@ class StreamWidgetOverlay(StreamWidgetOverlayUI):
         alerts = self._metadata_to_alerts(frame_metadata)
         self.body.handle_alerts(alerts)
 
+    def set_latency_tracker(
+        self, latency_tracker: Optional[FrameLatencyTracker]
+    ) -> None:
+        self.body.latency_panel.set_latency_tracker(latency_tracker)
+
     def stop_streaming(self) -> None:
         self.titlebar.set_stream_name(None)
 
@@ -15,11 +15,16 @@ class VideoLarge(StreamWidget):
 
         self.stream_overlay = self._init_stream_overlay()
 
+        # The expanded stream is what the user is looking at, so it's always
+        # decoded regardless of how many thumbnails are on screen
+        self.stream_event_manager.set_pinned(True)
+
         self._init_layout()
         self._init_style()
 
     def _init_stream_overlay(self) -> StreamWidgetOverlay:
         stream_overlay = StreamWidgetOverlay(parent=self)
+        stream_overlay.set_latency_tracker(self.latency_tracker)
 
         return stream_overlay
 
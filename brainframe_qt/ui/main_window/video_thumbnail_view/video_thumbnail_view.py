@@ -1,6 +1,7 @@
 from typing import Dict, List
 
-from PyQt5.QtCore import QMetaObject, QThread, Q_ARG, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtCore import QTimer, pyqtSignal
+from PyQt5.QtGui import QHideEvent, QResizeEvent, QShowEvent
 from PyQt5.QtWidgets import QWidget
 
 from brainframe.api.bf_codecs import Alert, StreamConfiguration
@@ -16,14 +17,33 @@ from .video_thumbnail_view_ui import _VideoThumbnailViewUI
 class VideoThumbnailView(_VideoThumbnailViewUI):
     stream_clicked = pyqtSignal(StreamConfiguration)
 
+    VISIBILITY_UPDATE_DELAY = 250
+    """Time in ms to wait for scrolling to settle before pausing/resuming streams
+    that were scrolled out of/into view"""
+
     def __init__(self, parent: QWidget):
         super().__init__(parent)
 
+        self._visibility_timer = self._init_visibility_timer()
+
         self._init_signals()
 
         self._retrieve_remote_streams()
 
+    def _init_visibility_timer(self) -> QTimer:
+        timer = QTimer(parent=self)
+
+        timer.setSingleShot(True)
+        timer.setInterval(self.VISIBILITY_UPDATE_DELAY)
+
+        return timer
+
     def _init_signals(self) -> None:
+        self._visibility_timer.timeout.connect(self._update_stream_visibility)
+
+        scroll_bar = self.scroll_area.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self._visibility_timer.start)
+        scroll_bar.rangeChanged.connect(self._visibility_timer.start)
 
         self.alert_stream_layout.thumbnail_stream_clicked_signal.connect(
             self.stream_clicked)
@@ -36,9 +56,22 @@ class VideoThumbnailView(_VideoThumbnailViewUI):
 
     def _init_alert_pubsub(self):
         """Called after streams are initially populated"""
-        stream_sub = zss_publisher.subscribe_alerts(self._handle_alerts)
+        stream_sub = zss_publisher.subscribe_alerts(self._handle_alerts,
+                                                gui_thread=True)
         self.destroyed.connect(lambda: zss_publisher.unsubscribe(stream_sub))
 
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self._visibility_timer.start()
+
+    def showEvent(self, event: QShowEvent) -> None:
+        super().showEvent(event)
+        self._visibility_timer.start()
+
+    def hideEvent(self, event: QHideEvent) -> None:
+        super().hideEvent(event)
+        self._visibility_timer.start()
+
     @property
     def streams(self) -> Dict[int, VideoSmall]:
         alert_streams = self.alert_stream_layout.stream_widgets
@@ -56,6 +89,7 @@ class VideoThumbnailView(_VideoThumbnailViewUI):
         self.alertless_stream_layout.new_stream_widget(stream_conf)
 
         self.show_background_image(False)
+        self._visibility_timer.start()
 
     def expand_video_grids(self, expand) -> None:
         self.alertless_stream_layout.expand_grid(expand)
@@ -77,16 +111,8 @@ class VideoThumbnailView(_VideoThumbnailViewUI):
         if len(self.streams) == 0:
             self.show_background_image(True)
 
-    @pyqtSlot(object)  # This is here for QMetaObject.invokeMethod
     def _handle_alerts(self, alerts: List[Alert]) -> None:
 
-        if QThread.currentThread() != self.thread():
-            # Move to the UI Thread
-            QMetaObject.invokeMethod(self, self._handle_alerts.__name__,
-                                     Qt.QueuedConnection,
-                                     Q_ARG("PyQt_PyObject", alerts))
-            return
-
         alert_streams = self.alert_stream_layout.stream_widgets
         alertless_streams = self.alertless_stream_layout.stream_widgets
 
@@ -108,6 +134,8 @@ class VideoThumbnailView(_VideoThumbnailViewUI):
                 video_widget.alerts_ongoing = True
                 self.alert_stream_layout.add_video(video_widget)
 
+        self._visibility_timer.start()
+
         streams_with_alerts = len(self.alert_stream_layout.stream_widgets) > 0
         self.alert_stream_layout.setVisible(streams_with_alerts)
 
@@ -123,6 +151,13 @@ class VideoThumbnailView(_VideoThumbnailViewUI):
     def _refresh_active_streams(self, stream_conf: StreamConfiguration) -> None:
         get_stream_manager().resume_streaming(stream_conf.id)
 
+    def _update_stream_visibility(self) -> None:
+        """Let each thumbnail know whether it's been scrolled into view, so that
+        only the streams on screen are decoded"""
+        viewport = self.scroll_area.viewport()
+        for stream_widget in self.streams.values():
+            stream_widget.update_visibility(viewport)
+
     def _retrieve_remote_streams(self) -> None:
 
         def on_success(stream_confs: List[StreamConfiguration]) -> None:
@@ -1,5 +1,8 @@
-from PyQt5.QtCore import QRectF, Qt, pyqtSignal
-from PyQt5.QtGui import QColor, QFontMetricsF, QImage, QPainter, QMouseEvent
+from typing import Optional
+
+from PyQt5.QtCore import QPoint, QRect, QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFontMetricsF, QImage, QPainter, QMouseEvent, \
+    QResizeEvent
 from PyQt5.QtWidgets import QWidget
 from brainframe.api.bf_codecs import StreamConfiguration
 
@@ -21,6 +24,28 @@ class VideoSmall(StreamWidget):
 
         self.alerts_ongoing: bool = False
 
+    def resizeEvent(self, event: Optional[QResizeEvent] = None) -> None:
+        super().resizeEvent(event)
+
+        # Thumbnails never show more pixels than they take up on screen, so
+        # there's no point in decoding (and buffering) full resolution frames
+        output_size = self.viewport().size() * self.devicePixelRatioF()
+        if not output_size.isEmpty():
+            self.stream_event_manager.set_output_size(output_size)
+
+    def update_visibility(self, viewport: QWidget) -> None:
+        """Report whether any part of the thumbnail is within the viewport of the
+        scroll area it's in. Thumbnails that have been scrolled out of view don't
+        need their streams decoded
+
+        :param viewport: The viewport of the scroll area. Must be an ancestor of
+            this widget
+        """
+        geometry = QRect(self.mapTo(viewport, QPoint(0, 0)), self.size())
+        on_screen = self.isVisible() and viewport.rect().intersects(geometry)
+
+        self.stream_event_manager.set_visible(on_screen)
+
     def drawForeground(self, painter: QPainter, rect: QRectF):
         """Draw the alert UI if there are ongoing alerts
 
@@ -1,20 +1,19 @@
 import enum
 import functools
 from enum import Enum
-from typing import List, Union
+from typing import Dict, Iterator, Union
 
-from PyQt5.QtCore import Qt, pyqtSlot, QThread, QMetaObject, Q_ARG
+from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication, QFrame, QVBoxLayout, QWidget, \
-    QLayout, QSizePolicy
+    QSizePolicy
 
 from brainframe.api.bf_codecs import StreamConfiguration, ZoneAlarm, Zone
-from brainframe_qt.api_utils.zss_pubsub import zss_publisher
+from brainframe_qt.api_utils.zss_pubsub import ZSSDelta, zss_publisher
 from brainframe_qt.ui.resources import stylesheet_watcher
 from brainframe_qt.ui.resources.alarms.alarm_bundle.alarm_card \
     import AlarmCard
 from brainframe_qt.ui.resources.alarms.alarm_bundle.bundle_header import \
     BundleHeader
-from brainframe_qt.ui.resources.mixins.data_structure import IterableMI
 from brainframe_qt.ui.resources.mixins.display import ExpandableMI
 from brainframe_qt.ui.resources.paths import qt_qss_paths
 
@@ -68,7 +67,13 @@ class AlarmBundleUI(QWidget):
         return bundle_header
 
 
-class AlarmBundle(AlarmBundleUI, ExpandableMI, IterableMI):
+class AlarmBundle(AlarmBundleUI, ExpandableMI):
+    """The alarms of a stream (or zone), each shown as an AlarmCard.
+
+    Cards are only built once the bundle is first expanded, as each one
+    fetches the history of its alarm. Until then, the bundle just keeps track
+    of its alarms.
+    """
 
     class BundleType(Enum):
         BY_STREAM = enum.auto()
@@ -83,40 +88,45 @@ class AlarmBundle(AlarmBundleUI, ExpandableMI, IterableMI):
         self.bundle_mode: self.BundleType = bundle_mode
         self.bundle_codec: Union[StreamConfiguration, Zone] = bundle_codec
 
+        self.alarms: Dict[int, ZoneAlarm] = {}
+        """{alarm.id: ZoneAlarm} for every alarm in the bundle"""
+        self.alarm_cards: Dict[int, AlarmCard] = {}
+        """{alarm.id: AlarmCard}. Empty until the bundle is first expanded"""
+        self._cards_built = False
+
         self._populate_bundle_header()
 
         self._init_signals()
 
+        # Start collapsed, so no cards are built for bundles never looked at
+        self.expanded = False
+
     def __contains__(self, alarm):
         if isinstance(alarm, AlarmCard):
-            return alarm in self.__iter__()
+            return self.alarm_cards.get(alarm.alarm.id) is alarm
 
         elif isinstance(alarm, ZoneAlarm):
-            try:
-                self[alarm]
-            except KeyError:
-                return False
-            return True
+            return alarm.id in self.alarms
 
         else:
-            return super().__contains__(alarm)
+            raise TypeError
 
     def __getitem__(self, alarm: ZoneAlarm) -> AlarmCard:
+        """The card of an alarm. Raises a KeyError if it hasn't been built"""
         if isinstance(alarm, ZoneAlarm):
-            search = (alarm_card for alarm_card in self
-                      if alarm_card.alarm.id == alarm.id)
-            try:
-                return next(search)
-            except StopIteration as exc:
-                raise KeyError from exc
+            return self.alarm_cards[alarm.id]
         else:
             raise TypeError
 
+    def __iter__(self) -> Iterator[AlarmCard]:
+        return iter(list(self.alarm_cards.values()))
+
     def _init_signals(self):
         self.bundle_header.clicked.connect(self.toggle_expansion)
 
         subscribe_alarms = functools.partial(zss_publisher.subscribe_alarms,
-                                             self.handle_alarm_stream)
+                                             self.handle_alarm_stream,
+                                             deltas=True, gui_thread=True)
 
         if self.bundle_mode is AlarmBundle.BundleType.BY_STREAM:
             subscription = subscribe_alarms(stream_id=self.bundle_codec.id)
@@ -145,64 +155,61 @@ class AlarmBundle(AlarmBundleUI, ExpandableMI, IterableMI):
         # Collapse all AlarmCards before collapsing the bundle
         if not expanding:
             for alarm_card in self:
-                alarm_card: AlarmCard
                 alarm_card.expanded = False
 
+        elif not self._cards_built:
+            self._cards_built = True
+            for alarm in self.alarms.values():
+                self.add_alarm_card(alarm)
+
         self.alarm_container.setVisible(expanding)
-        if self.iterable_layout().count() == 0:
-            self.layout().setSpacing(0)
-        else:
-            self.layout().setSpacing(-1)
+        self._update_spacing()
 
         stylesheet_watcher.update_widget(self)
 
-    def iterable_layout(self) -> QLayout:
-        return self.alarm_container.layout()
-
     def add_alarm_card(self, alarm: ZoneAlarm):
         alarm_card = AlarmCard(alarm, self)
         self.alarm_container.layout().addWidget(alarm_card)
+        self.alarm_cards[alarm.id] = alarm_card
 
-        # Add spacing back between BundleHeader and alarm_container
-        if self.layout().spacing() == 0:
-            self.layout().setSpacing(-1)
+        self._update_spacing()
 
     def del_alarm_card(self, alarm: ZoneAlarm):
-        alarm_card = self[alarm]
+        alarm_card = self.alarm_cards.pop(alarm.id)
         self.alarm_container.layout().removeWidget(alarm_card)
+        alarm_card.deleteLater()
 
-        # Remove between BundleHeader and (empty) alarm_container
-        if self.iterable_layout().count() == 0:
-            self.layout().setSpacing(0)
+        self._update_spacing()
 
-    @pyqtSlot(object)
-    def handle_alarm_stream(self, server_alarms: List[ZoneAlarm]):
-        """Add new alarms when the ZSS gets them"""
+    def handle_alarm_stream(self, alarm_delta: ZSSDelta):
+        """Add and remove alarms when the ZSS reports they've changed"""
 
-        if QThread.currentThread() != self.thread():
-            # Move to the UI Thread
-            QMetaObject.invokeMethod(self, self.handle_alarm_stream.__name__,
-                                     Qt.QueuedConnection,
-                                     Q_ARG("PyQt_PyObject", server_alarms))
-            return
+        for new_alarm in alarm_delta.added:
+            if new_alarm.id in self.alarms:
+                continue
 
-        server_alarms = {alarm.id: alarm for alarm in server_alarms}
-        local_alarms = {alarm_card.alarm.id: alarm_card.alarm
-                        for alarm_card in self}
+            self.alarms[new_alarm.id] = new_alarm
+            if self._cards_built:
+                self.add_alarm_card(new_alarm)
 
-        new_alarm_ids = set(server_alarms).difference(local_alarms)
-        del_alarm_ids = set(local_alarms).difference(server_alarms)
+        # Cards built from now on should show the alarm as it is now
+        for changed_alarm in alarm_delta.changed:
+            if changed_alarm.id in self.alarms:
+                self.alarms[changed_alarm.id] = changed_alarm
 
-        new_alarms = {alarm_id: server_alarms[alarm_id]
-                      for alarm_id in new_alarm_ids}
-        del_alarms = {alarm_id: local_alarms[alarm_id]
-                      for alarm_id in del_alarm_ids}
+        for del_alarm in alarm_delta.removed:
+            if self.alarms.pop(del_alarm.id, None) is None:
+                continue
 
-        for new_alarm in new_alarms.values():
-            self.add_alarm_card(new_alarm)
+            if del_alarm.id in self.alarm_cards:
+                self.del_alarm_card(del_alarm)
 
-        for del_alarm in del_alarms.values():
-            self.del_alarm_card(del_alarm)
+    def _update_spacing(self) -> None:
+        # No spacing between the BundleHeader and an empty alarm_container
+        if self.alarm_cards:
+            self.layout().setSpacing(-1)
+        else:
+            self.layout().setSpacing(0)
 
 
 if __name__ == '__main__':
@@ -1,20 +1,18 @@
 import typing
 from typing import List, Optional
 
-from PyQt5.QtCore import QMetaObject, Q_ARG, Qt, pyqtProperty, pyqtSlot, \
-    QThread
-from PyQt5.QtWidgets import QFrame, QLayout, QSizePolicy, QVBoxLayout, QWidget
+from PyQt5.QtCore import QModelIndex, Qt, QTimer, pyqtProperty
+from PyQt5.QtWidgets import QFrame, QSizePolicy, QVBoxLayout, QWidget
 
-from brainframe_qt.api_utils import api
 from brainframe.api.bf_codecs import Alert, ZoneAlarm
-from brainframe_qt.api_utils.zss_pubsub import zss_publisher
-from brainframe_qt.ui.resources import QTAsyncWorker, stylesheet_watcher
+from brainframe_qt.api_utils.alert_frame_cache import alert_frame_cache
+from brainframe_qt.api_utils.zss_pubsub import ZSSDelta, zss_publisher
+from brainframe_qt.ui.resources import stylesheet_watcher
 # TODO: Change to relative imports?
 from brainframe_qt.ui.resources.alarms.alarm_bundle.alarm_card.alarm_header \
     import AlarmHeader
 from brainframe_qt.ui.resources.alarms.alarm_bundle.alarm_card.alert_log \
     import AlertLog
-from brainframe_qt.ui.resources.mixins.data_structure import IterableMI
 from brainframe_qt.ui.resources.mixins.display import ExpandableMI
 from brainframe_qt.ui.resources.paths import qt_qss_paths
 
@@ -60,7 +58,11 @@ class AlarmCardUI(QFrame):
         return alert_log
 
 
-class AlarmCard(AlarmCardUI, ExpandableMI, IterableMI):
+class AlarmCard(AlarmCardUI, ExpandableMI):
+
+    PREFETCH_FRAMES = 10
+    """Number of the newest alerts whose frames are loaded in the background
+    while the card is expanded"""
 
     def __init__(self, alarm: ZoneAlarm, parent: QWidget):
         # Properties
@@ -69,7 +71,6 @@ class AlarmCard(AlarmCardUI, ExpandableMI, IterableMI):
         super().__init__(parent)
 
         self.alarm = alarm
-        self.MAX_ALERTS = 50
 
         self.stream_id = typing.cast(int, None)
         self._stream_name = typing.cast(str, None)
@@ -77,6 +78,9 @@ class AlarmCard(AlarmCardUI, ExpandableMI, IterableMI):
         self.zone_id: Optional[int] = None
         self._zone_name: Optional[str] = None
 
+        self._prefetch_scheduled = False
+        """Whether a prefetch will run once the alerts being added are in"""
+
         self.alarm_header.set_alarm(self.alarm)
         self._init_alert_log_history()
 
@@ -84,55 +88,56 @@ class AlarmCard(AlarmCardUI, ExpandableMI, IterableMI):
 
     def expand(self, expanding: bool):
         self.alert_log.setVisible(expanding)
-        stylesheet_watcher.update_widget(self)
 
-    def iterable_layout(self) -> QLayout:
-        return self.alert_log.layout()
+        if expanding:
+            self._prefetch_latest_frames()
+
+        stylesheet_watcher.update_widget(self)
 
     def _init_signals(self):
         self.alarm_header.clicked.connect(self.toggle_expansion)
         self.alert_log.alert_activity_changed.connect(self._set_alert_active)
 
+        # Cards start off expanded, before their first page of alerts has
+        # loaded
+        self.alert_log.alert_model.rowsInserted.connect(
+            self._handle_alerts_inserted)
+
         subscription = zss_publisher.subscribe_alerts(
-            self.handle_alert_stream,
-            alarm_id=self.alarm.id)
+            self.handle_alert_delta,
+            alarm_id=self.alarm.id,
+            deltas=True,
+            gui_thread=True)
         self.destroyed.connect(lambda: zss_publisher.unsubscribe(subscription))
 
     def _init_alert_log_history(self) -> None:
+        # The AlertLog fetches the rest of the history as it's scrolled
+        self.alert_log.set_alarm(self.alarm.id)
 
-        self.alert_log.max_alerts = self.MAX_ALERTS
+    def _handle_alerts_inserted(self, _parent: QModelIndex, first: int,
+                                _last: int) -> None:
+        if not self.expanded or first >= self.PREFETCH_FRAMES:
+            return
 
-        def handle_success(alerts_and_count):
-            alerts: List[Alert]
-            _count: int
-            alerts, _count = alerts_and_count
-            self.handle_alert_stream(alerts)
+        # Rows are inserted one at a time. Prefetch once the whole page is in
+        if not self._prefetch_scheduled:
+            self._prefetch_scheduled = True
+            QTimer.singleShot(0, self._prefetch_latest_frames)
 
-        def handle_error(err):
-            raise err
+    def _prefetch_latest_frames(self) -> None:
+        """Load the frames of the alerts most likely to be looked at next"""
+        self._prefetch_scheduled = False
 
-        QTAsyncWorker(self, api.get_alerts,
-                      f_kwargs={"alarm_id": self.alarm.id,
-                                "limit": self.MAX_ALERTS,
-                                "offset": 0},
-                      on_success=handle_success,
-                      on_error=handle_error) \
-            .start()
+        latest_alerts = self.alert_log.latest_alerts(self.PREFETCH_FRAMES)
+        alert_frame_cache.prefetch(alert.id for alert in latest_alerts)
 
-    @pyqtSlot(object)
-    def handle_alert_stream(self, alerts: List[Alert]):
-        """Add new alerts when the ZSS gets them"""
+    def handle_alert_delta(self, alert_delta: ZSSDelta):
+        """Called by the ZSS when alerts for this alarm are added or change"""
+        self.handle_alert_stream(alert_delta.added + alert_delta.changed)
 
-        if QThread.currentThread() != self.thread():
-            # Move to the UI Thread
-            QMetaObject.invokeMethod(self, self.handle_alert_stream.__name__,
-                                     Qt.QueuedConnection,
-                                     Q_ARG("PyQt_PyObject", alerts))
-            return
-
-        for alert in alerts:
-            if not self.alert_log.contains_alert(alert):
-                self.alert_log.add_alert(alert)
+    def handle_alert_stream(self, alerts: List[Alert]):
+        """Add new alerts and update existing ones when the ZSS gets them"""
+        self.alert_log.add_alerts(alerts)
 
     @pyqtProperty(bool)
     def alert_active(self) -> bool:
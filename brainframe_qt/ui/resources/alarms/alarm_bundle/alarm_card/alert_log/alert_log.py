@@ -1,34 +1,50 @@
-from typing import Optional
+import logging
 import typing
+from typing import Iterable, List, Optional, Union
 
-from PyQt5.QtCore import Qt, QSize, QTimer, pyqtSignal, pyqtSlot
-from PyQt5.QtWidgets import QScrollArea, QWidget
+from PyQt5.QtCore import QEvent, QModelIndex, QObject, \
+    QPersistentModelIndex, QSize, Qt, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QAbstractItemView, QListView, QWidget
 
+from brainframe.api import bf_errors
 from brainframe.api.bf_codecs import Alert
-from brainframe_qt.ui.resources import stylesheet_watcher
-from brainframe_qt.ui.resources.mixins.mouse import ClickableMI
+from brainframe_qt.api_utils import api
+from brainframe_qt.ui.resources import QTAsyncWorker, stylesheet_watcher
+from brainframe_qt.ui.resources.alarms.alert_list_model import AlertListModel
 from brainframe_qt.ui.resources.mixins.style import TransientScrollbarMI
 from brainframe_qt.ui.resources.paths import qt_qss_paths
+from .alert_log_delegate import AlertLogDelegate
 from .alert_log_entry import AlertLogEntry
-from .alert_log_layout import AlertLogLayout
 
 
-class AlertLogUI(QScrollArea, TransientScrollbarMI):
+class AlertLogUI(QListView, TransientScrollbarMI):
 
     def __init__(self, parent: Optional[QWidget]):
         super().__init__(parent)
 
-        # Initialize widgets
-        self.container_layout = self._init_container_layout()
-        container_widget = self._init_container_widget()
-        self.setWidget(container_widget)
+        self.alert_model = self._init_alert_model()
+        self.alert_delegate = self._init_alert_delegate()
+
+        self.setModel(self.alert_model)
+        self.setItemDelegate(self.alert_delegate)
 
         self._init_viewport_widget()
 
         self._init_style()
 
-    def sizeHint(self):
-        return self.widget().sizeHint()
+    def sizeHint(self) -> QSize:
+        """Tall enough to show every row, up to the maximum height"""
+        size_hint: QSize = super().sizeHint()
+
+        max_height = self.maximumHeight()
+        height = 2 * self.frameWidth()
+        for row in range(self.alert_model.rowCount()):
+            if height >= max_height:
+                break
+            height += self.sizeHintForRow(row)
+
+        size_hint.setHeight(min(height, max_height))
+        return size_hint
 
     def minimumSizeHint(self):
         """The default QAbstractScrollArea implementation wants to leave room
@@ -37,121 +53,203 @@ class AlertLogUI(QScrollArea, TransientScrollbarMI):
         size_hint.setHeight(0)
         return size_hint
 
+    def _init_alert_model(self) -> AlertListModel:
+        alert_model = AlertListModel(self)
+        return alert_model
+
+    def _init_alert_delegate(self) -> AlertLogDelegate:
+        alert_delegate = AlertLogDelegate(self)
+        return alert_delegate
+
     def _init_style(self) -> None:
         # Allow background of widget to be styled
         self.setAttribute(Qt.WA_StyledBackground, True)
-        self.setWidgetResizable(True)
 
-        stylesheet_watcher.watch(self, qt_qss_paths.alert_log_qss)
-
-    def _init_container_widget(self) -> QWidget:
-        container_widget = QWidget(self)
-        container_widget.setObjectName("container")
-        container_widget.setAttribute(Qt.WA_StyledBackground, True)
-
-        container_widget.setLayout(self.container_layout)
+        # Rows have different heights once expanded
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
 
-        return container_widget
+        # Highlight the row under the mouse
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover, True)
 
-    # noinspection PyMethodMayBeStatic
-    def _init_container_layout(self) -> AlertLogLayout:
-        layout = AlertLogLayout()
-        return layout
+        stylesheet_watcher.watch(self, qt_qss_paths.alert_log_qss)
 
     def _init_viewport_widget(self) -> None:
         # Give the viewport a name for the stylesheet
         self.viewport().setObjectName("viewport")
 
 
-class AlertLog(AlertLogUI, ClickableMI):
+class AlertLog(AlertLogUI):
+    """The alerts of an alarm, newest first.
+
+    Collapsed rows are painted by the AlertLogDelegate. An AlertLogEntry
+    widget is only created for a row when it's expanded, and older alerts are
+    fetched from the server as the log is scrolled down.
+    """
 
     alert_activity_changed = pyqtSignal(bool)
 
     def __init__(self, parent: QWidget):
         super().__init__(parent)
 
-        self.max_alerts = None
         self._alert_active = typing.cast(bool, None)
 
-    def add_alert(self, alert: Alert):
-        alert_log_entry = AlertLogEntry(alert, self)
+        self._init_signals()
 
-        # Add widget to the top of the layout
-        layout = typing.cast(AlertLogLayout, self.widget().layout())
-        layout.addWidget(alert_log_entry)
+    def _init_signals(self) -> None:
+        self.alert_delegate.header_clicked.connect(self.toggle_alert_expansion)
+        self.alert_delegate.verification_clicked.connect(
+            self.set_alert_verification)
 
-        # When an AlertLogEntry is expanded, make sure it and its contents are
-        # visible in the ScrollArea
-        alert_log_entry.expansion_changed.connect(
-            self._ensure_alert_log_entry_visible)
-        alert_log_entry.alert_activity_changed.connect(
-            self._interpret_alert_activity_changed)
-
-        # Ok sooo...
-        # Adding a widget to a layout calls QLayout.addChildWidget. This calls
-        # AlertLogEntry.setVisible but using QMetaObject.invokeMethod.
-        # This means that AlertLogEntry.setVisible is only called in the _next_
-        # Event Loop. QWidget.setVisible is where size recalculation is
-        # performed. We _must_ call updateGeometry after our sizeHint changes.
-        # Therefore, I update the geometry using a singleshot, which adds it to
-        # the Event Loop queue and should be performed after the widget has
-        # been set visible (i.e. size is recalculated)
-        QTimer.singleShot(0, self.updateGeometry)
-
-        if self.max_alerts is not None \
-                and self.container_layout.count() > self.max_alerts:
-            self.pop_alert()
-
-        # This check to ensure edge case where self.max_alerts = 0 doesn't
-        # break anything
-        if self.container_layout.count() == 0:
-            latest_alert_active = False
-        else:
-            latest_alert = self.container_layout.widget_at(0)
-            latest_alert_active = (latest_alert.alert.end_time is None)
+        # The height of the log depends on its rows
+        self.alert_delegate.sizeHintChanged.connect(self.updateGeometry)
 
-        if self._alert_active != latest_alert_active:
-            self._alert_active = latest_alert_active
-            self.alert_activity_changed.emit(latest_alert_active)
+        self.alert_model.rowsInserted.connect(self._handle_rows_changed)
+        self.alert_model.rowsRemoved.connect(self._handle_rows_changed)
+        self.alert_model.modelReset.connect(self._handle_rows_changed)
+        self.alert_model.dataChanged.connect(self._handle_alerts_changed)
 
-    def pop_alert(self):
-        last_index = self.container_layout.count() - 1
-        alert_log_entry = self.container_layout.take_widget_at(last_index)
+    def set_alarm(self, alarm_id: int) -> None:
+        """Show the alerts of an alarm, starting with the most recent page"""
+        self.alert_model.set_query(alarm_id=alarm_id)
 
-        alert_log_entry.expansion_changed.disconnect()
+        # Not left to the view, as the alarm's activity is needed even while
+        # the log is hidden
+        self.alert_model.fetchMore(QModelIndex())
 
-        # Add widget to the top of the layout
-        alert_log_entry.deleteLater()
+    def add_alerts(self, alerts: Iterable[Alert]) -> None:
+        """Add new alerts and update the ones already in the log"""
+        self.alert_model.add_alerts(alerts)
 
-        QTimer.singleShot(0, self.updateGeometry)
+    def contains_alert(self, alert: Alert) -> bool:
+        return self.alert_model.contains_alert(alert.id)
 
-        if self.container_layout.count() == 0 and self._alert_active:
-            self._alert_active = False
-            self.alert_activity_changed.emit(False)
+    def latest_alerts(self, count: int) -> List[Alert]:
+        rows = range(min(count, self.alert_model.rowCount()))
+        return [self.alert_model.alert(row) for row in rows]
 
-    def _ensure_alert_log_entry_visible(self, expanded: bool):
+    def toggle_alert_expansion(self, alert_id: int) -> None:
+        row = self.alert_model.row_of(alert_id)
+        if row is None:
+            return
+
+        index = self.alert_model.index(row)
+        if self.indexWidget(index) is None:
+            self._expand_alert(index)
+        else:
+            self._collapse_alert(index)
 
-        if not expanded:
+    def set_alert_verification(self, alert_id: int,
+                               verification: Union[None, bool]) -> None:
+        """Verify an alert from its collapsed row"""
+        row = self.alert_model.row_of(alert_id)
+        if row is None:
             return
 
-        alert_log_entry = typing.cast(AlertLogEntry, self.sender())
+        alert = self.alert_model.alert(row)
+        old_verification = alert.verified_as
 
-        # https://stackoverflow.com/a/52450450/8134178
-        QTimer.singleShot(0, lambda: self.ensureWidgetVisible(alert_log_entry))
+        # Show the change right away, and revert it if the server refuses
+        alert.verified_as = verification
+        self.alert_model.alert_changed(alert_id)
 
-    def contains_alert(self, alert: Alert):
-        for index in range(self.container_layout.count()):
-            alert_log_entry = self.container_layout.widget_at(index)
-            if alert_log_entry.alert.id == alert.id:
-                return True
-        return False
+        def on_error(exc: bf_errors.BaseAPIError):
+            alert.verified_as = old_verification
+            self.alert_model.alert_changed(alert_id)
 
-    @pyqtSlot(bool)
-    def _interpret_alert_activity_changed(self, alert_active: bool):
-        if self.container_layout.count() == 0 \
-                or self.sender() != self.container_layout.widget_at(0):
+            logging.warning("An error occurred while attempting to set alert "
+                            "verification value on the BrainFrame server. "
+                            "The value has been reverted on the client.")
+
+            if not isinstance(exc, bf_errors.AlertNotFoundError):
+                logging.error(exc)
+
+        QTAsyncWorker(self, api.set_alert_verification,
+                      f_args=(alert_id, verification),
+                      on_error=on_error) \
+            .start()
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        # The size of an expanded AlertLogEntry changes as its preview loads
+        if isinstance(watched, AlertLogEntry) \
+                and event.type() == QEvent.LayoutRequest:
+            row = self.alert_model.row_of(watched.alert.id)
+            if row is not None:
+                index = self.alert_model.index(row)
+                self.alert_delegate.sizeHintChanged.emit(index)
+
+        return super().eventFilter(watched, event)
+
+    def _expand_alert(self, index: QModelIndex) -> None:
+        alert = self.alert_model.alert(index.row())
+
+        alert_log_entry = AlertLogEntry(alert, self.viewport())
+        alert_log_entry.expanded = True
+
+        # Collapsing the entry turns it back into a painted row
+        alert_log_entry.expansion_changed.connect(
+            lambda expanded: self._handle_entry_expansion(alert.id, expanded))
+        alert_log_entry.installEventFilter(self)
+
+        self.setIndexWidget(index, alert_log_entry)
+        self.alert_delegate.sizeHintChanged.emit(index)
+
+        # Make sure the expanded entry and its contents are visible, once the
+        # rows have been laid out again
+        persistent_index = QPersistentModelIndex(index)
+        QTimer.singleShot(0, lambda: self._ensure_index_visible(
+            persistent_index))
+
+    def _collapse_alert(self, index: QModelIndex) -> None:
+        alert_log_entry = self.indexWidget(index)
+
+        # Delete the AlertLogEntry along with its preview
+        self.setIndexWidget(index, None)
+        alert_log_entry.deleteLater()
+
+        self.alert_delegate.sizeHintChanged.emit(index)
+
+    def _handle_entry_expansion(self, alert_id: int, expanded: bool) -> None:
+        if expanded:
             return
 
-        if self._alert_active != alert_active:
-            self._alert_active = alert_active
-            self.alert_activity_changed.emit(alert_active)
+        row = self.alert_model.row_of(alert_id)
+        if row is not None:
+            self._collapse_alert(self.alert_model.index(row))
+
+    def _ensure_index_visible(self,
+                              persistent_index: QPersistentModelIndex) -> None:
+        if persistent_index.isValid():
+            index = self.alert_model.index(persistent_index.row())
+            self.scrollTo(index, QAbstractItemView.EnsureVisible)
+
+    def _handle_alerts_changed(self, top_left: QModelIndex,
+                               bottom_right: QModelIndex) -> None:
+        # Keep expanded entries up to date
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            alert_log_entry = self.indexWidget(self.alert_model.index(row))
+            if alert_log_entry is not None:
+                alert_log_entry.set_alert(self.alert_model.alert(row))
+
+        if top_left.row() == 0:
+            self._update_alert_activity()
+
+    def _handle_rows_changed(self) -> None:
+        self.updateGeometry()
+        self._update_alert_activity()
+
+    def _update_alert_activity(self) -> None:
+        """Let others know when the latest alert starts or stops being
+        active"""
+        if self.alert_model.rowCount() == 0:
+            latest_alert_active = False
+        else:
+            latest_alert = self.alert_model.alert(0)
+            latest_alert_active = latest_alert.end_time is None
+
+        if self._alert_active != latest_alert_active:
+            self._alert_active = latest_alert_active
+            self.alert_activity_changed.emit(latest_alert_active)
@@ -0,0 +1,191 @@
+from typing import List, Optional, Tuple
+
+import pendulum
+from PyQt5.QtCore import QAbstractItemModel, QEvent, QModelIndex, QRect, \
+    QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QHelpEvent, QMouseEvent, \
+    QPainter
+from PyQt5.QtWidgets import QAbstractItemView, QStyle, \
+    QStyleOptionViewItem, QStyledItemDelegate, QToolTip
+
+from brainframe.api.bf_codecs import Alert
+from brainframe_qt.ui.resources.alarms.alert_list_model import AlertRole
+from brainframe_qt.ui.resources.config import LocaleSettings
+
+
+class AlertLogDelegate(QStyledItemDelegate):
+    """Paints the collapsed rows of an AlertLog the way an AlertHeader looks:
+    the alert's time span and its verification buttons.
+
+    Rows that have an index widget (i.e. an expanded AlertLogEntry) aren't
+    painted, and are as tall as the widget wants to be.
+    """
+
+    header_clicked = pyqtSignal(int)
+    """A collapsed row was clicked outside of its buttons. Sends the alert
+    ID"""
+
+    verification_clicked = pyqtSignal(int, object)
+    """A verification button of a collapsed row was clicked. Sends the alert ID
+    and the verification the user asked for (True, False or None)"""
+
+    MARGIN = 9
+    SPACING = 2
+    BUTTON_SIZE = 36
+    BUTTON_FONT_SIZE = 25
+    """Pixel size of the ✔️ and ❌ glyphs"""
+
+    HOVER_COLOR = QColor("lightgrey")
+    TIME_COLOR = QColor("dimgrey")
+    TIMEZONE_COLOR = QColor("darkgrey")
+    UNVERIFIED_COLOR = QColor("dimgrey")
+    VERIFIED_TRUE_COLOR = QColor("limegreen")
+    VERIFIED_FALSE_COLOR = QColor("indianred")
+
+    def __init__(self, parent: QAbstractItemView):
+        super().__init__(parent)
+
+        self.locale_settings = LocaleSettings()
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem,
+              index: QModelIndex) -> None:
+        if self._index_widget(index) is not None:
+            return
+
+        alert: Alert = index.data(AlertRole)
+        if alert is None:
+            return
+
+        painter.save()
+
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        if hovered:
+            painter.fillRect(option.rect, self.HOVER_COLOR)
+
+        text_rect = option.rect.adjusted(self.MARGIN, 0, -self.MARGIN, 0)
+        self._paint_segments(painter, text_rect,
+                             self._time_span_segments(alert))
+
+        true_rect, false_rect = self._button_rects(option.rect)
+        self._paint_button(painter, true_rect, "✔️",
+                           self.VERIFIED_TRUE_COLOR
+                           if alert.verified_as is True
+                           else self.UNVERIFIED_COLOR)
+        self._paint_button(painter, false_rect, "❌",
+                           self.VERIFIED_FALSE_COLOR
+                           if alert.verified_as is False
+                           else self.UNVERIFIED_COLOR)
+
+        painter.restore()
+
+    def sizeHint(self, option: QStyleOptionViewItem,
+                 index: QModelIndex) -> QSize:
+        index_widget = self._index_widget(index)
+        if index_widget is not None:
+            return QSize(option.rect.width(), index_widget.sizeHint().height())
+
+        font_height = option.fontMetrics.height()
+        height = max(font_height, self.BUTTON_SIZE) + 2 * self.SPACING
+
+        return QSize(option.rect.width(), height)
+
+    def editorEvent(self, event: QEvent, model: QAbstractItemModel,
+                    option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() != QEvent.MouseButtonRelease:
+            return super().editorEvent(event, model, option, index)
+
+        event: QMouseEvent
+        alert: Alert = index.data(AlertRole)
+        if alert is None or event.button() != Qt.LeftButton:
+            return False
+
+        true_rect, false_rect = self._button_rects(option.rect)
+        if true_rect.contains(event.pos()):
+            verification = None if alert.verified_as is True else True
+            self.verification_clicked.emit(alert.id, verification)
+        elif false_rect.contains(event.pos()):
+            verification = None if alert.verified_as is False else False
+            self.verification_clicked.emit(alert.id, verification)
+        else:
+            self.header_clicked.emit(alert.id)
+
+        return True
+
+    def helpEvent(self, event: QHelpEvent, view: QAbstractItemView,
+                  option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        alert: Alert = index.data(AlertRole)
+        if alert is None or self._index_widget(index) is not None:
+            return super().helpEvent(event, view, option, index)
+
+        true_rect, false_rect = self._button_rects(option.rect)
+        if true_rect.contains(event.pos()):
+            tooltip = self.tr("Unverify alert") if alert.verified_as is True \
+                else self.tr("Verify alert")
+        elif false_rect.contains(event.pos()):
+            tooltip = self.tr("Unmark alert as false positive") \
+                if alert.verified_as is False \
+                else self.tr("Mark alert as false positive")
+        else:
+            return super().helpEvent(event, view, option, index)
+
+        QToolTip.showText(event.globalPos(), tooltip, view)
+        return True
+
+    def _index_widget(self, index: QModelIndex):
+        view: QAbstractItemView = self.parent()
+        return view.indexWidget(index)
+
+    def _button_rects(self, rect: QRect) -> Tuple[QRect, QRect]:
+        """Where the verified true and verified false buttons are in a row"""
+        top = rect.top() + (rect.height() - self.BUTTON_SIZE) // 2
+
+        false_rect = QRect(rect.right() - self.MARGIN - self.BUTTON_SIZE + 1,
+                           top, self.BUTTON_SIZE, self.BUTTON_SIZE)
+        true_rect = false_rect.translated(-self.BUTTON_SIZE - self.SPACING, 0)
+
+        return true_rect, false_rect
+
+    def _time_span_segments(self, alert: Alert) \
+            -> List[Tuple[str, Optional[QColor]]]:
+        """Text of the alert's time span, as (text, color) pairs"""
+        timezone = self.locale_settings.get_user_timezone()
+
+        def time_segments(timestamp: float) \
+                -> List[Tuple[str, Optional[QColor]]]:
+            display_time = pendulum.from_timestamp(timestamp).in_tz(timezone)
+            return [(display_time.format("HH:mm"), self.TIME_COLOR),
+                    (display_time.tzname(), self.TIMEZONE_COLOR)]
+
+        segments = time_segments(alert.start_time)
+        segments.append(("–", None))
+        if alert.end_time is not None:
+            segments.extend(time_segments(alert.end_time))
+
+        return segments
+
+    def _paint_segments(self, painter: QPainter, rect: QRect,
+                        segments: List[Tuple[str, Optional[QColor]]]) -> None:
+        default_pen = painter.pen()
+        font_metrics = painter.fontMetrics()
+
+        left = rect.left()
+        for text, color in segments:
+            painter.setPen(color if color is not None else default_pen)
+
+            segment_rect = QRect(left, rect.top(), rect.right() - left,
+                                 rect.height())
+            painter.drawText(segment_rect, Qt.AlignLeft | Qt.AlignVCenter,
+                             text)
+
+            left += font_metrics.horizontalAdvance(text) + self.SPACING * 2
+
+        painter.setPen(default_pen)
+
+    def _paint_button(self, painter: QPainter, rect: QRect, text: str,
+                      color: QColor) -> None:
+        font = QFont(painter.font())
+        font.setPixelSize(self.BUTTON_FONT_SIZE)
+
+        painter.setFont(font)
+        painter.setPen(color)
+        painter.drawText(rect, Qt.AlignCenter, text)
@@ -4,7 +4,7 @@ from typing import List, Union, Tuple
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QWidget, QLabel, QVBoxLayout, QSizePolicy
 
-from brainframe_qt.api_utils import api
+from brainframe_qt.api_utils.entity_cache import entity_cache
 from brainframe.api import bf_codecs
 from brainframe_qt.ui.resources import stylesheet_watcher, QTAsyncWorker
 from brainframe_qt.ui.resources.paths import qt_qss_paths
@@ -69,8 +69,8 @@ class AlertDetail(AlertDetailUI):
             return
 
         def get_alert_info() -> Tuple[bf_codecs.ZoneAlarm, bf_codecs.Zone]:
-            alarm = api.get_zone_alarm(self.alert.alarm_id)
-            zone = api.get_zone(alarm.zone_id)
+            alarm = entity_cache.get_zone_alarm(self.alert.alarm_id)
+            zone = entity_cache.get_zone(alarm.zone_id)
 
             return alarm, zone
 
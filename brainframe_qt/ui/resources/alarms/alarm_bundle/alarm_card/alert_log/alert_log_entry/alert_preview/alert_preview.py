@@ -1,16 +1,15 @@
 import typing
 from typing import Optional
 
-import numpy as np
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QPixmap
 from PyQt5.QtWidgets import QFrame, QHBoxLayout, QWidget
 
 from brainframe_qt.api_utils import api
 from brainframe.api.bf_codecs import Alert
+from brainframe_qt.api_utils.alert_frame_cache import alert_frame_cache
 # noinspection PyUnresolvedReferences
-from brainframe_qt.ui.resources import QTAsyncWorker, qt_resources, \
-    stylesheet_watcher
+from brainframe_qt.ui.resources import qt_resources, stylesheet_watcher
 from brainframe_qt.ui.resources.alarms.alarm_bundle.alarm_card.alert_log \
     .alert_log_entry.alert_preview.alert_detail import AlertDetail
 from brainframe_qt.ui.resources.paths import qt_qss_paths
@@ -98,18 +97,17 @@ class AlertPreview(AlertPreviewUI):
 
     def load_alert_image(self):
 
-        def handle_frame(frame: Optional[np.ndarray]):
+        def handle_frame(frame: Optional[QPixmap]):
 
             if frame is None:
                 self.image_label.pixmap_ = self._get_no_image_available_image()
             else:
-                self.image_label.set_ndarray(frame)
+                self.image_label.pixmap_ = frame
 
         self.image_label.pixmap_ = self._get_loading_image()
 
-        QTAsyncWorker(self, api.get_alert_frame, f_args=(self.alert.id,),
-                      on_success=handle_frame) \
-            .start()
+        # Called right away if the frame is cached in memory
+        alert_frame_cache.get_frame(self, self.alert.id, handle_frame)
 
     def set_alert(self, alert):
         self.alert = alert
@@ -0,0 +1,204 @@
+import bisect
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from requests.exceptions import RequestException
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+
+from brainframe.api import bf_errors
+from brainframe.api.bf_codecs import Alert
+from brainframe_qt.api_utils import api
+from brainframe_qt.ui.resources import QTAsyncWorker
+
+AlertRole = Qt.UserRole + 1
+"""Role under which the model provides each row's Alert"""
+
+
+class AlertListModel(QAbstractListModel):
+    """Alerts, newest first, one per row.
+
+    Alerts are put in the model as they are pushed by the ZoneStatus stream.
+    Older history is paged in from the server as the view scrolls down to it
+    (canFetchMore/fetchMore), so the model isn't limited to the alerts that
+    fit on screen. Views paint the rows themselves using a delegate.
+    """
+
+    PAGE_SIZE = 50
+    """Number of alerts asked for at a time when fetching older alerts"""
+
+    def __init__(self, parent: QObject, *, page_size: int = PAGE_SIZE):
+        super().__init__(parent)
+
+        self.page_size = page_size
+
+        self._alerts: List[Alert] = []
+        """Sorted by ID, newest (largest) first"""
+        self._sort_keys: List[int] = []
+        """Negated alert IDs, parallel to _alerts, for bisecting"""
+
+        self._query: Optional[Dict[str, Any]] = None
+        """Filters passed to api.get_alerts when fetching older alerts. None
+        if alerts are never fetched"""
+        self._query_generation = 0
+        """Incremented when the query changes, so pages fetched for an old
+        query are dropped"""
+
+        self._fetch_offset = 0
+        """Offset of the next page on the server. Alerts newer than the
+        loaded ones push the rest further down the server's list"""
+        self._fetching = False
+        self._more_on_server = False
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._alerts)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._alerts):
+            return None
+
+        if role == AlertRole:
+            return self._alerts[index.row()]
+
+        return None
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        if parent.isValid():
+            return False
+        return self._more_on_server and not self._fetching
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        """Get the next page of older alerts from the server"""
+        if not self.canFetchMore(parent):
+            return
+
+        self._fetching = True
+
+        query = dict(self._query)
+        offset = self._fetch_offset
+        query_generation = self._query_generation
+
+        def on_success(alerts_and_count: Tuple[List[Alert], int]) -> None:
+            if query_generation != self._query_generation:
+                return
+            self._fetching = False
+
+            alerts, _total_count = alerts_and_count
+
+            self._more_on_server = len(alerts) == self.page_size
+            self._add_alerts(alerts)
+
+            # Alerts already in the model don't move the offset when they're
+            # fetched again. max() keeps a page that overlaps alerts pushed in
+            # the meantime from skipping past any
+            self._fetch_offset = max(self._fetch_offset, offset + len(alerts))
+
+        def on_error(exc: BaseException) -> None:
+            if query_generation != self._query_generation:
+                return
+            self._fetching = False
+
+            if not isinstance(exc, (RequestException, bf_errors.BaseAPIError)):
+                raise exc
+
+            # The view will ask again when it's scrolled
+            logging.warning(f"While fetching older alerts: {exc}")
+
+        QTAsyncWorker(self, api.get_alerts,
+                      f_kwargs={**query,
+                                "limit": self.page_size,
+                                "offset": offset},
+                      on_success=on_success,
+                      on_error=on_error) \
+            .start()
+
+    def set_query(self, **filters) -> None:
+        """Clear the model and fetch alerts matching the filters from now on.
+        The filters are keyword arguments to api.get_alerts, e.g. alarm_id"""
+        self.clear()
+
+        self._query = filters
+        self._more_on_server = True
+
+    def clear(self) -> None:
+        """Remove every alert and stop fetching alerts from the server"""
+        self.beginResetModel()
+
+        self._alerts.clear()
+        self._sort_keys.clear()
+
+        self._query = None
+        self._query_generation += 1
+        self._fetch_offset = 0
+        self._fetching = False
+        self._more_on_server = False
+
+        self.endResetModel()
+
+    def add_alerts(self, alerts: Iterable[Alert]) -> None:
+        """Add new alerts, and replace the ones that are already in the model
+        with the given, more recent state"""
+        new_alert_count = self._add_alerts(alerts)
+
+        # Alerts that weren't loaded yet are newer than the ones that were, as
+        # they just came in
+        self._fetch_offset += new_alert_count
+
+    def remove_alerts(self, alert_ids: Iterable[int]) -> None:
+        for alert_id in alert_ids:
+            row = self.row_of(alert_id)
+            if row is None:
+                continue
+
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._alerts[row]
+            del self._sort_keys[row]
+            self.endRemoveRows()
+
+            self._fetch_offset = max(self._fetch_offset - 1, 0)
+
+    def alert_changed(self, alert_id: int) -> None:
+        """Notify views that an alert in the model was modified in place"""
+        row = self.row_of(alert_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def alert(self, row: int) -> Alert:
+        return self._alerts[row]
+
+    def row_of(self, alert_id: int) -> Optional[int]:
+        """The row of an alert, or None if it isn't in the model"""
+        row = bisect.bisect_left(self._sort_keys, -alert_id)
+        if row < len(self._sort_keys) and self._sort_keys[row] == -alert_id:
+            return row
+        return None
+
+    def contains_alert(self, alert_id: int) -> bool:
+        return self.row_of(alert_id) is not None
+
+    def _add_alerts(self, alerts: Iterable[Alert]) -> int:
+        """Insert or replace alerts, returning how many were new"""
+        new_alert_count = 0
+
+        for alert in alerts:
+            row = bisect.bisect_left(self._sort_keys, -alert.id)
+
+            if row < len(self._sort_keys) \
+                    and self._sort_keys[row] == -alert.id:
+                # __eq__ is overridden on Codecs
+                if self._alerts[row] != alert:
+                    self._alerts[row] = alert
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+                continue
+
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._alerts.insert(row, alert)
+            self._sort_keys.insert(row, -alert.id)
+            self.endInsertRows()
+
+            new_alert_count += 1
+
+        return new_alert_count
@@ -48,3 +48,10 @@ class RenderSettings(SettingsManager):
         default=False,
         type_=bool,
     )
+    show_frame_latency = Setting(
+        name="video_show_frame_latency",
+        default=False,
+        type_=bool,
+    )
+    """Show how long frames take to get from the decoder to the screen on the
+    expanded stream"""
@@ -2,4 +2,41 @@ from brainframe_qt.ui.resources.settings import Setting, SettingsManager
 
 
 class StreamingSettings(SettingsManager):
-    frame_buffer_size = Setting(name="frame_buffer_size", default=300, type_=int)
+    frame_buffer_size_mb = Setting(
+        name="frame_buffer_size_mb",
+        default=1024,
+        type_=int,
+    )
+    max_decoding_streams = Setting(
+        name="max_decoding_streams",
+        default=5,
+        type_=int,
+    )
+    max_decoding_megapixels = Setting(
+        name="max_decoding_megapixels",
+        default=0.0,
+        type_=float,
+    )
+    """Megapixels per second that may be decoded across all streams. 0 for no
+    limit"""
+    decode_worker_processes = Setting(
+        name="decode_worker_processes",
+        default=0,
+        type_=int,
+    )
+    """Number of worker processes to decode streams in, sharing frames with the
+    client through shared memory. 0 to decode streams in the client process"""
+    max_warm_paused_streams = Setting(
+        name="max_warm_paused_streams",
+        default=4,
+        type_=int,
+    )
+    """Number of paused streams that are kept connected, so that they resume
+    without reconnecting. 4 by default. The least recently paused are
+    disconnected first. 0 to disconnect streams whenever they're paused.
+
+    Warm paused streams are still received and decoded. When streams are
+    decoded in the client process, they count against max_decoding_streams and
+    max_decoding_megapixels, and only use what's left after the streams on
+    screen. With decode worker processes, they're decoded in the workers but
+    not sent to the client, on top of the decoding limits"""
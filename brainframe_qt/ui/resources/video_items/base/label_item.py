@@ -54,6 +54,31 @@ class LabelItem(VideoItem):
 
         return background_box_item
 
+    def set_text(self, text: str, *, max_width: Optional[int] = None) -> None:
+        """Change the text of the label without recreating its child items"""
+        if text == self._text and max_width == self.max_width:
+            return
+
+        self._text = text
+        self.max_width = max_width
+
+        self.text_item.setPlainText(self.formatted_text)
+        self.background_box_item.setRect(self.text_item.boundingRect())
+
+    def set_background_color(self, color: QColor) -> None:
+        if color == self.background_color:
+            return
+
+        self.background_color = color
+
+        brush = self.background_box_item.brush()
+        brush.setColor(color)
+        self.background_box_item.setBrush(brush)
+
+        pen = self.background_box_item.pen()
+        pen.setColor(color)
+        self.background_box_item.setPen(pen)
+
     @property
     def formatted_text(self) -> str:
         text = self._text
@@ -15,3 +15,10 @@ class VideoItem(QGraphicsItem, metaclass=ABCObject):
     def paint(self, _painter, _option, _widget):
         """No paint"""
         return
+
+    @staticmethod
+    def remove_child_item(item: QGraphicsItem) -> None:
+        """Detach a child item and remove it from the scene"""
+        item.setParentItem(None)
+        if item.scene() is not None:
+            item.scene().removeItem(item)
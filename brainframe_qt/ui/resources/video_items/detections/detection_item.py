@@ -23,6 +23,7 @@ class DetectionItem(VideoItem):
 
         self.detection = detection
         self.track = track
+        self.render_config = render_config
 
         self.detection_polygon = DetectionPolygonItem(
             detection, self.draw_color,
@@ -35,6 +36,25 @@ class DetectionItem(VideoItem):
         if render_config.show_detection_tracks:
             self.detection_track = DetectionTrackItem(track, parent=self)
 
+    def set_detection(self, detection: Detection, *,
+                      track: Optional[DetectionTrack]) -> None:
+        """Move the item to a newer detection of the same track, updating its
+        children in place"""
+        self.detection = detection
+        self.track = track
+
+        self.detection_polygon.set_detection(detection, self.draw_color)
+        self.detection_label.set_detection(detection, self.draw_color)
+
+        if self.render_config.show_detection_tracks:
+            if self.detection_track is None:
+                self.detection_track = DetectionTrackItem(track, parent=self)
+            else:
+                self.detection_track.track = track
+        elif self.detection_track is not None:
+            self.remove_child_item(self.detection_track)
+            self.detection_track = None
+
     @property
     def draw_color(self) -> QColor:
         seed = self.detection.class_name
@@ -1,5 +1,6 @@
 from typing import List, Optional, Tuple
 
+from PyQt5.QtCore import QPointF
 from PyQt5.QtGui import QColor
 from brainframe.api.bf_codecs import Detection
 
@@ -22,6 +23,13 @@ class DetectionLabelItem(LabelItem):
 
         # TODO: background opacity
 
+    def set_detection(self, detection: Detection, color: QColor) -> None:
+        self.detection = detection
+
+        self.set_background_color(color)
+        self.set_text(self.text, max_width=self._max_label_width)
+        self.setPos(QPointF(*self._detection_pos))
+
     @property
     def _detection_pos(self) -> Tuple[int, int]:
         # Naive. Maybe refine for non-rectangular detections in future?
@@ -19,6 +19,13 @@ class DetectionPolygonItem(PolygonItem):
         super().__init__(self.polygon_points,
                          border_color=color, parent=parent)
 
+    def set_detection(self, detection: Detection, color: QColor) -> None:
+        self.detection = detection
+
+        if color != self.border_color:
+            self.border_color = color
+        self.points = self.polygon_points
+
     @property
     def polygon_points(self) -> List[VideoItem.PointType]:
         if self.render_config.use_polygons:
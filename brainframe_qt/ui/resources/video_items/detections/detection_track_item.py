@@ -31,7 +31,17 @@ class DetectionTrackItem(QGraphicsPathItem):
 
     @track.setter
     def track(self, track: DetectionTrack):
+        previous_track = self._track
         self._track = track
+
+        # The path only depends on the track's history. Untracked detections
+        # have no track_id to tell them apart, so they're always redrawn
+        if previous_track is not None \
+                and track.track_id is not None \
+                and previous_track.track_id == track.track_id \
+                and previous_track.version == track.version:
+            return
+
         self.color = generate_unique_qcolor(str(track.track_id))
 
         line_coords: List[QPointF] = []
@@ -0,0 +1,153 @@
+import typing
+from threading import Lock
+from typing import Dict, Optional
+
+from PyQt5.QtCore import QObject, Qt, QTimer
+from PyQt5.QtWidgets import QApplication
+
+if typing.TYPE_CHECKING:
+    from .stream_event_manager import StreamEventManager
+
+
+class RenderClock(QObject):
+    """Application-wide clock that StreamEventManagers present frames on.
+
+    Rather than each stream polling for frames on its own timer, managers mark
+    themselves as pending when their stream has a new frame or state, and each
+    tick of the clock processes only the pending managers. Every stream that
+    has something new is updated in the same pass, so they're all painted
+    together.
+
+    The clock runs at a multiple of the fastest active stream's frame rate, so
+    frames aren't held back by ticking at a different phase than they arrive,
+    up to the refresh rate of the screen. Frame rates are only read from the
+    managers processed on a tick, and the interval is only recomputed when one
+    of them changes. It stops when no streams are subscribed.
+    """
+
+    DEFAULT_FRAME_RATE = 30
+    """Frame rate assumed for streams that haven't received frames yet"""
+
+    FRAME_RATE_HEADROOM = 2
+    """How many times faster than the fastest stream the clock ticks"""
+
+    MIN_FRAME_RATE = 5
+    """Slowest the clock ticks, so that state changes are still shown
+    promptly"""
+
+    _instance: Optional['RenderClock'] = None
+
+    def __init__(self, *, parent: QObject):
+        super().__init__(parent=parent)
+
+        self._managers: Dict['StreamEventManager', Optional[int]] = {}
+        """Managers subscribed to a stream, and the last frame rate read from
+        each, rounded. None if it's unknown"""
+        self._fastest: Optional['StreamEventManager'] = None
+        """Manager with the highest known frame rate"""
+
+        self._pending: Dict['StreamEventManager', None] = {}
+        """Managers with a new frame or state to process on the next tick.
+        Used as an ordered set"""
+        self._pending_lock = Lock()
+
+        self._timer = QTimer(parent=self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._tick)
+
+    @classmethod
+    def instance(cls) -> 'RenderClock':
+        """Get the application's RenderClock, creating it if necessary"""
+        if cls._instance is None:
+            cls._instance = cls(parent=QApplication.instance())
+
+        return cls._instance
+
+    def register(self, manager: 'StreamEventManager') -> None:
+        """Start ticking for a manager that has subscribed to a stream"""
+        if manager in self._managers:
+            return
+
+        self._managers[manager] = None
+
+        if not self._timer.isActive():
+            self._timer.start(self._interval())
+
+    def unregister(self, manager: 'StreamEventManager') -> None:
+        if manager not in self._managers:
+            return
+
+        frame_rate = self._managers.pop(manager)
+
+        with self._pending_lock:
+            self._pending.pop(manager, None)
+
+        if not self._managers:
+            self._fastest = None
+            self._timer.stop()
+        elif frame_rate is not None:
+            self._update_interval()
+
+    def request_render(self, manager: 'StreamEventManager') -> None:
+        """Process the manager's events on the next tick. Thread-safe"""
+        with self._pending_lock:
+            self._pending[manager] = None
+
+    def _tick(self) -> None:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+
+        for manager in pending:
+            if manager in self._managers:
+                manager.process_events()
+                self._read_frame_rate(manager)
+
+        # A stream that stops sending frames isn't pending anymore, so its
+        # frame rate would never be re-read. Only the fastest one matters
+        if self._fastest is not None:
+            self._read_frame_rate(self._fastest)
+
+    def _read_frame_rate(self, manager: 'StreamEventManager') -> None:
+        frame_rate = manager.frame_rate
+        if frame_rate is not None:
+            # Rounded, so that the moving average jittering doesn't cause a
+            # recompute on every frame
+            frame_rate = round(frame_rate)
+
+        if frame_rate == self._managers[manager]:
+            return
+
+        self._managers[manager] = frame_rate
+        self._update_interval()
+
+    def _update_interval(self) -> None:
+        """Find the fastest stream again after a frame rate changed"""
+        frame_rates = {manager: frame_rate
+                       for manager, frame_rate in self._managers.items()
+                       if frame_rate is not None}
+        self._fastest = max(frame_rates, key=frame_rates.get, default=None)
+
+        interval = self._interval()
+        if self._timer.isActive() and interval != self._timer.interval():
+            self._timer.setInterval(interval)
+
+    def _interval(self) -> int:
+        """Timer interval in milliseconds for the fastest active stream"""
+        if self._fastest is not None:
+            frame_rate = (self._managers[self._fastest]
+                          * self.FRAME_RATE_HEADROOM)
+        else:
+            frame_rate = self.DEFAULT_FRAME_RATE
+
+        frame_rate = min(frame_rate, self._screen_refresh_rate())
+        frame_rate = max(frame_rate, self.MIN_FRAME_RATE)
+
+        return int(1000 / frame_rate)
+
+    @staticmethod
+    def _screen_refresh_rate() -> float:
+        screen = QApplication.primaryScreen()
+        if screen is None or screen.refreshRate() <= 0:
+            return 60
+
+        return screen.refreshRate()
@@ -1,8 +1,10 @@
 import logging
+import time
+from functools import partial
 from threading import Event
 from typing import Optional
 
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from PyQt5.QtCore import QObject, QSize, pyqtSignal
 
 from brainframe.api.bf_codecs import StreamConfiguration
 from brainframe.api.bf_errors import StreamConfigNotFoundError, StreamNotOpenedError
@@ -13,6 +15,8 @@ from brainframe_qt.api_utils.streaming.synced_reader import SyncedStatus
 from brainframe_qt.api_utils.streaming.zone_status_frame import ZoneStatusFrame
 from brainframe_qt.ui.resources import QTAsyncWorker
 
+from .render_clock import RenderClock
+
 
 class StreamEventManager(QObject):
 
@@ -26,8 +30,12 @@ class StreamEventManager(QObject):
 
     frame_received = pyqtSignal(ZoneStatusFrame)
 
-    VIDEO_FRAME_RATE = 30
-    """Frame rate of polling loop in FPS"""
+    FRAME_RATE_SMOOTHING = 0.1
+    """Weight of the newest frame interval in the frame rate's moving average"""
+
+    FRAME_RATE_TIMEOUT = 1.0
+    """Seconds without a frame after which the stream's frame rate is
+    considered unknown"""
 
     def __init__(self, *, parent: QObject):
         """Manages events from the stream's SyncedStreamReader"""
@@ -39,20 +47,32 @@ class StreamEventManager(QObject):
         self.stream_conf: Optional[StreamConfiguration] = None
         self.stream_reader: Optional[SyncedStreamReader] = None
 
-        self._event_timer = self._init_event_timer()
+        self._output_size: Optional[QSize] = None
+        """Largest size the stream is displayed at. None for full resolution"""
+        self._visible = True
+        """Whether the stream is on screen"""
+        self._pinned = False
+        """Whether the stream should be decoded regardless of the decode budget"""
 
-        self._init_signals()
+        self.frames_presented = 0
+        """Number of frames emitted for display"""
+        self.frames_skipped = 0
+        """Number of frames that were replaced by a newer one before the render
+        clock got to them"""
+        self._frames_pending = 0
+        """Frames received since the last one was presented"""
 
-    def _init_event_timer(self) -> QTimer:
-        timer = QTimer(parent=self)
+        self._frame_interval: Optional[float] = None
+        """Moving average of the time between received frames, in seconds"""
+        self._last_frame_time: Optional[float] = None
 
-        timer.setInterval(1000 // self.VIDEO_FRAME_RATE)
-        timer.start()
+        self._render_clock = RenderClock.instance()
 
-        return timer
+        self._init_signals()
 
     def _init_signals(self) -> None:
-        self._event_timer.timeout.connect(self._process_events)
+        # Don't leave the render clock calling into a deleted manager
+        self.destroyed.connect(partial(self._render_clock.unregister, self))
 
     @property
     def is_streaming_paused(self) -> bool:
@@ -63,9 +83,66 @@ class StreamEventManager(QObject):
 
         return self.stream_reader.is_streaming_paused
 
+    @property
+    def frame_rate(self) -> Optional[float]:
+        """Rate frames are being received at, or None if it's unknown or frames
+        have stopped coming"""
+        if self._frame_interval is None or self._last_frame_time is None:
+            return None
+
+        if time.monotonic() - self._last_frame_time > self.FRAME_RATE_TIMEOUT:
+            return None
+
+        return 1 / self._frame_interval
+
+    def set_output_size(self, output_size: Optional[QSize]) -> None:
+        """Let the StreamManager know the largest size frames will be displayed at,
+        so it can avoid decoding more pixels than will be shown.
+
+        :param output_size: The display size in device pixels. None for full
+            resolution
+        """
+        if output_size == self._output_size:
+            return
+
+        self._output_size = output_size
+
+        if self.stream_reader is not None:
+            get_stream_manager().set_output_size(
+                self.stream_reader.stream_conf.id, self, output_size
+            )
+
+    def set_visible(self, visible: bool) -> None:
+        """Let the StreamManager know whether the stream is on screen. Streams that
+        aren't on screen anywhere are paused"""
+        if visible is self._visible:
+            return
+
+        self._visible = visible
+
+        if self.stream_reader is not None:
+            get_stream_manager().set_visible(
+                self.stream_reader.stream_conf.id, self, visible
+            )
+
+    def set_pinned(self, pinned: bool) -> None:
+        """Have the StreamManager decode the stream regardless of its decode
+        budget, e.g. when it's the expanded stream"""
+        if pinned is self._pinned:
+            return
+
+        self._pinned = pinned
+
+        if self.stream_reader is not None:
+            get_stream_manager().set_pinned(
+                self.stream_reader.stream_conf.id, self, pinned
+            )
+
     def change_stream(self, stream_conf: StreamConfiguration) -> None:
-        if self.stream_reader is None:
-            self.stop_streaming()
+        # Release the previous stream, or it would stay subscribed (and pinned,
+        # and at its output size) for as long as this manager exists
+        if self.stream_reader is not None:
+            self._unsubscribe_from_stream()
 
         self.stream_conf = stream_conf
         self.start_streaming()
@@ -132,12 +209,40 @@ class StreamEventManager(QObject):
 
         self.stream_conf = None
 
+    def process_events(self) -> None:
+        """Called by the render clock when there's a new frame or state"""
+        if self._frame_event.is_set():
+            self._on_frame()
+        if self._status_event.is_set():
+            self._on_state_change()
+
     def _handle_frame_signal(self) -> None:
         """Connected to the SyncedStreamReader"""
+        self._measure_frame_rate()
+        self._frames_pending += 1
+
         self._frame_event.set()
+        self._render_clock.request_render(self)
 
     def _handle_status_signal(self) -> None:
         self._status_event.set()
+        self._render_clock.request_render(self)
+
+    def _measure_frame_rate(self) -> None:
+        now = time.monotonic()
+        last_frame_time, self._last_frame_time = self._last_frame_time, now
+
+        if last_frame_time is None or now <= last_frame_time:
+            return
+
+        frame_interval = now - last_frame_time
+        if self._frame_interval is not None:
+            frame_interval = (
+                self.FRAME_RATE_SMOOTHING * frame_interval
+                + (1 - self.FRAME_RATE_SMOOTHING) * self._frame_interval
+            )
+
+        self._frame_interval = frame_interval
 
     def _on_frame(self):
         self._frame_event.clear()
@@ -150,6 +255,13 @@ class StreamEventManager(QObject):
         if frame is None:
             return
 
+        # Only the latest frame is shown. Any others received since the last
+        # one was presented were skipped
+        self.frames_presented += 1
+        self.frames_skipped += max(self._frames_pending - 1, 0)
+        self._frames_pending = 0
+
+        frame.frame_metadata.dequeued_time = time.monotonic()
         self.frame_received.emit(frame)
 
     def _on_state_change(self) -> None:
@@ -171,17 +283,14 @@ class StreamEventManager(QObject):
         elif state is SyncedStatus.FINISHED:
             self.stream_finished.emit()
         elif state is SyncedStatus.STREAMING:
-            # Streaming, but no frame received yet
-            self.stream_initializing.emit()
+            # Streaming, but no frame received yet. Streams that were resumed
+            # without reconnecting already have one, and their next frame is
+            # on its way
+            if self.stream_reader.latest_processed_frame is None:
+                self.stream_initializing.emit()
         else:
             self.stream_error.emit()
 
-    def _process_events(self) -> None:
-        if self._frame_event.is_set():
-            self._on_frame()
-        if self._status_event.is_set():
-            self._on_state_change()
-
     def _unsubscribe_from_stream(self) -> None:
         """Remove the StreamEventManager's reference to the SyncedStreamReader after
         disconnecting the connected signals/slots.
@@ -200,8 +309,17 @@ class StreamEventManager(QObject):
         self.stream_reader.frame_received.disconnect(self._handle_frame_signal)
         self.stream_reader.stream_state_changed.disconnect(self._handle_status_signal)
 
+        get_stream_manager().release_subscriber(
+            self.stream_reader.stream_conf.id, self
+        )
+
+        self._render_clock.unregister(self)
+
         self._frame_event.clear()
         self._status_event.clear()
+        self._frames_pending = 0
+        self._frame_interval = None
+        self._last_frame_time = None
 
         self.stream_reader = None
 
@@ -213,7 +331,10 @@ class StreamEventManager(QObject):
 
         # Create the stream reader
         stream_manager = get_stream_manager()
-        stream_reader = stream_manager.start_streaming(stream_conf, stream_url)
+        stream_reader = stream_manager.start_streaming(
+            stream_conf, stream_url, self._output_size,
+            subscriber=self, visible=self._visible, pinned=self._pinned
+        )
 
         if stream_reader is None:
             # This will happen if we try to get a StreamReader for a stream that no
@@ -227,6 +348,8 @@ class StreamEventManager(QObject):
 
         self.stream_reader = stream_reader
 
+        self._render_clock.register(self)
+
         # Don't wait for the first event to start displaying
         latest_frame = self.stream_reader.latest_processed_frame
         if latest_frame is not None:
@@ -1,11 +1,13 @@
-from typing import List, overload
+from typing import Dict, Hashable, List, Optional, overload
 
 import numpy as np
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QPixmap, QTransform
 from PyQt5.QtWidgets import QGraphicsScene, QWidget
 from brainframe.api import bf_codecs
 
-from brainframe_qt.api_utils.detection_tracks import DetectionTrack
+from brainframe_qt.api_utils.detection_tracks import DetectionTrack, \
+    interpolate_tracks
 from brainframe_qt.ui.resources.config import RenderSettings
 from brainframe_qt.ui.resources.video_items.detections import DetectionItem
 from brainframe_qt.ui.resources.video_items.zone_statuses import \
@@ -13,6 +15,13 @@ from brainframe_qt.ui.resources.video_items.zone_statuses import \
 
 
 class StreamGraphicsScene(QGraphicsScene):
+    """Scene that renders a stream's frames along with its zones and detections.
+
+    Zone and detection items persist between frames. They're kept in pools keyed
+    by zone ID and track ID and updated in place, so items are only created for
+    new zones and tracks, and only removed once those disappear.
+    """
+
     def __init__(self, *, render_config: RenderSettings, parent: QWidget):
 
         super().__init__(parent)
@@ -21,24 +30,36 @@ class StreamGraphicsScene(QGraphicsScene):
 
         self.current_frame = None
 
+        self._zone_status_items: Dict[int, ZoneStatusItem] = {}
+        """Items for the currently drawn zones, by zone ID"""
+        self._detection_items: Dict[Hashable, DetectionItem] = {}
+        """Items for the currently drawn detections, by track ID. Detections
+        without a track ID are keyed by their index in the frame"""
+
     @overload
-    def set_frame(self, pixmap: QPixmap) -> None:
+    def set_frame(self, pixmap: QPixmap,
+                  source_size: Optional[QSize] = None) -> None:
         ...
 
     @overload
     def set_frame(self, path: str) -> None:
         ...
 
-    def set_frame(self, *, pixmap=None, path=None) -> None:
+    def set_frame(self, *, pixmap=None, path=None, source_size=None) -> None:
+        """Set the current frame to the given pixmap.
+
+        If the pixmap was downscaled from a frame of source_size, it is scaled
+        back up in the scene so zones and detections still line up with it.
+        """
 
         if path is not None:
             pixmap = QPixmap(str(path))
 
-        """Set the current frame to the given pixmap"""
         # Create new QGraphicsPixmapItem if there isn't one
         if not self.current_frame:
             current_frame_size = None
             self.current_frame = self.addPixmap(pixmap)
+            self._set_frame_transform(pixmap, source_size)
 
             # Fixes BF-319: Clicking a stream, closing it, and reopening it
             # again resulted in a stream that wasn't displayed properly. This
@@ -54,42 +75,94 @@ class StreamGraphicsScene(QGraphicsScene):
 
         # Otherwise modify the existing one
         else:
-            current_frame_size = self.current_frame.pixmap().size()
+            current_frame_size = self.current_frame.sceneBoundingRect().size()
             self.current_frame.setPixmap(pixmap)
+            self._set_frame_transform(pixmap, source_size)
 
-        # Resize if the new pixmap has a different size than before
-        if current_frame_size != self.current_frame.pixmap().size():
+        # Resize if the new frame takes up a different size than before
+        if current_frame_size != self.current_frame.sceneBoundingRect().size():
             for view in self.views():
                 # There should only ever be one, but we'll iterate to be sure
                 # noinspection PyArgumentList
                 view.resizeEvent()
                 view.updateGeometry()
 
-    def draw_lines(self, zone_statuses):
-        # Draw all of the zones (except the default zone)
-        for zone_status in zone_statuses.values():
-            if zone_status.zone.name != bf_codecs.Zone.FULL_FRAME_ZONE_NAME:
-                if len(zone_status.zone.coords) == 2:
-                    self._new_zone_status_polygon(zone_status)
+    def _set_frame_transform(self, pixmap: QPixmap,
+                             source_size: Optional[QSize]) -> None:
+        transform = QTransform()
+        if source_size is not None and not pixmap.isNull():
+            transform.scale(source_size.width() / pixmap.width(),
+                            source_size.height() / pixmap.height())
+
+        self.current_frame.setTransform(transform)
+
+    def draw_zone_statuses(
+            self,
+            zone_statuses: Dict[str, bf_codecs.ZoneStatus],
+            *,
+            lines: bool,
+            regions: bool,
+    ) -> None:
+        """Draw the given zones, reusing the items of zones that were already
+        drawn and removing those of zones that are no longer drawn"""
+        zone_status_items: Dict[int, ZoneStatusItem] = {}
 
-    def draw_regions(self, zone_statuses):
-        # Draw all of the zones (except the default zone)
         for zone_status in zone_statuses.values():
-            if zone_status.zone.name != bf_codecs.Zone.FULL_FRAME_ZONE_NAME:
-                if len(zone_status.zone.coords) > 2:
-                    self._new_zone_status_polygon(zone_status)
+            # Draw all of the zones (except the default zone)
+            if zone_status.zone.name == bf_codecs.Zone.FULL_FRAME_ZONE_NAME:
+                continue
+
+            is_line = len(zone_status.zone.coords) == 2
+            if not (lines if is_line else regions):
+                continue
+
+            zone_id = zone_status.zone.id
+            zone_status_item = self._zone_status_items.pop(zone_id, None)
+            if zone_status_item is None:
+                zone_status_item = self._new_zone_status_polygon(zone_status)
+            else:
+                zone_status_item.set_zone_status(zone_status)
+
+            zone_status_items[zone_id] = zone_status_item
+
+        self.remove_items(self._zone_status_items.values())
+        self._zone_status_items = zone_status_items
 
     def draw_detections(self, frame_tstamp: float,
                         tracks: List[DetectionTrack]):
+        """Draw the given tracks, reusing the items of tracks that were already
+        drawn and removing those of tracks that have ended"""
+        detection_items: Dict[Hashable, DetectionItem] = {}
 
-        for track in tracks:
-            detection = track.get_interpolated_detection(frame_tstamp)
-            detection_item = DetectionItem(
-                detection,
-                track=track,
-                render_config=self.render_config
-            )
-            self.addItem(detection_item)
+        detections = interpolate_tracks(tracks, frame_tstamp)
+
+        for index, (track, detection) in enumerate(zip(tracks, detections)):
+            track_id = track.track_id
+            key = index if track_id is None else track_id
+
+            detection_item = self._detection_items.pop(key, None)
+            if detection_item is None:
+                detection_item = DetectionItem(
+                    detection,
+                    track=track,
+                    render_config=self.render_config
+                )
+                self.addItem(detection_item)
+            else:
+                detection_item.set_detection(detection, track=track)
+
+            detection_items[key] = detection_item
+
+        self.remove_items(self._detection_items.values())
+        self._detection_items = detection_items
+
+    def remove_zone_statuses(self) -> None:
+        self.remove_items(self._zone_status_items.values())
+        self._zone_status_items.clear()
+
+    def remove_detections(self) -> None:
+        self.remove_items(self._detection_items.values())
+        self._detection_items.clear()
 
     def remove_items(self, items, condition=any):
         for item in items:
@@ -103,7 +176,10 @@ class StreamGraphicsScene(QGraphicsScene):
 
         self.remove_items(self.items(), condition)
 
-    def _new_zone_status_polygon(self, zone_status):
+        self._zone_status_items.clear()
+        self._detection_items.clear()
+
+    def _new_zone_status_polygon(self, zone_status) -> ZoneStatusItem:
         zone_status_item = ZoneStatusItem(
             zone_status,
             render_config=self.render_config
@@ -111,6 +187,8 @@ class StreamGraphicsScene(QGraphicsScene):
 
         self.addItem(zone_status_item)
 
+        return zone_status_item
+
     @property
     def _item_text_size(self):
         return int(self.height() / 50)
@@ -1,12 +1,17 @@
+import dataclasses
+import time
 from typing import Optional
 
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QResizeEvent, QPixmap
+from PyQt5.QtGui import QPaintEvent, QPixmap, QResizeEvent
 from PyQt5.QtWidgets import QWidget
 
 from brainframe.api.bf_codecs import StreamConfiguration
 
-from brainframe_qt.api_utils.streaming.zone_status_frame import ZoneStatusFrame
+from brainframe_qt.api_utils.streaming.latency_tracker import \
+    FrameLatencyTracker
+from brainframe_qt.api_utils.streaming.zone_status_frame import \
+    ZoneStatusFrame, ZoneStatusFrameMeta
 
 from .stream_event_manager import StreamEventManager
 from .stream_widget_ui import StreamWidgetUI
@@ -14,7 +19,7 @@ from .stream_widget_ui import StreamWidgetUI
 
 class StreamWidget(StreamWidgetUI):
     """Base widget that uses Stream object to get frames.
-    Makes use of a QTimer to get frames
+    Frames are presented on the application's RenderClock
     """
 
     def __init__(self, *, parent: QWidget):
@@ -22,6 +27,12 @@ class StreamWidget(StreamWidgetUI):
 
         self.stream_event_manager = StreamEventManager(parent=self)
 
+        self.latency_tracker = FrameLatencyTracker()
+        """Time taken by this widget's frames to get from the decoder to the
+        screen"""
+        self._unpainted_frame_metadata: Optional[ZoneStatusFrameMeta] = None
+        """Metadata of the frame shown by on_frame, until it has been painted"""
+
         self._draw_lines: Optional[bool] = None
         self._draw_regions: Optional[bool] = None
         self._draw_detections: Optional[bool] = None
@@ -43,10 +54,35 @@ class StreamWidget(StreamWidgetUI):
         current_frame = self.scene().current_frame
 
         if current_frame is not None:
+            # Use the scene rect of the frame, as downscaled frames are scaled
+            # back up to their source resolution
+            frame_rect = current_frame.sceneBoundingRect()
+
             # EXTREMELY IMPORTANT LINE!
             # The sceneRect grows but never shrinks automatically
-            self.scene().setSceneRect(current_frame.boundingRect())
-            self.fitInView(current_frame.boundingRect(), Qt.KeepAspectRatio)
+            self.scene().setSceneRect(frame_rect)
+            self.fitInView(frame_rect, Qt.KeepAspectRatio)
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        super().paintEvent(event)
+
+        if self._unpainted_frame_metadata is not None:
+            frame_metadata = self._unpainted_frame_metadata
+            self._unpainted_frame_metadata = None
+
+            frame_metadata.painted_time = time.monotonic()
+            self.latency_tracker.add_frame(frame_metadata)
+
+    @property
+    def frames_presented(self) -> int:
+        """Number of frames this widget has displayed"""
+        return self.stream_event_manager.frames_presented
+
+    @property
+    def frames_skipped(self) -> int:
+        """Number of frames that were replaced by a newer one before this widget
+        could display them"""
+        return self.stream_event_manager.frames_skipped
 
     @property
     def draw_lines(self) -> bool:
@@ -84,6 +120,9 @@ class StreamWidget(StreamWidgetUI):
     def change_stream(self, stream_conf: StreamConfiguration) -> None:
         self.stream_event_manager.change_stream(stream_conf)
 
+        self.latency_tracker.clear()
+        self._unpainted_frame_metadata = None
+
     def pause_streaming(self) -> None:
         self.stream_event_manager.pause_streaming()
 
@@ -94,11 +133,13 @@ class StreamWidget(StreamWidgetUI):
         self.scene().set_frame(path=":/images/streaming_stopped_png")
 
     def on_frame(self, frame: ZoneStatusFrame) -> None:
-        self.scene().remove_all_items()
-        
-        # Convert QImage to QPixmap on the Main Thread
-        pixmap = QPixmap.fromImage(frame.frame)
-        self.scene().set_frame(pixmap=pixmap)
+        # The same frame can be shown by several widgets at once, so each times
+        # its own copy of the metadata
+        self._unpainted_frame_metadata = dataclasses.replace(
+            frame.frame_metadata)
+
+        self.scene().set_frame(pixmap=self._frame_to_pixmap(frame),
+                               source_size=frame.source_size)
 
         # This frame has never been paired with ZoneStatuses from the server
         # so nothing should be rendered. This occurs when the server has
@@ -106,19 +147,39 @@ class StreamWidget(StreamWidgetUI):
         # server was unable to connect to the stream, or inference crashed
         # immediately on the first frame of processing
         if frame.zone_statuses is None:
+            self.scene().remove_all_items()
             return
 
-        if self.draw_lines:
-            self.scene().draw_lines(frame.zone_statuses)
-
-        if self.draw_regions:
-            self.scene().draw_regions(frame.zone_statuses)
+        # Items from the previous frame are updated in place rather than
+        # recreated
+        self.scene().draw_zone_statuses(
+            frame.zone_statuses,
+            lines=self.draw_lines,
+            regions=self.draw_regions
+        )
 
         if self.draw_detections:
             self.scene().draw_detections(
                 frame_tstamp=frame.tstamp,
                 tracks=frame.tracks
             )
+        else:
+            self.scene().remove_detections()
+
+    @staticmethod
+    def _frame_to_pixmap(frame: ZoneStatusFrame) -> QPixmap:
+        """Convert the frame's QImage to a QPixmap on the Main Thread.
+
+        Full resolution frames are only wrapped in a QImage here, once they're
+        actually displayed (downscaled frames already are). This is normally
+        the only copy of the pixel data between the decoder and the screen,
+        and is added to the frame's copy counter.
+        """
+        image = frame.materialize()
+        pixmap = QPixmap.fromImage(image)
+        frame.frame_metadata.bytes_copied += image.sizeInBytes()
+
+        return pixmap
 
     def on_stream_init(self) -> None:
         self.scene().remove_all_items()
@@ -29,6 +29,25 @@ class ZoneStatusItem(VideoItem):
             self.zone_item = self._init_region_polygon_item()
         self.zone_status_label_item = self._init_zone_status_label_item()
 
+    def set_zone_status(self, zone_status: ZoneStatus) -> None:
+        """Update the item in place for a new status of the same zone. The zone's
+        shape is only rebuilt if its coordinates have changed"""
+        old_coords = self.zone_item.zone_coords
+        self.zone_status = zone_status
+        new_coords = tuple(map(tuple, zone_status.zone.coords))
+
+        if new_coords != old_coords:
+            self.remove_child_item(self.zone_item)
+            if len(self.zone_status.zone.coords) == 2:
+                self.zone_item = self._init_line_line_item()
+            else:
+                self.zone_item = self._init_region_polygon_item()
+            self.zone_item.stackBefore(self.zone_status_label_item)
+        else:
+            self.zone_item.set_zone_status(zone_status)
+
+        self.zone_status_label_item.set_zone_status(zone_status)
+
     def _init_region_polygon_item(self) -> ZoneRegionItem:
         region_polygon_item = ZoneStatusRegionItem(
             self.zone_status,
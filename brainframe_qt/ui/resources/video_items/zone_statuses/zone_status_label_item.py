@@ -1,6 +1,7 @@
 from typing import Optional
 
 import math
+from PyQt5.QtCore import QPointF
 from PyQt5.QtGui import QColor
 from PyQt5.QtWidgets import QApplication
 from brainframe.api.bf_codecs import ZoneStatus
@@ -24,6 +25,13 @@ class ZoneStatusLabelItem(AbstractZoneStatusItem, LabelItem):
 
         self.render_config = render_config
 
+    def set_zone_status(self, zone_status: ZoneStatus) -> None:
+        self.zone_status = zone_status
+
+        self.set_background_color(self._background_color)
+        self.set_text(self.text)
+        self.setPos(QPointF(*self._zone_pos))
+
     @property
     def text(self) -> str:
 
@@ -23,3 +23,13 @@ class ZoneStatusRegionItem(AbstractZoneStatusItem, ZoneRegionItem):
         super()._init_style()
         if not self.should_highlight:
             self.setOpacity(0.3)
+
+    def set_zone_status(self, zone_status: ZoneStatus) -> None:
+        """Update the style of the item for a new status of the same zone"""
+        self.zone_status = zone_status
+        self.zone = zone_status.zone
+
+        if self.line_color != self.border_color:
+            self.color = self.line_color
+            self.border_color = self.line_color
+        self.setOpacity(1.0 if self.should_highlight else 0.3)
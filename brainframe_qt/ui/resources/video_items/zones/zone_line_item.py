@@ -43,6 +43,14 @@ class ZoneLineItem(AbstractZoneItem, VideoItem):
 
         return line_direction_item
 
+    def set_color(self, color: QColor) -> None:
+        if color == self.color:
+            return
+
+        self.color = color
+        self.line_item.color = color
+        self.line_direction_item.set_color(color)
+
     @property
     def line_centerpoint(self) -> VideoItem.PointType:
         # noinspection PyTupleAssignmentBalance
@@ -1,4 +1,5 @@
 import logging
+import multiprocessing
 import os
 
 
@@ -9,6 +10,10 @@ def set_up_environment():
     2) Tell multiprocessing that it might be running in an executable
     """
 
+    # Streams may be decoded in worker processes, which need to be launched
+    # from PyInstaller executables correctly
+    multiprocessing.freeze_support()
+
     # Set the log level
     default_log_level = "INFO"
 
@@ -0,0 +1,156 @@
+"""Benchmark for interpolating DetectionTracks.
+
+Every track gets a history of detections, then is interpolated at a timestamp
+between two of them, once per frame. The deque-backed DetectionTrack that the
+client used to have is compared against the array-backed one, both one track at
+a time and with interpolate_tracks.
+
+Must be run from the root of the project:
+
+    python -m scripts.benchmarks.bench_detection_tracks
+"""
+import argparse
+import time
+from collections import deque
+from typing import Callable, List
+from uuid import uuid4
+
+import numpy as np
+
+from brainframe.api.bf_codecs import Detection
+
+# Like brainframe_client.py, the ui package must be imported before api_utils
+# to avoid a circular import
+# noinspection PyUnresolvedReferences
+import brainframe_qt.ui  # noqa: E402,F401
+from brainframe_qt.api_utils.detection_tracks import DetectionTrack, \
+    interpolate_tracks
+
+TRACK_COUNTS = [10, 100, 1000]
+DETECTION_SIZE = 100
+ANALYSIS_FPS = 10
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history", type=int, default=300,
+                        help="Number of detections in each track")
+    parser.add_argument("--frames", type=int, default=100,
+                        help="Number of timestamps to interpolate at")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    rng = np.random.default_rng(0)
+    # Frames arrive between detections, mostly just behind the latest one
+    latest_tstamp = (args.history - 1) / ANALYSIS_FPS
+    frame_tstamps = latest_tstamp - rng.exponential(0.5, args.frames)
+
+    print(f"{'tracks':>7} {'deque ms':>9} {'array ms':>9} {'batch ms':>9} "
+          f"{'speedup':>8}")
+    for track_count in TRACK_COUNTS:
+        deque_tracks = _tracks(_DequeTrack, track_count, args.history)
+        array_tracks = _tracks(DetectionTrack, track_count, args.history)
+
+        deque_time = run(_interpolate_each, deque_tracks, frame_tstamps)
+        array_time = run(_interpolate_each, array_tracks, frame_tstamps)
+        batch_time = run(interpolate_tracks, array_tracks, frame_tstamps)
+
+        print(f"{track_count:>7} {deque_time * 1000:>9.3f} "
+              f"{array_time * 1000:>9.3f} {batch_time * 1000:>9.3f} "
+              f"{deque_time / batch_time:>7.1f}x")
+
+
+def run(interpolate: Callable, tracks: list,
+        frame_tstamps: np.ndarray) -> float:
+    """Average time to interpolate every track at a timestamp, in seconds"""
+    start = time.perf_counter()
+    for tstamp in frame_tstamps:
+        interpolate(tracks, float(tstamp))
+
+    return (time.perf_counter() - start) / len(frame_tstamps)
+
+
+def _interpolate_each(tracks: list, tstamp: float) -> List[Detection]:
+    return [track.get_interpolated_detection(tstamp) for track in tracks]
+
+
+def _tracks(track_type: type, track_count: int, history: int) -> list:
+    tracks = []
+    for index in range(track_count):
+        track_id = uuid4()
+        track = track_type()
+        for frame_num in range(history):
+            track.add_detection(_detection(track_id, index, frame_num),
+                                frame_num / ANALYSIS_FPS)
+        tracks.append(track)
+
+    return tracks
+
+
+def _detection(track_id, index: int, frame_num: int) -> Detection:
+    x = index * 10 + frame_num
+    y = index * 5 + frame_num // 2
+
+    return Detection(
+        class_name="person",
+        coords=[[x, y], [x + DETECTION_SIZE, y],
+                [x + DETECTION_SIZE, y + DETECTION_SIZE],
+                [x, y + DETECTION_SIZE]],
+        children=[],
+        attributes={},
+        with_identity=None,
+        extra_data={},
+        track_id=track_id,
+    )
+
+
+class _DequeTrack:
+    """Reference implementation: the deque-backed DetectionTrack, which walks
+    its history linearly to interpolate"""
+
+    def __init__(self, max_size=1000):
+        self._history = deque(maxlen=max_size)
+
+    def add_detection(self, detection, tstamp):
+        self._history.appendleft((detection, tstamp))
+
+    def get_interpolated_detection(self, interp_to_tstamp) -> Detection:
+        latest_det, latest_tstamp = self._history[0]
+        if abs(latest_tstamp - interp_to_tstamp) > 60:
+            return latest_det
+        if len(self._history) == 1 or interp_to_tstamp >= latest_tstamp:
+            return latest_det
+
+        recent_det, recent_tstamp = None, None
+        older_det, older_tstamp = None, None
+        for det, tstamp in self._history:
+            if tstamp > interp_to_tstamp:
+                recent_det, recent_tstamp = det, tstamp
+            else:
+                older_det, older_tstamp = det, tstamp
+                break
+
+        if older_det is None:
+            return recent_det
+
+        ratio = 1 - ((recent_tstamp - interp_to_tstamp)
+                     / (recent_tstamp - older_tstamp))
+        recent_coords = np.array(recent_det.coords)
+        older_coords = np.array(older_det.coords)
+        interp_coords = older_coords + (recent_coords - older_coords) * ratio
+
+        return Detection(
+            coords=interp_coords.astype(np.int32).tolist(),
+            class_name=recent_det.class_name,
+            children=recent_det.children,
+            attributes=recent_det.attributes,
+            with_identity=recent_det.with_identity,
+            extra_data=recent_det.extra_data,
+            track_id=recent_det.track_id)
+
+
+if __name__ == '__main__':
+    main()
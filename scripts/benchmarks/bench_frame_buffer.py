@@ -0,0 +1,96 @@
+"""Micro-benchmark for SyncedFrameBuffer add/pop throughput.
+
+Mimics the buffer traffic of FrameSyncer.sync: every frame is added, the shared
+buffer is checked for fullness and fair share, and the oldest frame is popped.
+The cost of one of these cycles should not depend on how many buffers (streams)
+are alive.
+
+Must be run from the root of the project:
+
+    python -m scripts.benchmarks.bench_frame_buffer
+"""
+import argparse
+import time
+from threading import Thread
+from typing import List
+
+from PyQt5.QtGui import QImage
+
+# Like brainframe_client.py, the ui package must be imported before api_utils
+# to avoid a circular import
+# noinspection PyUnresolvedReferences
+import brainframe_qt.ui  # noqa: E402,F401
+from brainframe_qt.api_utils.streaming.frame_buffer import BYTES_PER_MB, \
+    SyncedFrameBuffer
+from brainframe_qt.api_utils.streaming.zone_status_frame import ZoneStatusFrame
+
+BUFFER_COUNTS = [1, 8, 32, 64]
+PREFILLED_FRAMES = 30
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=200_000,
+                        help="Total add/pop cycles to run per buffer count")
+    parser.add_argument("--threads", action="store_true",
+                        help="Drive each buffer from its own thread, like "
+                             "SyncedStreamReader does")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    print(f"{'buffers':>8} {'cycles/s':>12} {'us/cycle':>10}")
+    for buffer_count in BUFFER_COUNTS:
+        elapsed = run(buffer_count, args.cycles, args.threads)
+        print(f"{buffer_count:>8} "
+              f"{args.cycles / elapsed:>12,.0f} "
+              f"{elapsed / args.cycles * 1e6:>10.2f}")
+
+
+def run(buffer_count: int, cycles: int, threaded: bool) -> float:
+    buffers = [SyncedFrameBuffer() for _ in range(buffer_count)]
+    frame = _thumbnail_frame()
+
+    # Small enough that the shared buffer is always full, so fair share is
+    # checked on every cycle
+    SyncedFrameBuffer.set_max_buffer_bytes(BYTES_PER_MB)
+
+    # Start each buffer off with some frames, as it would be for a running
+    # stream
+    for buffer in buffers:
+        for tstamp in range(PREFILLED_FRAMES):
+            buffer.add_frame(ZoneStatusFrame(frame=frame, tstamp=tstamp))
+
+    cycles_per_buffer = max(cycles // buffer_count, 1)
+
+    start = time.perf_counter()
+    if threaded:
+        threads = [Thread(target=_cycle, args=([buffer], cycles_per_buffer))
+                   for buffer in buffers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    else:
+        _cycle(buffers, cycles_per_buffer)
+
+    return time.perf_counter() - start
+
+
+def _cycle(buffers: List[SyncedFrameBuffer], cycles_per_buffer: int) -> None:
+    frame = _thumbnail_frame()
+    for tstamp in range(cycles_per_buffer):
+        for buffer in buffers:
+            buffer.add_frame(ZoneStatusFrame(frame=frame, tstamp=tstamp))
+            if buffer.is_full and buffer.exceeds_fair_share:
+                buffer.pop_oldest()
+
+
+def _thumbnail_frame() -> QImage:
+    return QImage(640, 360, QImage.Format_BGR888)
+
+
+if __name__ == '__main__':
+    main()
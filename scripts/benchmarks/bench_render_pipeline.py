@@ -0,0 +1,265 @@
+"""Benchmark for the client's render pipeline, without a server or cameras.
+
+Synthetic BGR frames are wrapped in ZoneStatusFrames, synced with synthetic
+ZoneStatuses from a fake StatusReceiver by a FrameSyncer, and drawn by a
+StreamWidget per stream, all on an offscreen display. This is the same path a
+frame takes from SyncedStreamReader._handle_frame_event to the screen, minus
+decoding.
+
+Reports delivered frames per second, per-frame latency (sync and on_frame) and
+per-tick latency (every stream, plus painting), the peak RSS of the process, and
+how many frames were converted to QImages.
+
+Must be run from the root of the project:
+
+    python -m scripts.benchmarks.bench_render_pipeline --streams 4
+"""
+import argparse
+import math
+import os
+import resource
+import sys
+import time
+from typing import Dict, List
+from uuid import UUID
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication, QGridLayout, QWidget
+
+from brainframe.api.bf_codecs import Detection, Zone, ZoneStatus
+
+# Like brainframe_client.py, the ui package must be imported before api_utils
+# to avoid a circular import
+# noinspection PyUnresolvedReferences
+import brainframe_qt.ui  # noqa: E402,F401
+from brainframe_qt.api_utils.streaming.frame_syncer import FrameSyncer
+from brainframe_qt.api_utils.streaming.zone_status_frame import ZoneStatusFrame
+from brainframe_qt.ui.resources.video_items.streams import StreamWidget
+
+FRAME_POOL_SIZE = 8
+"""Number of distinct frames generated per stream. Frames are reused in turn"""
+
+DETECTION_SIZE = 0.1
+"""Size of each detection, as a fraction of the frame's width"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=4,
+                        help="Number of streams to render")
+    parser.add_argument("--width", type=int, default=1920,
+                        help="Width of the synthetic frames")
+    parser.add_argument("--height", type=int, default=1080,
+                        help="Height of the synthetic frames")
+    parser.add_argument("--detections", type=int, default=10,
+                        help="Detections per frame, per stream")
+    parser.add_argument("--track-length", type=int, default=90,
+                        help="Number of frames each track lasts before it's "
+                             "replaced by a new one")
+    parser.add_argument("--analysis-interval", type=int, default=1,
+                        help="Publish new ZoneStatuses every N frames, to "
+                             "simulate analysis slower than the video")
+    parser.add_argument("--frames", type=int, default=300,
+                        help="Number of frames to render per stream")
+    parser.add_argument("--fps", type=float, default=0,
+                        help="Frame rate of the synthetic streams. 0 to "
+                             "render as fast as possible")
+    return parser.parse_args()
+
+
+class SyntheticStatusReceiver:
+    """Stands in for the API's StatusReceiver. Generates ZoneStatuses with
+    moving, tracked detections for each stream"""
+
+    def __init__(self, stream_count: int, width: int, height: int,
+                 detections: int, track_length: int):
+        self.width = width
+        self.height = height
+        self.detections = detections
+        self.track_length = track_length
+
+        self._zones: Dict[int, List[Zone]] = {
+            stream_id: self._zones_for_stream(stream_id)
+            for stream_id in range(stream_count)
+        }
+        self._latest_statuses: Dict[int, Dict[str, ZoneStatus]] = {
+            stream_id: {} for stream_id in range(stream_count)
+        }
+
+    def latest_statuses(self, stream_id: int) -> Dict[str, ZoneStatus]:
+        return self._latest_statuses[stream_id]
+
+    def publish(self, frame_num: int, tstamp: float) -> None:
+        """Generate the ZoneStatuses of every stream for a frame"""
+        for stream_id, zones in self._zones.items():
+            detections = [self._detection(stream_id, index, frame_num)
+                          for index in range(self.detections)]
+
+            self._latest_statuses[stream_id] = {
+                zone.name: ZoneStatus(
+                    zone=zone,
+                    tstamp=tstamp,
+                    total_entered={},
+                    total_exited={},
+                    within=detections,
+                    entering=[],
+                    exiting=[],
+                    alerts=[],
+                )
+                for zone in zones
+            }
+
+    def _detection(self, stream_id: int, index: int,
+                   frame_num: int) -> Detection:
+        # Stagger tracks so they don't all end on the same frame
+        age = frame_num + index * self.track_length // max(self.detections, 1)
+        generation = age // self.track_length
+        track_id = UUID(int=(stream_id << 64) | (index << 32) | generation)
+
+        size = int(self.width * DETECTION_SIZE)
+        angle = 2 * math.pi * (age % self.track_length) / self.track_length
+        x = int((self.width - size) * (0.5 + 0.4 * math.cos(angle + index)))
+        y = int((self.height - size) * (0.5 + 0.4 * math.sin(angle + index)))
+
+        return Detection(
+            class_name="person",
+            coords=[[x, y], [x + size, y], [x + size, y + size],
+                    [x, y + size]],
+            children=[],
+            attributes={},
+            with_identity=None,
+            extra_data={},
+            track_id=track_id,
+        )
+
+    def _zones_for_stream(self, stream_id: int) -> List[Zone]:
+        width, height = self.width, self.height
+        full_frame = Zone(name=Zone.FULL_FRAME_ZONE_NAME, stream_id=stream_id,
+                          coords=[[0, 0], [width, 0], [width, height],
+                                  [0, height]],
+                          id=stream_id * 3)
+        region = Zone(name="Region", stream_id=stream_id,
+                      coords=[[width // 4, height // 4],
+                              [width // 2, height // 4],
+                              [width // 2, height // 2],
+                              [width // 4, height // 2]],
+                      id=stream_id * 3 + 1)
+        line = Zone(name="Line", stream_id=stream_id,
+                    coords=[[width // 2, height // 8],
+                            [width // 2, height * 7 // 8]],
+                    id=stream_id * 3 + 2)
+
+        return [full_frame, region, line]
+
+
+def main() -> None:
+    args = parse_args()
+
+    # Rendering is measured without a display
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication(sys.argv)
+
+    receiver = SyntheticStatusReceiver(args.streams, args.width, args.height,
+                                       args.detections, args.track_length)
+    frame_pools = [_frame_pool(args.width, args.height, seed=stream_id)
+                   for stream_id in range(args.streams)]
+    syncers = [FrameSyncer() for _ in range(args.streams)]
+
+    window, widgets = _stream_window(args.streams)
+    window.show()
+    app.processEvents()
+
+    frame_latencies: List[float] = []
+    tick_latencies: List[float] = []
+    frames_delivered = 0
+
+    start = time.perf_counter()
+    for frame_num in range(args.frames):
+        tick_start = time.perf_counter()
+
+        if args.fps:
+            tstamp = frame_num / args.fps
+        else:
+            tstamp = tick_start - start
+
+        if frame_num % args.analysis_interval == 0:
+            receiver.publish(frame_num, tstamp)
+
+        for stream_id, (syncer, widget) in enumerate(zip(syncers, widgets)):
+            frame_start = time.perf_counter()
+
+            frame_bgr = frame_pools[stream_id][frame_num % FRAME_POOL_SIZE]
+            frame = ZoneStatusFrame.from_bgr_frame(frame_bgr, tstamp)
+
+            processed_frame = syncer.sync(
+                latest_frame=frame,
+                latest_zone_statuses=receiver.latest_statuses(stream_id)
+            )
+            if processed_frame is not None:
+                widget.on_frame(processed_frame)
+                frames_delivered += 1
+
+            frame_latencies.append(time.perf_counter() - frame_start)
+
+        # Paint everything that was updated
+        app.processEvents()
+
+        tick_end = time.perf_counter()
+        tick_latencies.append(tick_end - tick_start)
+
+        if args.fps:
+            next_tick = start + (frame_num + 1) / args.fps
+            time.sleep(max(next_tick - tick_end, 0))
+
+    elapsed = time.perf_counter() - start
+
+    frame_p50, frame_p99 = np.percentile(frame_latencies, [50, 99]) * 1000
+    tick_p50, tick_p99 = np.percentile(tick_latencies, [50, 99]) * 1000
+    # ru_maxrss is in kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"streams:            {args.streams} "
+          f"({args.width}x{args.height}, {args.detections} detections)")
+    print(f"frames delivered:   {frames_delivered}")
+    print(f"frames/sec:         {frames_delivered / elapsed:.1f}")
+    print(f"frame latency ms:   p50 {frame_p50:.3f}   p99 {frame_p99:.3f}")
+    print(f"tick latency ms:    p50 {tick_p50:.3f}   p99 {tick_p99:.3f}")
+    print(f"peak RSS MB:        {peak_rss_mb:.1f}")
+    print(f"QImage conversions: "
+          f"{ZoneStatusFrame.get_conversion_count()} "
+          f"({ZoneStatusFrame.get_avoided_conversion_count()} avoided)")
+
+
+def _frame_pool(width: int, height: int, seed: int) -> List[np.ndarray]:
+    """Frames with a gradient and some noise, so they aren't trivially
+    compressible"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(0, 255, width, dtype=np.uint8)
+
+    frames = []
+    for _ in range(FRAME_POOL_SIZE):
+        frame = rng.integers(0, 32, (height, width, 3), dtype=np.uint8)
+        frame[:, :, rng.integers(0, 3)] += gradient[np.newaxis, :] // 2
+        frames.append(frame)
+
+    return frames
+
+
+def _stream_window(stream_count: int):
+    window = QWidget()
+    layout = QGridLayout(window)
+
+    columns = max(math.ceil(math.sqrt(stream_count)), 1)
+    widgets = []
+    for stream_id in range(stream_count):
+        widget = StreamWidget(parent=window)
+        layout.addWidget(widget, stream_id // columns, stream_id % columns)
+        widgets.append(widget)
+
+    window.resize(1280, 720)
+
+    return window, widgets
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""Benchmark for drawing detections on a StreamGraphicsScene.
+
+Draws frames of N synthetic tracked detections, each moving a little every
+frame. Recreating every DetectionItem for every frame, which is what
+StreamWidget.on_frame used to do, is compared against the scene's pooled items
+that are updated in place.
+
+Must be run from the root of the project:
+
+    QT_QPA_PLATFORM=offscreen python -m scripts.benchmarks.bench_scene_items
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional
+from uuid import uuid4
+
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+from brainframe.api.bf_codecs import Detection
+
+# Like brainframe_client.py, the ui package must be imported before api_utils
+# to avoid a circular import
+# noinspection PyUnresolvedReferences
+import brainframe_qt.ui  # noqa: E402,F401
+from brainframe_qt.api_utils.detection_tracks import DetectionTrack
+from brainframe_qt.ui.resources.config import RenderSettings
+from brainframe_qt.ui.resources.video_items.detections import DetectionItem
+from brainframe_qt.ui.resources.video_items.streams.stream_graphics_scene \
+    import StreamGraphicsScene
+
+DETECTION_COUNTS = [10, 50, 200]
+FRAME_WIDTH = 1920
+FRAME_HEIGHT = 1080
+DETECTION_SIZE = 100
+HISTORY_LENGTH = 30
+
+_app: Optional[QApplication] = None
+"""Kept for as long as the benchmark runs, so Qt isn't torn down early"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200,
+                        help="Number of frames to draw per detection count")
+    parser.add_argument("--paint", action="store_true",
+                        help="Also paint the scene to an image every frame")
+    return parser.parse_args()
+
+
+def main() -> None:
+    global _app
+    args = parse_args()
+
+    # Items with text need a QApplication for their fonts
+    _app = QApplication(sys.argv)
+
+    print(f"{'detections':>11} {'rebuild ms':>11} {'pooled ms':>10} "
+          f"{'speedup':>8}")
+    for detection_count in DETECTION_COUNTS:
+        rebuild = run(_draw_rebuild, detection_count, args.frames, args.paint)
+        pooled = run(_draw_pooled, detection_count, args.frames, args.paint)
+
+        print(f"{detection_count:>11} {rebuild * 1000:>11.3f} "
+              f"{pooled * 1000:>10.3f} {rebuild / pooled:>7.1f}x")
+
+
+def run(draw, detection_count: int, frames: int, paint: bool) -> float:
+    """Average time to draw (and optionally paint) a frame, in seconds"""
+    render_config = RenderSettings()
+    scene = StreamGraphicsScene(render_config=render_config, parent=None)
+    scene.setSceneRect(0, 0, FRAME_WIDTH, FRAME_HEIGHT)
+
+    image = QImage(FRAME_WIDTH // 4, FRAME_HEIGHT // 4, QImage.Format_RGB32)
+
+    track_ids = [uuid4() for _ in range(detection_count)]
+    tracks = [DetectionTrack(max_size=HISTORY_LENGTH) for _ in track_ids]
+
+    start = time.perf_counter()
+    for frame_num in range(frames):
+        for index, (track_id, track) in enumerate(zip(track_ids, tracks)):
+            track.add_detection(_detection(track_id, index, frame_num),
+                                frame_num)
+
+        draw(scene, frame_num, tracks)
+
+        if paint:
+            painter = QPainter(image)
+            scene.render(painter)
+            painter.end()
+
+    return (time.perf_counter() - start) / frames
+
+
+def _draw_rebuild(scene: StreamGraphicsScene, tstamp: float,
+                  tracks: List[DetectionTrack]) -> None:
+    """Reference drawing that recreates every item for every frame"""
+    scene.remove_all_items()
+
+    for track in tracks:
+        detection = track.get_interpolated_detection(tstamp)
+        scene.addItem(DetectionItem(detection, track=track,
+                                    render_config=scene.render_config))
+
+
+def _draw_pooled(scene: StreamGraphicsScene, tstamp: float,
+                 tracks: List[DetectionTrack]) -> None:
+    scene.draw_detections(frame_tstamp=tstamp, tracks=tracks)
+
+
+def _detection(track_id, index: int, frame_num: int) -> Detection:
+    x = (index * DETECTION_SIZE + frame_num) % (FRAME_WIDTH - DETECTION_SIZE)
+    y = (index * DETECTION_SIZE // FRAME_WIDTH * DETECTION_SIZE) \
+        % (FRAME_HEIGHT - DETECTION_SIZE)
+
+    return Detection(
+        class_name="person",
+        coords=[[x, y], [x + DETECTION_SIZE, y],
+                [x + DETECTION_SIZE, y + DETECTION_SIZE],
+                [x, y + DETECTION_SIZE]],
+        children=[],
+        attributes={"posture": "standing"},
+        with_identity=None,
+        extra_data={},
+        track_id=track_id,
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Benchmark for ZoneStatus pub-sub dispatch cost versus subscriber count.
+
+Publishes synthetic ZoneStatus packets to a mix of subscribers similar to what
+the alarm views create: one AlarmBundle per stream, one AlarmCard per alarm, and
+one AlertLogEntry per alert, plus a few wildcard subscribers. The indexed
+dispatch is compared against filtering every datum for every subscriber, which
+is what _ZSSPubSub.publish used to do.
+
+Must be run from the root of the project:
+
+    python -m scripts.benchmarks.bench_zss_pubsub
+"""
+import argparse
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Tuple
+
+# Like brainframe_client.py, the ui package must be imported before api_utils
+# to avoid a circular import
+# noinspection PyUnresolvedReferences
+import brainframe_qt.ui  # noqa: E402,F401
+from brainframe_qt.api_utils.zss_pubsub import Subscription, ZSSDataType, \
+    ZSSTopic, _ZSSPubSub
+
+STREAM_COUNTS = [5, 20, 50]
+ZONES_PER_STREAM = 3
+ALARMS_PER_ZONE = 2
+ALERTS_PER_ALARM = 2
+WILDCARD_SUBSCRIBERS = 3
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--packets", type=int, default=200,
+                        help="Number of packets to publish per stream count")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    print(f"{'streams':>8} {'subscribers':>12} {'data':>6} "
+          f"{'filtered ms':>12} {'indexed ms':>11} {'speedup':>8}")
+    for stream_count in STREAM_COUNTS:
+        message = _message(stream_count)
+        pubsub = _pubsub(message)
+
+        filtered = _time_per_packet(_publish_filtered, pubsub, message,
+                                    args.packets)
+        indexed = _time_per_packet(_ZSSPubSub.publish, pubsub, message,
+                                   args.packets)
+
+        subscriber_count = sum(len(subscriptions)
+                               for subscriptions in pubsub.subscriptions.values())
+        data_count = sum(len(data) for data in message.values())
+
+        print(f"{stream_count:>8} {subscriber_count:>12} {data_count:>6} "
+              f"{filtered * 1000:>12.3f} {indexed * 1000:>11.3f} "
+              f"{filtered / indexed:>7.1f}x")
+
+
+def _time_per_packet(publish, pubsub: _ZSSPubSub,
+                     message: Dict[ZSSTopic, ZSSDataType], packets: int) \
+        -> float:
+    start = time.perf_counter()
+    for _ in range(packets):
+        publish(pubsub, message)
+    return (time.perf_counter() - start) / packets
+
+
+def _publish_filtered(pubsub: _ZSSPubSub,
+                      message: Dict[ZSSTopic, ZSSDataType]) -> None:
+    """Reference dispatch that filters every datum for every subscriber"""
+    for topic, data in message.items():
+        for subscriber in list(pubsub.subscriptions[topic]):
+            subscriber.callback(list(filter(subscriber.filter_data, data)))
+
+
+def _message(stream_count: int) -> Dict[ZSSTopic, ZSSDataType]:
+    streams, zones, alarms, alerts, zone_statuses = [], [], [], [], []
+
+    alarm_id = alert_id = 0
+    for stream_id in range(stream_count):
+        streams.append(SimpleNamespace(id=stream_id))
+
+        for zone_index in range(ZONES_PER_STREAM):
+            zone_id = stream_id * ZONES_PER_STREAM + zone_index
+            zone = SimpleNamespace(id=zone_id, stream_id=stream_id)
+            zones.append(zone)
+            zone_statuses.append(SimpleNamespace(zone=zone))
+
+            for _ in range(ALARMS_PER_ZONE):
+                alarms.append(SimpleNamespace(id=alarm_id, zone_id=zone_id,
+                                              stream_id=stream_id))
+
+                for _ in range(ALERTS_PER_ALARM):
+                    alerts.append(SimpleNamespace(id=alert_id,
+                                                  alarm_id=alarm_id,
+                                                  zone_id=zone_id,
+                                                  stream_id=stream_id))
+                    alert_id += 1
+
+                alarm_id += 1
+
+    return {ZSSTopic.STREAMS: streams,
+            ZSSTopic.ZONES: zones,
+            ZSSTopic.ALARMS: alarms,
+            ZSSTopic.ALERTS: alerts,
+            ZSSTopic.ZONE_STATUSES: zone_statuses}
+
+
+def _pubsub(message: Dict[ZSSTopic, ZSSDataType]) -> _ZSSPubSub:
+    """A publisher with subscribers like those created by the alarm views.
+
+    Subscriptions are added to the index directly to avoid connecting to a
+    server's status receiver.
+    """
+    pubsub = _ZSSPubSub()
+
+    subscriptions: List[Tuple[ZSSTopic, dict]] = []
+    for stream in message[ZSSTopic.STREAMS]:
+        subscriptions.append((ZSSTopic.ALARMS, {"stream_id": stream.id}))
+    for alarm in message[ZSSTopic.ALARMS]:
+        subscriptions.append((ZSSTopic.ALERTS, {"alarm_id": alarm.id}))
+    for alert in message[ZSSTopic.ALERTS]:
+        subscriptions.append((ZSSTopic.ALERTS, {"alert_id": alert.id}))
+    for _ in range(WILDCARD_SUBSCRIBERS):
+        subscriptions.append((ZSSTopic.ALERTS, {}))
+        subscriptions.append((ZSSTopic.STREAMS, {}))
+
+    for topic, filters in subscriptions:
+        subscription = Subscription(topic, _callback, filters)
+        pubsub.subscriptions[topic].add(subscription)
+
+    return pubsub
+
+
+def _callback(_data: ZSSDataType) -> None:
+    pass
+
+
+if __name__ == '__main__':
+    main()
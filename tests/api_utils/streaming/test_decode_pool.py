@@ -0,0 +1,163 @@
+import gc
+from typing import List, Set
+
+import numpy as np
+import pytest
+
+from brainframe_qt.api_utils.streaming import decode_pool
+from brainframe_qt.api_utils.streaming.decode_pool import DecodeOptions, \
+    DecodeWorkerPool, RemoteStreamReader
+
+STREAM_ID = 1
+
+
+class FakeConnection:
+    """Records the messages sent over one side of a worker's pipes"""
+
+    def __init__(self):
+        self.messages: List[tuple] = []
+        self.streams: Set[int] = {STREAM_ID}
+
+    def send(self, *message) -> None:
+        self.messages.append(message)
+
+
+def make_frame(value: int, width: int = 64, height: int = 36) -> np.ndarray:
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[..., 0] = value
+    frame[..., 2] = 255 - value
+    return frame
+
+
+@pytest.fixture
+def worker_stream():
+    """The worker process' side of a stream, without a process or decoder"""
+    options = DecodeOptions(url="rtsp://localhost", latency=100,
+                            runtime_options={}, pipeline=None, proxied=False)
+    stream = decode_pool._WorkerStream(STREAM_ID, options,
+                                       worker=FakeConnection())
+
+    yield stream
+
+    stream._release_buffer()
+
+
+@pytest.fixture
+def pool():
+    """The client process' side, with a fake worker the stream is assigned
+    to"""
+    pool = DecodeWorkerPool(worker_count=0)
+    worker = FakeConnection()
+    pool._workers.append(worker)
+    pool._readers[STREAM_ID] = RemoteStreamReader(STREAM_ID, pool=pool)
+
+    yield pool
+
+    pool._readers[STREAM_ID]._set_closed()
+    gc.collect()
+    pool._workers.clear()
+    pool.close()
+
+
+def send_frame(worker_stream, pool, frame: np.ndarray,
+               tstamp: float = 1.0) -> None:
+    """Decode a frame in the "worker" and hand it to the "client" """
+    worker_stream._handle_frame(tstamp, frame)
+
+    command, *args = worker_stream._worker.messages.pop()
+    assert command == "frame"
+    pool._handle_frame(pool._workers[0], *args)
+
+
+def forward_releases(worker_stream, pool) -> int:
+    """Pass the slots the client released back to the worker"""
+    messages = pool._workers[0].messages
+    for command, stream_id, buffer_name, slot in messages:
+        assert command == "release"
+        worker_stream.release_slot(buffer_name, slot)
+
+    released = len(messages)
+    messages.clear()
+    return released
+
+
+def test_frame_handed_over_without_copying(worker_stream, pool):
+    frame = make_frame(10)
+
+    send_frame(worker_stream, pool, frame, tstamp=2.0)
+
+    tstamp, received = pool._readers[STREAM_ID].latest_frame
+    assert tstamp == 2.0
+    np.testing.assert_array_equal(received, frame)
+    # A view of the shared memory the worker wrote into
+    assert not received.flags.owndata
+    assert pool._readers[STREAM_ID].latest_source_size is None
+
+
+def test_slot_released_once_frame_dropped(worker_stream, pool):
+    free_slots = decode_pool.SLOTS_PER_STREAM
+
+    send_frame(worker_stream, pool, make_frame(10))
+    assert len(worker_stream._free_slots) == free_slots - 1
+    assert forward_releases(worker_stream, pool) == 0
+
+    # Replacing the reader's frame drops the client's last reference to it
+    send_frame(worker_stream, pool, make_frame(20))
+    gc.collect()
+
+    assert forward_releases(worker_stream, pool) == 1
+    assert len(worker_stream._free_slots) == free_slots - 1
+
+
+def test_frames_copied_when_slots_run_low(worker_stream, pool):
+    held_frames = []
+    held_count = decode_pool.SLOTS_PER_STREAM - decode_pool.RESERVED_SLOTS
+
+    for value in range(held_count + 1):
+        send_frame(worker_stream, pool, make_frame(value))
+        held_frames.append(pool._readers[STREAM_ID].latest_frame[1])
+
+    # The client held on to every frame, but the worker still has slots
+    assert all(not frame.flags.owndata for frame in held_frames[:-1])
+    assert held_frames[-1].flags.owndata
+    assert forward_releases(worker_stream, pool) == 1
+    assert len(worker_stream._free_slots) == decode_pool.RESERVED_SLOTS
+
+
+def test_frames_dropped_without_free_slots(worker_stream):
+    for value in range(decode_pool.SLOTS_PER_STREAM):
+        worker_stream._handle_frame(1.0, make_frame(value))
+
+    worker_stream._handle_frame(1.0, make_frame(100))
+
+    assert len(worker_stream._worker.messages) \
+        == decode_pool.SLOTS_PER_STREAM
+
+
+def test_frames_downscaled_by_worker(worker_stream, pool):
+    worker_stream.output_size = (32, 18)
+
+    send_frame(worker_stream, pool, make_frame(10))
+
+    reader = pool._readers[STREAM_ID]
+    _tstamp, received = reader.latest_frame
+    assert received.shape == (18, 32, 3)
+    assert tuple(received[0, 0]) == (10, 0, 245)
+    assert (reader.latest_source_size.width(),
+            reader.latest_source_size.height()) == (64, 36)
+
+
+def test_larger_frames_get_new_segment(worker_stream, pool):
+    send_frame(worker_stream, pool, make_frame(10))
+    old_buffer_name = worker_stream._buffer.name
+
+    send_frame(worker_stream, pool, make_frame(20, width=128, height=72))
+
+    assert worker_stream._buffer.name != old_buffer_name
+    assert pool._stream_buffers[STREAM_ID] == worker_stream._buffer.name
+    assert pool._buffers[old_buffer_name].retired
+
+    # The old segment is detached from once its last frame is dropped
+    gc.collect()
+    pool._close_retired_buffers()
+    assert old_buffer_name not in pool._buffers
@@ -0,0 +1,120 @@
+import gc
+
+import numpy as np
+import pytest
+
+from brainframe_qt.api_utils.streaming.frame_buffer import SyncedFrameBuffer
+from brainframe_qt.api_utils.streaming.zone_status_frame import \
+    ZoneStatusFrame
+
+FRAME_BYTES = 64 * 36 * 3
+
+
+def make_frame(tstamp: float) -> ZoneStatusFrame:
+    return ZoneStatusFrame.from_bgr_frame(
+        np.zeros((36, 64, 3), dtype=np.uint8), tstamp)
+
+
+@pytest.fixture
+def max_buffer_bytes():
+    """Collect buffers left over from other tests, and restore the shared
+    budget afterwards"""
+    gc.collect()
+    original = SyncedFrameBuffer.get_max_buffer_bytes()
+
+    yield
+
+    gc.collect()
+    SyncedFrameBuffer.set_max_buffer_bytes(original)
+
+
+def make_buffers(count: int, max_frames: int):
+    """Buffers sharing a budget of max_frames frames"""
+    buffers = [SyncedFrameBuffer() for _ in range(count)]
+    # Creating a buffer loads the budget from the user's settings
+    SyncedFrameBuffer.set_max_buffer_bytes(max_frames * FRAME_BYTES)
+    return buffers
+
+
+def test_total_bytes_follow_frames(max_buffer_bytes):
+    total_before = SyncedFrameBuffer.get_total_bytes()
+    buffer, = make_buffers(1, max_frames=10)
+
+    for tstamp in range(3):
+        buffer.add_frame(make_frame(tstamp))
+
+    assert SyncedFrameBuffer.get_total_bytes() \
+        == total_before + 3 * FRAME_BYTES
+
+    assert buffer.pop_oldest().tstamp == 0
+    assert SyncedFrameBuffer.get_total_bytes() \
+        == total_before + 2 * FRAME_BYTES
+
+    assert buffer.pop_until(2).tstamp == 1
+    assert len(buffer) == 1
+    assert SyncedFrameBuffer.get_total_bytes() == total_before + FRAME_BYTES
+
+
+def test_deleted_buffer_releases_bytes(max_buffer_bytes):
+    total_before = SyncedFrameBuffer.get_total_bytes()
+    buffer, = make_buffers(1, max_frames=10)
+
+    buffer.add_frame(make_frame(0))
+    buffer.add_frame(make_frame(1))
+
+    del buffer
+    gc.collect()
+
+    assert SyncedFrameBuffer.get_total_bytes() == total_before
+
+
+def test_full_when_budget_used_up(max_buffer_bytes):
+    buffer, = make_buffers(1, max_frames=3)
+
+    for tstamp in range(2):
+        buffer.add_frame(make_frame(tstamp))
+    assert not buffer.is_full
+
+    buffer.add_frame(make_frame(2))
+    assert buffer.is_full
+
+    buffer.pop_oldest()
+    assert not buffer.is_full
+
+
+def test_budget_measured_in_bytes(max_buffer_bytes):
+    buffer, = make_buffers(1, max_frames=3)
+
+    # A single frame with three times the pixels uses up the whole budget
+    buffer.add_frame(ZoneStatusFrame.from_bgr_frame(
+        np.zeros((36 * 3, 64, 3), dtype=np.uint8), 0))
+
+    assert len(buffer) == 1
+    assert buffer.is_full
+
+
+def test_fair_share_split_between_buffers(max_buffer_bytes):
+    buffers = make_buffers(2, max_frames=4)
+
+    assert SyncedFrameBuffer.get_buffer_count() == 2
+    assert buffers[0].fair_share == 2 * FRAME_BYTES
+
+    buffers.append(SyncedFrameBuffer())
+    SyncedFrameBuffer.set_max_buffer_bytes(6 * FRAME_BYTES)
+
+    assert all(buffer.fair_share == 2 * FRAME_BYTES for buffer in buffers)
+
+
+def test_only_buffers_over_fair_share_give_up_frames(max_buffer_bytes):
+    busy, quiet = make_buffers(2, max_frames=4)
+
+    busy.add_frame(make_frame(0))
+    busy.add_frame(make_frame(1))
+    busy.add_frame(make_frame(2))
+    quiet.add_frame(make_frame(0))
+
+    # Both see the shared buffer as full, but only the stream holding more
+    # than half of it is over its fair share
+    assert busy.is_full and quiet.is_full
+    assert busy.exceeds_fair_share
+    assert not quiet.exceeds_fair_share
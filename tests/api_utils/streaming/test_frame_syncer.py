@@ -0,0 +1,139 @@
+import gc
+from typing import Dict
+
+import pytest
+from PyQt5.QtGui import QImage
+
+from brainframe.api.bf_codecs import Zone, ZoneStatus
+
+from brainframe_qt.api_utils.streaming.frame_buffer import SyncedFrameBuffer
+from brainframe_qt.api_utils.streaming.frame_syncer import FrameSyncer
+from brainframe_qt.api_utils.streaming.zone_status_frame import \
+    ZoneStatusFrame
+
+FULL_FRAME_ZONE = Zone(name=Zone.FULL_FRAME_ZONE_NAME, stream_id=1,
+                       coords=[[0, 0], [1, 0], [1, 1]], id=1)
+
+IMAGE = QImage(64, 36, QImage.Format_BGR888)
+
+
+def make_statuses(tstamp: float) -> Dict[str, ZoneStatus]:
+    status = ZoneStatus(zone=FULL_FRAME_ZONE, tstamp=tstamp,
+                        total_entered={}, total_exited={}, within=[],
+                        entering=[], exiting=[], alerts=[])
+    return {FULL_FRAME_ZONE.name: status}
+
+
+def make_frame(tstamp: float) -> ZoneStatusFrame:
+    return ZoneStatusFrame(frame=IMAGE, tstamp=tstamp)
+
+
+@pytest.fixture
+def syncer():
+    gc.collect()
+    original = SyncedFrameBuffer.get_max_buffer_bytes()
+
+    syncer = FrameSyncer()
+    SyncedFrameBuffer.set_max_buffer_bytes(1024 * IMAGE.sizeInBytes())
+
+    yield syncer
+
+    del syncer
+    gc.collect()
+    SyncedFrameBuffer.set_max_buffer_bytes(original)
+
+
+def buffer_frames(syncer: FrameSyncer, *tstamps: float) -> None:
+    for tstamp in tstamps:
+        syncer.buffer.add_frame(make_frame(tstamp))
+
+
+def test_frame_released_once_statuses_catch_up(syncer):
+    syncer._add_statuses(make_statuses(100.0))
+    buffer_frames(syncer, 100.5)
+
+    # The closest statuses aren't known until some at or after the frame
+    assert syncer._pop_ready_frame(newest_frame_tstamp=100.5) is None
+
+    syncer._add_statuses(make_statuses(100.5))
+    frame = syncer._pop_ready_frame(newest_frame_tstamp=100.5)
+
+    assert frame is not None
+    assert frame.tstamp == 100.5
+
+
+def test_frame_released_after_max_wait(syncer):
+    syncer._add_statuses(make_statuses(100.0))
+    buffer_frames(syncer, 101.0)
+
+    newest = 101.0 + FrameSyncer.MAX_FRAME_WAIT_SECONDS
+    assert syncer._pop_ready_frame(newest_frame_tstamp=newest) is None
+
+    frame = syncer._pop_ready_frame(newest_frame_tstamp=newest + 0.1)
+    assert frame is not None
+    assert frame.tstamp == 101.0
+
+
+def test_frames_behind_two_statuses_skipped(syncer):
+    syncer._add_statuses(make_statuses(100.0))
+    syncer._add_statuses(make_statuses(101.0))
+    buffer_frames(syncer, 99.0, 99.5, 100.0, 100.5)
+
+    # Frames older than the second newest status fell behind and are dropped
+    frame = syncer._pop_ready_frame(newest_frame_tstamp=100.5)
+
+    assert frame.tstamp == 100.0
+    assert len(syncer.buffer) == 1
+
+
+def test_newest_frame_never_skipped(syncer):
+    syncer._add_statuses(make_statuses(100.0))
+    syncer._add_statuses(make_statuses(101.0))
+    buffer_frames(syncer, 99.0, 99.5)
+
+    frame = syncer._pop_ready_frame(newest_frame_tstamp=99.5)
+
+    assert frame.tstamp == 99.5
+    assert syncer.buffer.is_empty
+
+
+def test_decoupled_frame_released_immediately(syncer):
+    syncer._add_statuses(make_statuses(100.0))
+
+    decoupled = 100.0 + FrameSyncer.DECOUPLED_CLOCK_SECONDS + 1
+    buffer_frames(syncer, decoupled)
+
+    frame = syncer._pop_ready_frame(newest_frame_tstamp=decoupled)
+    assert frame.tstamp == decoupled
+
+
+def test_full_buffer_releases_frame(syncer):
+    SyncedFrameBuffer.set_max_buffer_bytes(2 * IMAGE.sizeInBytes())
+    syncer._add_statuses(make_statuses(100.0))
+    buffer_frames(syncer, 100.1)
+
+    assert syncer._pop_ready_frame(newest_frame_tstamp=100.1) is None
+
+    buffer_frames(syncer, 100.2)
+    frame = syncer._pop_ready_frame(newest_frame_tstamp=100.2)
+
+    assert frame.tstamp == 100.1
+    assert frame.frame_metadata.client_buffer_full
+
+
+def test_empty_buffer(syncer):
+    syncer._add_statuses(make_statuses(100.0))
+
+    assert syncer._pop_ready_frame(newest_frame_tstamp=100.0) is None
+
+
+def test_sync_pairs_closest_statuses(syncer):
+    for tstamp in (100.0, 100.4, 101.0):
+        syncer._add_statuses(make_statuses(tstamp))
+
+    frame = syncer.sync(latest_frame=make_frame(100.3),
+                        latest_zone_statuses={})
+
+    assert frame.zone_statuses[FULL_FRAME_ZONE.name].tstamp == 100.4
+    assert frame.frame_metadata.analysis_latency.total_seconds() \
+        == pytest.approx(0.1)
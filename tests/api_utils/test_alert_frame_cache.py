@@ -0,0 +1,194 @@
+from threading import Event
+from typing import List, Optional
+
+import numpy as np
+import pytest
+from PyQt5.QtCore import QObject
+from PyQt5.QtGui import QPixmap
+
+try:
+    from PyQt5 import sip
+except ImportError:
+    import sip
+
+from brainframe_qt.api_utils import api
+from brainframe_qt.api_utils.alert_frame_cache import AlertFrameCache
+
+FRAMELESS_ALERT_ID = 404
+
+
+class FakeServer:
+    def __init__(self):
+        self.requests: List[int] = []
+
+        self.release = Event()
+        """Cleared to hold downloads until it's set again"""
+        self.release.set()
+
+    def get_alert_frame(self, alert_id: int) -> Optional[np.ndarray]:
+        self.requests.append(alert_id)
+        self.release.wait()
+
+        if alert_id == FRAMELESS_ALERT_ID:
+            return None
+        return np.full((48, 64, 3), alert_id % 256, dtype=np.uint8)
+
+
+class Requester(QObject):
+    def __init__(self):
+        super().__init__()
+        self.frames: List[Optional[QPixmap]] = []
+
+    def get_frame(self, cache: AlertFrameCache, alert_id: int) -> None:
+        cache.get_frame(self, alert_id, self.frames.append)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer()
+    monkeypatch.setattr(api, "get_alert_frame", server.get_alert_frame)
+    yield server
+    server.release.set()
+
+
+@pytest.fixture
+def cache(qapp, server, tmp_path):
+    cache = AlertFrameCache()
+    cache._cache_root = tmp_path
+    cache._handle_server_url_change("http://localhost")
+
+    yield cache
+
+    server.release.set()
+    cache._executor.shutdown(wait=True)
+    qapp.processEvents()
+
+
+def test_frame_downloaded_once(cache, server, wait_until):
+    requester = Requester()
+
+    requester.get_frame(cache, 1)
+    requester.get_frame(cache, 1)
+    wait_until(lambda: len(requester.frames) == 2)
+
+    # Concurrent requests share the download
+    assert server.requests == [1]
+    assert cache.misses == 1
+
+    requester.get_frame(cache, 1)
+
+    # Memory hits are answered right away
+    assert len(requester.frames) == 3
+    assert cache.memory_hits == 1
+    assert requester.frames[2] is requester.frames[0]
+
+
+def test_frameless_alert_remembered(cache, server, wait_until):
+    requester = Requester()
+
+    requester.get_frame(cache, FRAMELESS_ALERT_ID)
+    wait_until(lambda: requester.frames)
+    requester.get_frame(cache, FRAMELESS_ALERT_ID)
+
+    assert requester.frames == [None, None]
+    assert server.requests == [FRAMELESS_ALERT_ID]
+
+
+def test_frame_read_from_disk_after_clear(cache, server, wait_until):
+    requester = Requester()
+    requester.get_frame(cache, 1)
+    wait_until(lambda: requester.frames)
+
+    cache.clear()
+    requester.get_frame(cache, 1)
+    wait_until(lambda: len(requester.frames) == 2)
+
+    assert server.requests == [1]
+    assert cache.disk_hits == 1
+    assert requester.frames[1].size() == requester.frames[0].size()
+
+
+def test_frame_from_before_clear_not_stored(cache, server, wait_until):
+    requester = Requester()
+    server.release.clear()
+    requester.get_frame(cache, 1)
+
+    cache.clear()
+    server.release.set()
+    wait_until(lambda: requester.frames)
+
+    # The requester still gets it, but it isn't cached
+    assert requester.frames[0] is not None
+    assert 1 not in cache._memory_cache
+
+
+def test_frameless_from_before_clear_not_stored(cache, server, wait_until):
+    requester = Requester()
+    server.release.clear()
+    requester.get_frame(cache, FRAMELESS_ALERT_ID)
+
+    cache.clear()
+    server.release.set()
+    wait_until(lambda: requester.frames)
+
+    assert FRAMELESS_ALERT_ID not in cache._frameless_alert_ids
+
+
+def test_download_not_shared_across_clear(cache, server, wait_until,
+                                          tmp_path):
+    old_requester = Requester()
+    server.release.clear()
+    old_requester.get_frame(cache, 1)
+
+    # e.g. connected to another server
+    cache._handle_server_url_change("http://otherhost")
+    new_requester = Requester()
+    new_requester.get_frame(cache, 1)
+
+    server.release.set()
+    wait_until(lambda: old_requester.frames and new_requester.frames)
+
+    assert server.requests == [1, 1]
+    assert len(old_requester.frames) == len(new_requester.frames) == 1
+    assert 1 in cache._memory_cache
+    assert len(list(tmp_path.glob("*/1.jpg"))) == 2
+
+
+def test_deleted_requester_not_called(cache, server, wait_until):
+    requester = Requester()
+    frames = requester.frames
+    server.release.clear()
+    requester.get_frame(cache, 1)
+
+    sip.delete(requester)
+    server.release.set()
+    wait_until(lambda: not cache._pending)
+
+    assert frames == []
+
+
+def test_least_recently_used_evicted(cache, server, wait_until):
+    requester = Requester()
+    requester.get_frame(cache, 1)
+    wait_until(lambda: requester.frames)
+
+    cache.MAX_MEMORY_BYTES = 2 * AlertFrameCache._pixmap_bytes(
+        requester.frames[0])
+
+    for alert_id in (2, 1, 3):
+        requester.get_frame(cache, alert_id)
+        wait_until(lambda: not cache._pending)
+
+    assert list(cache._memory_cache) == [1, 3]
+
+
+def test_prefetch(cache, server, wait_until):
+    cache.prefetch([1, 2])
+    wait_until(lambda: not cache._pending)
+
+    requester = Requester()
+    requester.get_frame(cache, 1)
+
+    assert len(requester.frames) == 1
+    assert cache.prefetches == 2
+    assert cache.misses == 0
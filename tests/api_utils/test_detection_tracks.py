@@ -0,0 +1,141 @@
+from typing import List
+from uuid import uuid4
+
+from brainframe.api.bf_codecs import Detection
+
+from brainframe_qt.api_utils.detection_tracks import DECOUPLED_CLOCK_SECONDS, \
+    DetectionTrack, interpolate_tracks
+
+TRACK_ID = uuid4()
+
+
+def make_detection(x: int, point_count: int = 2) -> Detection:
+    coords = [[x + point, point] for point in range(point_count)]
+    return Detection(class_name="person", coords=coords, children=[],
+                     attributes={}, with_identity=None, extra_data={},
+                     track_id=TRACK_ID)
+
+
+def make_track(*tstamps: float, max_size: int = 1000) -> DetectionTrack:
+    """A track that moves 10 pixels to the right every second"""
+    track = DetectionTrack(max_size=max_size)
+    for tstamp in tstamps:
+        track.add_detection(make_detection(int(tstamp * 10)), tstamp)
+    return track
+
+
+def tstamps(track: DetectionTrack) -> List[float]:
+    return [tstamp for _detection, tstamp in track]
+
+
+def test_iterates_newest_first():
+    track = make_track(1.0, 2.0, 3.0)
+
+    assert tstamps(track) == [3.0, 2.0, 1.0]
+    assert track.latest_tstamp == 3.0
+    assert track.latest_det.coords[0][0] == 30
+
+
+def test_grows_past_initial_capacity():
+    count = 3 * DetectionTrack.INITIAL_CAPACITY
+    track = make_track(*range(count))
+
+    assert len(track) == count
+    assert tstamps(track) == list(range(count - 1, -1, -1))
+
+
+def test_oldest_dropped_past_max_size():
+    track = make_track(*range(25), max_size=10)
+
+    assert len(track) == 10
+    assert tstamps(track) == list(range(24, 14, -1))
+
+
+def test_out_of_order_detection_sorted():
+    track = make_track(1.0, 3.0)
+    track.add_detection(make_detection(20), 2.0)
+
+    assert tstamps(track) == [3.0, 2.0, 1.0]
+    assert track.get_interpolated_detection(2.5).coords[0][0] == 25
+
+
+def test_interpolated_between_detections():
+    track = make_track(1.0, 2.0, 3.0)
+
+    detection = track.get_interpolated_detection(1.5)
+
+    assert detection.coords == [[15, 0], [16, 1]]
+    assert detection.track_id == TRACK_ID
+
+
+def test_closest_detection_outside_history():
+    track = make_track(1.0, 2.0)
+
+    assert track.get_interpolated_detection(0.5).coords[0][0] == 10
+    assert track.get_interpolated_detection(2.5).coords[0][0] == 20
+
+
+def test_decoupled_clock_gets_latest():
+    track = make_track(1.0, 2.0)
+
+    tstamp = 2.0 - DECOUPLED_CLOCK_SECONDS - 1
+    assert track.get_interpolated_detection(tstamp).coords[0][0] == 20
+
+
+def test_differing_point_counts_not_interpolated():
+    track = DetectionTrack()
+    track.add_detection(make_detection(10, point_count=2), 1.0)
+    track.add_detection(make_detection(20, point_count=3), 2.0)
+
+    detection = track.get_interpolated_detection(1.5)
+
+    assert detection.coords == make_detection(20, point_count=3).coords
+
+
+def test_snapshot_unaffected_by_later_detections():
+    track = make_track(1.0, 2.0)
+    snapshot = track.snapshot()
+
+    track.add_detection(make_detection(30), 3.0)
+
+    assert tstamps(snapshot) == [2.0, 1.0]
+    assert snapshot.version != track.version
+
+
+def test_adding_to_snapshot_leaves_track_alone():
+    track = make_track(1.0, 2.0)
+    snapshot = track.snapshot()
+
+    snapshot.add_detection(make_detection(25), 2.5)
+    track.add_detection(make_detection(30), 3.0)
+
+    assert tstamps(snapshot) == [2.5, 2.0, 1.0]
+    assert tstamps(track) == [3.0, 2.0, 1.0]
+
+
+def test_copy_is_independent():
+    track = make_track(*range(20), max_size=10)
+    copy = track.copy()
+
+    track.add_detection(make_detection(200), 20.0)
+
+    assert tstamps(copy) == list(range(19, 9, -1))
+
+
+def test_interpolate_tracks_matches_single_tracks():
+    tracks = [
+        make_track(1.0, 2.0, 3.0),
+        make_track(1.2, 1.8),
+        make_track(0.0, 4.0),
+        make_track(3.0),
+    ]
+    odd_track = DetectionTrack()
+    odd_track.add_detection(make_detection(10, point_count=3), 1.0)
+    odd_track.add_detection(make_detection(30, point_count=3), 3.0)
+    tracks.append(odd_track)
+
+    detections = interpolate_tracks(tracks, 1.5)
+
+    assert [detection.coords for detection in detections] \
+        == [track.get_interpolated_detection(1.5).coords
+            for track in tracks]
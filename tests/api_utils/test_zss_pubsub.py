@@ -0,0 +1,222 @@
+from typing import List
+
+import pytest
+
+from brainframe.api.bf_codecs import Alert, Zone
+
+from brainframe_qt.api_utils.zss_pubsub import Subscription, ZSSDelta, \
+    ZSSTopic, _SubscriptionIndex, _ZSSPubSub
+
+
+def make_zone(zone_id: int, stream_id: int, name: str = "zone") -> Zone:
+    return Zone(name=name, stream_id=stream_id,
+                coords=[[0, 0], [1, 0], [1, 1]], id=zone_id)
+
+
+def make_alert(alert_id: int, stream_id: int, zone_id: int,
+               alarm_id: int = 1, end_time=None) -> Alert:
+    return Alert(alarm_id=alarm_id, zone_id=zone_id, stream_id=stream_id,
+                 start_time=1600000000.0, end_time=end_time,
+                 verified_as=None, id=alert_id)
+
+
+def zone_subscription(**filters) -> Subscription:
+    return Subscription(ZSSTopic.ZONES, lambda data: None, filters=filters)
+
+
+@pytest.fixture
+def publisher() -> _ZSSPubSub:
+    publisher = _ZSSPubSub()
+    # Don't connect to a server on the first subscription
+    publisher.status_receiver = object()
+    return publisher
+
+
+def test_index_matches_filter_values():
+    index = _SubscriptionIndex(ZSSTopic.ZONES)
+    stream_1 = zone_subscription(stream_id=1)
+    stream_2 = zone_subscription(stream_id=2)
+    zone_10 = zone_subscription(stream_id=1, zone_id=10)
+    everything = zone_subscription()
+    for subscription in (stream_1, stream_2, zone_10, everything):
+        index.add(subscription)
+
+    assert set(index.match(make_zone(10, stream_id=1))) \
+        == {stream_1, zone_10, everything}
+    assert set(index.match(make_zone(11, stream_id=1))) \
+        == {stream_1, everything}
+    assert set(index.match(make_zone(20, stream_id=2))) \
+        == {stream_2, everything}
+    assert set(index.match(make_zone(30, stream_id=3))) == {everything}
+
+
+def test_index_wildcard_in_leading_filter():
+    index = _SubscriptionIndex(ZSSTopic.ZONES)
+    zone_10 = zone_subscription(zone_id=10)
+    index.add(zone_10)
+
+    assert list(index.match(make_zone(10, stream_id=1))) == [zone_10]
+    assert list(index.match(make_zone(10, stream_id=2))) == [zone_10]
+    assert list(index.match(make_zone(11, stream_id=1))) == []
+
+
+def test_index_add_and_remove():
+    index = _SubscriptionIndex(ZSSTopic.ZONES)
+    first = zone_subscription(stream_id=1)
+    second = zone_subscription(stream_id=1)
+
+    index.add(first)
+    index.add(first)
+    index.add(second)
+    assert len(index) == 2
+    assert set(index) == {first, second}
+
+    index.remove(first)
+    assert list(index.match(make_zone(10, stream_id=1))) == [second]
+
+    index.remove(second)
+    assert len(index) == 0
+    assert list(index.match(make_zone(10, stream_id=1))) == []
+
+    with pytest.raises(KeyError):
+        index.remove(second)
+
+
+def test_alerts_filtered_by_stream_and_zone():
+    index = _SubscriptionIndex(ZSSTopic.ALERTS)
+    by_stream = Subscription(ZSSTopic.ALERTS, lambda data: None,
+                             filters={"stream_id": 1})
+    by_zone = Subscription(ZSSTopic.ALERTS, lambda data: None,
+                           filters={"zone_id": 10})
+    index.add(by_stream)
+    index.add(by_zone)
+
+    assert set(index.match(make_alert(1, stream_id=1, zone_id=10))) \
+        == {by_stream, by_zone}
+    assert set(index.match(make_alert(2, stream_id=1, zone_id=11))) \
+        == {by_stream}
+    assert set(index.match(make_alert(3, stream_id=2, zone_id=20))) == set()
+
+
+def test_unsupported_filter_raises():
+    with pytest.raises(ValueError):
+        Subscription(ZSSTopic.STREAMS, lambda data: None,
+                     filters={"zone_id": 10})
+
+    # Wildcards are fine, as they don't filter anything
+    Subscription(ZSSTopic.STREAMS, lambda data: None,
+                 filters={"stream_id": 1, "zone_id": any})
+
+
+def test_publish_routes_matching_data(publisher):
+    received = {}
+
+    def receiver(name: str):
+        def callback(data: List[Zone]) -> None:
+            received[name] = data
+        return callback
+
+    publisher.subscribe_zones(receiver("stream_1"), stream_id=1)
+    publisher.subscribe_zones(receiver("zone_20"), zone_id=20)
+    publisher.subscribe_zones(receiver("stream_3"), stream_id=3)
+
+    zone_10 = make_zone(10, stream_id=1)
+    zone_11 = make_zone(11, stream_id=1)
+    zone_20 = make_zone(20, stream_id=2)
+    publisher.publish({ZSSTopic.ZONES: [zone_10, zone_11, zone_20]})
+
+    assert received["stream_1"] == [zone_10, zone_11]
+    assert received["zone_20"] == [zone_20]
+    # Subscribers are called even if nothing matches
+    assert received["stream_3"] == []
+
+
+def test_unsubscribed_not_called(publisher):
+    calls = []
+    subscription = publisher.subscribe_zones(calls.append, stream_id=1)
+    publisher.unsubscribe(subscription)
+
+    publisher.publish({ZSSTopic.ZONES: [make_zone(10, stream_id=1)]})
+
+    assert calls == []
+
+
+def test_diff_finds_changes(publisher):
+    zone_10 = make_zone(10, stream_id=1)
+    zone_11 = make_zone(11, stream_id=1)
+
+    delta = publisher._diff(ZSSTopic.ZONES, [zone_10, zone_11])
+    assert delta == ZSSDelta(added=[zone_10, zone_11])
+
+    renamed_10 = make_zone(10, stream_id=1, name="renamed")
+    zone_12 = make_zone(12, stream_id=1)
+    delta = publisher._diff(ZSSTopic.ZONES, [renamed_10, zone_12])
+
+    assert delta.added == [zone_12]
+    assert delta.changed == [renamed_10]
+    # The last version that was sent
+    assert delta.removed == [zone_11]
+
+
+def test_diff_unchanged_is_empty(publisher):
+    publisher._diff(ZSSTopic.ZONES, [make_zone(10, stream_id=1)])
+
+    # Equal, but not the same object
+    delta = publisher._diff(ZSSTopic.ZONES, [make_zone(10, stream_id=1)])
+
+    assert delta == ZSSDelta()
+    assert not delta
+
+
+def test_diff_ended_alert_changed(publisher):
+    publisher._diff(ZSSTopic.ALERTS, [make_alert(1, stream_id=1, zone_id=10)])
+
+    ended = make_alert(1, stream_id=1, zone_id=10, end_time=1600000010.0)
+    delta = publisher._diff(ZSSTopic.ALERTS, [ended])
+
+    assert delta.changed == [ended]
+
+
+def test_delta_subscription(publisher):
+    deltas = []
+    publisher.subscribe_zones(deltas.append, stream_id=1, deltas=True)
+
+    zone_10 = make_zone(10, stream_id=1)
+    zone_20 = make_zone(20, stream_id=2)
+    publisher.publish({ZSSTopic.ZONES: [zone_10, zone_20]})
+
+    # Starts off with everything it matches
+    assert deltas == [ZSSDelta(added=[zone_10])]
+
+    # Not called when nothing it matches changed
+    renamed_20 = make_zone(20, stream_id=2, name="renamed")
+    publisher.publish({ZSSTopic.ZONES: [zone_10, renamed_20]})
+    assert len(deltas) == 1
+
+    zone_11 = make_zone(11, stream_id=1)
+    publisher.publish({ZSSTopic.ZONES: [zone_11, renamed_20]})
+    assert deltas[1] == ZSSDelta(added=[zone_11], removed=[zone_10])
+
+
+def test_late_delta_subscription_primed(publisher):
+    first = []
+    publisher.subscribe_zones(first.append, deltas=True)
+    zone_10 = make_zone(10, stream_id=1)
+    publisher.publish({ZSSTopic.ZONES: [zone_10]})
+
+    second = []
+    publisher.subscribe_zones(second.append, deltas=True)
+    publisher.publish({ZSSTopic.ZONES: [zone_10]})
+
+    assert first == [ZSSDelta(added=[zone_10])]
+    assert second == [ZSSDelta(added=[zone_10])]
+
+
+def test_snapshots_only_kept_with_delta_subscriptions(publisher):
+    subscription = publisher.subscribe_zones(lambda delta: None, deltas=True)
+    publisher.publish({ZSSTopic.ZONES: [make_zone(10, stream_id=1)]})
+    assert ZSSTopic.ZONES in publisher._snapshots
+
+    publisher.unsubscribe(subscription)
+    publisher.publish({ZSSTopic.ZONES: [make_zone(10, stream_id=1)]})
+    assert ZSSTopic.ZONES not in publisher._snapshots
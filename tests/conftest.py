@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+from typing import Callable
+
+import pytest
+from PyQt5.QtCore import QStandardPaths
+from PyQt5.QtWidgets import QApplication
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Settings and some widgets need an application to exist before they're
+# created, including at import time
+_app = QApplication.instance() or QApplication(sys.argv)
+QStandardPaths.setTestModeEnabled(True)
+
+# api_utils and ui import each other. Importing ui first resolves the cycle
+import brainframe_qt.ui  # noqa: E402,F401
+
+
+@pytest.fixture
+def qapp() -> QApplication:
+    return _app
+
+
+@pytest.fixture
+def wait_until(qapp):
+    """Process events until a condition is met, e.g. for a QTAsyncWorker to
+    call back. Fails the test if it takes longer than the timeout"""
+    def wait_until_(condition: Callable[[], bool], timeout: float = 5.0) \
+            -> None:
+        deadline = time.monotonic() + timeout
+        while not condition():
+            if time.monotonic() > deadline:
+                pytest.fail("Timed out waiting for condition")
+            qapp.processEvents()
+            time.sleep(0.001)
+
+    return wait_until_
@@ -0,0 +1,65 @@
+from typing import List
+
+import pytest
+from PyQt5.QtWidgets import QWidget
+
+from brainframe.api.bf_codecs import Alert, ZoneAlarm
+
+from brainframe_qt.api_utils import api
+from brainframe_qt.api_utils.alert_frame_cache import alert_frame_cache
+from brainframe_qt.api_utils.zss_pubsub import zss_publisher
+from brainframe_qt.ui.resources.alarms.alarm_bundle.alarm_card import \
+    AlarmCard
+
+ALARM = ZoneAlarm(name="alarm", count_conditions=[], rate_conditions=[],
+                  use_active_time=False, active_start_time="00:00:00",
+                  active_end_time="00:00:00", id=1, zone_id=1, stream_id=1)
+
+
+def get_alerts(*, alarm_id: int, limit: int, offset: int):
+    alerts = [Alert(alarm_id=alarm_id, zone_id=1, stream_id=1,
+                    start_time=1600000000.0 + alert_id,
+                    end_time=1600000001.0 + alert_id, verified_as=None,
+                    id=alert_id)
+              for alert_id in range(100, 0, -1)]
+    return alerts[offset:offset + limit], len(alerts)
+
+
+@pytest.fixture
+def prefetched(monkeypatch) -> List[List[int]]:
+    """The alert IDs passed to each call of alert_frame_cache.prefetch"""
+    calls = []
+    monkeypatch.setattr(alert_frame_cache, "prefetch",
+                        lambda alert_ids: calls.append(list(alert_ids)))
+    monkeypatch.setattr(api, "get_alerts", get_alerts)
+    # Don't connect to a server to subscribe to alerts
+    monkeypatch.setattr(zss_publisher, "status_receiver", object())
+    return calls
+
+
+@pytest.fixture
+def window(qapp):
+    window = QWidget()
+    yield window
+    window.deleteLater()
+
+
+def test_newest_frames_prefetched_once_first_page_loads(prefetched, window,
+                                                        wait_until):
+    card = AlarmCard(ALARM, parent=window)
+    assert card.expanded
+
+    wait_until(lambda: prefetched)
+
+    newest_ids = list(range(100, 100 - AlarmCard.PREFETCH_FRAMES, -1))
+    assert prefetched == [newest_ids]
+
+
+def test_collapsed_card_not_prefetched(prefetched, window, wait_until):
+    card = AlarmCard(ALARM, parent=window)
+    card.expanded = False
+    prefetched.clear()
+
+    wait_until(lambda: card.alert_log.alert_model.rowCount())
+
+    assert prefetched == []
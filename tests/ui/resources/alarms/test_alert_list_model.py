@@ -0,0 +1,189 @@
+from threading import Event
+from typing import Dict, List, Optional
+
+import pytest
+from PyQt5.QtCore import QModelIndex, QObject
+from requests.exceptions import ConnectionError
+
+from brainframe.api.bf_codecs import Alert
+
+from brainframe_qt.api_utils import api
+from brainframe_qt.ui.resources.alarms.alert_list_model import \
+    AlertListModel, AlertRole
+
+PAGE_SIZE = 10
+
+
+def make_alert(alert_id: int, end_time: Optional[float] = None) -> Alert:
+    return Alert(alarm_id=1, zone_id=1, stream_id=1,
+                 start_time=1600000000.0 + alert_id, end_time=end_time,
+                 verified_as=None, id=alert_id)
+
+
+class FakeServer:
+    """Serves alerts newest first, like api.get_alerts"""
+
+    def __init__(self, alert_count: int):
+        self.alerts: Dict[int, Alert] = {
+            alert_id: make_alert(alert_id)
+            for alert_id in range(1, alert_count + 1)
+        }
+        self.requests: List[dict] = []
+
+        self.error: Optional[Exception] = None
+        self.release = Event()
+        """Cleared to hold requests until it's set again"""
+        self.release.set()
+
+    def get_alerts(self, *, limit: int, offset: int, **filters):
+        self.requests.append({"limit": limit, "offset": offset, **filters})
+        self.release.wait()
+
+        if self.error is not None:
+            raise self.error
+
+        alerts = sorted(self.alerts.values(), key=lambda alert: -alert.id)
+        return alerts[offset:offset + limit], len(alerts)
+
+    def add_alert(self, alert_id: int) -> Alert:
+        alert = self.alerts[alert_id] = make_alert(alert_id)
+        return alert
+
+
+@pytest.fixture
+def model(qapp):
+    parent = QObject()
+    yield AlertListModel(parent, page_size=PAGE_SIZE)
+    parent.deleteLater()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = FakeServer(alert_count=25)
+    monkeypatch.setattr(api, "get_alerts", server.get_alerts)
+    yield server
+    server.release.set()
+
+
+def alert_ids(model: AlertListModel) -> List[int]:
+    return [model.data(model.index(row), AlertRole).id
+            for row in range(model.rowCount())]
+
+
+def fetch_page(model: AlertListModel, wait_until) -> None:
+    assert model.canFetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    wait_until(lambda: not model._fetching)
+
+
+def test_alerts_ordered_newest_first(model):
+    model.add_alerts([make_alert(2), make_alert(5), make_alert(1)])
+    model.add_alerts([make_alert(3)])
+
+    assert alert_ids(model) == [5, 3, 2, 1]
+    assert model.row_of(3) == 1
+    assert model.row_of(4) is None
+
+
+def test_known_alert_replaced(model):
+    model.add_alerts([make_alert(1), make_alert(2)])
+
+    changed = []
+    model.dataChanged.connect(
+        lambda top_left, bottom_right: changed.append(top_left.row()))
+
+    ended = make_alert(1, end_time=1600000010.0)
+    model.add_alerts([ended])
+    # Equal to what's already there
+    model.add_alerts([make_alert(2)])
+
+    assert alert_ids(model) == [2, 1]
+    assert model.alert(1) is ended
+    assert changed == [1]
+
+
+def test_remove_alerts(model):
+    model.add_alerts([make_alert(alert_id) for alert_id in range(1, 5)])
+
+    model.remove_alerts([3, 1, 10])
+
+    assert alert_ids(model) == [4, 2]
+
+
+def test_nothing_fetched_without_query(model, server):
+    assert not model.canFetchMore(QModelIndex())
+
+    model.fetchMore(QModelIndex())
+
+    assert server.requests == []
+
+
+def test_pages_fetched_until_exhausted(model, server, wait_until):
+    model.set_query(alarm_id=1)
+
+    fetch_page(model, wait_until)
+    assert alert_ids(model) == list(range(25, 15, -1))
+
+    fetch_page(model, wait_until)
+    fetch_page(model, wait_until)
+
+    assert alert_ids(model) == list(range(25, 0, -1))
+    assert [request["offset"] for request in server.requests] == [0, 10, 20]
+    assert all(request["alarm_id"] == 1 for request in server.requests)
+    # The last page was short
+    assert not model.canFetchMore(QModelIndex())
+
+
+def test_pushed_alerts_shift_offset(model, server, wait_until):
+    model.set_query()
+    fetch_page(model, wait_until)
+
+    # New alerts push the loaded ones down the server's list
+    model.add_alerts([server.add_alert(26), server.add_alert(27)])
+
+    fetch_page(model, wait_until)
+
+    assert server.requests[-1]["offset"] == 12
+    assert alert_ids(model) == list(range(27, 5, -1))
+
+
+def test_single_fetch_at_a_time(model, server, wait_until):
+    model.set_query()
+    server.release.clear()
+
+    model.fetchMore(QModelIndex())
+    assert not model.canFetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+
+    server.release.set()
+    wait_until(lambda: not model._fetching)
+
+    assert len(server.requests) == 1
+
+
+def test_page_for_old_query_dropped(model, server, wait_until):
+    model.set_query(alarm_id=1)
+    server.release.clear()
+    model.fetchMore(QModelIndex())
+
+    model.set_query(alarm_id=2)
+    server.release.set()
+    wait_until(lambda: len(server.requests) == 1)
+    fetch_page(model, wait_until)
+
+    assert server.requests[-1] == {"limit": PAGE_SIZE, "offset": 0,
+                                   "alarm_id": 2}
+    assert alert_ids(model) == list(range(25, 15, -1))
+
+
+def test_failed_fetch_retried(model, server, wait_until):
+    model.set_query()
+    server.error = ConnectionError()
+
+    fetch_page(model, wait_until)
+    assert model.rowCount() == 0
+
+    server.error = None
+    fetch_page(model, wait_until)
+
+    assert alert_ids(model) == list(range(25, 15, -1))